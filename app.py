@@ -2,11 +2,18 @@ import streamlit as st
 import pandas as pd
 import time
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import logging
+import os
 from sections import intro, overview, deep_dives, conclusions
 from utils.io import load_data
-from utils.prep import engineer_features
+from utils.catalog import DEFAULT_DATA_DIR, discover_snapshots
+from utils.channels import ChannelSketches, build_channel_table
+from utils.filters import PLACEHOLDER_CATEGORIES, filter_selection, take_rows
+from utils.profile import DatasetProfile, view_profile
+from utils.outliers import OUTLIER_METHODS, OUTLIER_SCALES, OutlierThresholds
+from utils.session_cache import session_cache
+from utils.sampling import DEFAULT_CONFIDENCE, DEFAULT_SAMPLE_SEED, DEFAULT_TARGET_ERROR, SampleEstimates, adaptive_sample_size
+from utils.rerun import REUSE, RESAMPLE, RerunCoordinator, dataset_key, plan_load, resample_dataset
 st.set_page_config(page_title="YouTube Dataset Visualization Analysis", layout="wide")
 page_style = """<style>
     .main-header {
@@ -59,11 +66,27 @@ with st.sidebar:
         st.session_state.refresh_data = False
     refresh_data = st.button("Refresh Data", help="Reload and process the dataset")
     if refresh_data:
+        session_cache().clear()
         st.session_state.refresh_data = True
-        st.rerun()
 def main():
     file_path = "data/YouTubeDataset_withChannelElapsed.csv"
-    import os
+    snapshots = discover_snapshots(DEFAULT_DATA_DIR)
+    csv_snapshots = [snapshot for snapshot in snapshots if snapshot['format'] == 'csv']
+    if len(csv_snapshots) > 1:
+        with st.sidebar:
+            st.markdown("---")
+            st.markdown("<h3 class='sidebar-header'>Dataset Snapshots</h3>", unsafe_allow_html=True)
+            snapshot_paths = [snapshot['path'] for snapshot in csv_snapshots]
+            snapshot_labels = {snapshot['path']: snapshot['key'] for snapshot in csv_snapshots}
+            file_path = st.selectbox(
+                "Active Snapshot",
+                snapshot_paths,
+                index=snapshot_paths.index(file_path) if file_path in snapshot_paths else len(snapshot_paths) - 1,
+                format_func=snapshot_labels.get,
+                help=f"{len(snapshots)} snapshots found in '{DEFAULT_DATA_DIR}'; all of them can be compared in Deep Dives"
+            )
+    elif len(csv_snapshots) == 1 and not os.path.exists(file_path):
+        file_path = csv_snapshots[0]['path']
     if not os.path.exists(file_path):
         st.error(f"Data file '{file_path}' does not exist, please check the path.")
         return
@@ -77,72 +100,34 @@ def main():
             max_value=100000,
             value=50000,
             step=1000,
-            disabled=not use_sampling
+            disabled=not use_sampling or st.session_state.get('adaptive_sampling', False)
+        )
+        adaptive_sampling = st.checkbox(
+            "Adaptive Sample Size",
+            value=False,
+            key="adaptive_sampling",
+            disabled=not use_sampling,
+            help="Size the sample from the start of the file so the headline statistics reach the target error"
         )
+        if use_sampling and adaptive_sampling:
+            target_error = st.slider(
+                "Target Error (%)",
+                min_value=1.0,
+                max_value=20.0,
+                value=DEFAULT_TARGET_ERROR * 100,
+                step=0.5,
+                help=f"{DEFAULT_CONFIDENCE:.0%} confidence half-width: relative for averages, absolute (percentage points) for category shares and the correlation"
+            ) / 100
+        random_seed = DEFAULT_SAMPLE_SEED
         if use_sampling:
-            random_seed = st.number_input("Random Seed", min_value=0, value=42, help="Set random seed for reproducible sampling results")
+            random_seed = int(st.number_input("Random Seed", min_value=0, value=DEFAULT_SAMPLE_SEED, help="Set random seed for reproducible sampling results"))
+        sampling_report_slot = st.container()
         st.markdown("---")
         st.markdown("<h3 class='sidebar-header'>Data Quality Filtering</h3>", unsafe_allow_html=True)
-        min_views_default = st.session_state.get('min_views_default', 0)
-        max_views_default = st.session_state.get('max_views_default', 1000000)
-        selected_categories_default = st.session_state.get('selected_categories_default', [])
-        available_categories = st.session_state.get('available_categories', [])
         st.markdown("### # View Count Filtering")
-        col1, col2 = st.columns(2)
-        with col1:
-            min_views = st.number_input(
-                "Minimum Views",
-                min_value=0,
-                value=min_views_default,
-                step=1000,
-                help="Filter out videos with views below this value",
-                key="min_views"
-            )
-        with col2:
-            max_views = st.number_input(
-                "Maximum Views",
-                min_value=0,
-                value=max_views_default,
-                step=1000,
-                help="Filter out videos with views above this value",
-                key="max_views"
-            )
+        view_filter_slot = st.container()
         st.markdown("### # Category Filtering")
-        if 'available_categories' not in st.session_state:
-            st.session_state['available_categories'] = []
-        if 'selected_categories_default' not in st.session_state:
-            st.session_state['selected_categories_default'] = []
-        available_categories = st.session_state.get('available_categories', [])
-        display_categories = available_categories if available_categories else ["Entertainment", "Music", "Education", "Gaming", "Science & Technology"]
-        previous_selected = st.session_state.get('selected_categories_cache', [])
-        valid_defaults = [cat for cat in previous_selected if cat in display_categories]
-        if not valid_defaults and previous_selected:
-            valid_defaults = st.session_state['selected_categories_default']
-        selected_categories = st.multiselect(
-            "Select Video Categories",
-            options=display_categories,
-            default=valid_defaults,
-            key="selected_categories",
-            help="Select video categories to analyze, leave empty for all",
-            disabled=False
-        )
-        st.session_state['selected_categories_cache'] = selected_categories
-        if st.session_state.get('loading_in_progress', False):
-            progress_info = st.session_state.get('loading_progress', {})
-            if progress_info.get('processed_rows', 0) > 0:
-                progress_container = st.empty()
-                total_rows = progress_info.get('total_rows', 100000)
-                progress = min(progress_info['processed_rows'] / total_rows, 1.0)
-                with progress_container.container():
-                    st.progress(progress)
-                    st.info(f"Loading data, processed {progress_info['processed_rows']:,} rows, " \
-                           f"found {len(available_categories)} categories...")
-            else:
-                st.info("Data loading, category list will update in real time...")
-        elif 'prev_category_count' in st.session_state and \
-             st.session_state['prev_category_count'] < len(available_categories):
-            st.info(f"Category list updated, now {len(available_categories)} categories available")
-        st.session_state['prev_category_count'] = len(available_categories)
+        category_filter_slot = st.container()
         with st.expander("Advanced Filter Options", expanded=False):
             st.markdown("#### # Outlier Handling")
             filter_outliers = st.checkbox(
@@ -151,6 +136,30 @@ def main():
                 help="Enable this option to filter out outliers in the data for more accurate analysis results"
             )
             st.session_state['filter_outliers'] = filter_outliers
+            outlier_method = st.selectbox(
+                "Outlier Method",
+                options=list(OUTLIER_METHODS),
+                format_func=OUTLIER_METHODS.get,
+                key="outlier_method",
+                disabled=not filter_outliers,
+                help="IQR: outside Q1 - 1.5*IQR / Q3 + 1.5*IQR; MAD: more than 3.5 robust standard deviations from the median; Percentile: outside the 1st-99th percentile"
+            )
+            outlier_scale = st.radio(
+                "Threshold Scale",
+                options=list(OUTLIER_SCALES),
+                format_func=OUTLIER_SCALES.get,
+                key="outlier_scale",
+                horizontal=True,
+                disabled=not filter_outliers,
+                help="Log scale keeps popular videos of heavy-tailed metrics such as views instead of treating them all as outliers"
+            )
+            outliers_per_category = st.checkbox(
+                "Per-Category Thresholds",
+                value=True,
+                key="outliers_per_category",
+                disabled=not filter_outliers,
+                help="Compute thresholds within each category instead of over all videos"
+            )
             st.markdown("#### # Other Options")
             st.info("More filter options will be available after data loading")
         st.markdown("---")
@@ -178,6 +187,51 @@ def main():
                 st.session_state['loading_in_progress'] = False
             else:
                 st.session_state['progress_message'] = f"Processed {progress_info.get('processed_rows', 0)} rows, found {len(st.session_state.get('available_categories', []))} categories..."
+        cache = session_cache()
+        coordinator = st.session_state.setdefault('rerun_coordinator', RerunCoordinator())
+        requested_sample_size = sample_size if use_sampling else None
+        if use_sampling and adaptive_sampling:
+            adaptive_key = ('adaptive_sample', file_path, os.path.getmtime(file_path), target_error, DEFAULT_CONFIDENCE)
+            adaptive = cache.get(adaptive_key)
+            if adaptive is None:
+                with st.spinner("Sizing the sample for the target error..."):
+                    adaptive = cache.put(adaptive_key, adaptive_sample_size(file_path, target_error), kind='sampling')
+            requested_sample_size = adaptive[0]
+        current_dataset_key = dataset_key(file_path, requested_sample_size, random_seed)
+        def load_dataset(load_action, source_key):
+            dataset = cache.get(source_key) if load_action == REUSE else None
+            if load_action == RESAMPLE:
+                st.session_state.data_version_seq = st.session_state.get('data_version_seq', 0) + 1
+                dataset = resample_dataset(cache.get(source_key), requested_sample_size, st.session_state.data_version_seq, random_seed)
+                cache.put(current_dataset_key, dataset, kind='dataset')
+            elif dataset is None:
+                st.session_state.loading_in_progress = True
+                st.session_state.progress_message = "Starting to load data..."
+                channel_sketches = ChannelSketches()
+                df = load_data(
+                    file_path,
+                    sample_size=requested_sample_size,
+                    progress_callback=progress_callback,
+                    sketches=channel_sketches,
+                    seed=random_seed
+                )
+                st.session_state.data_version_seq = st.session_state.get('data_version_seq', 0) + 1
+                dataset = {
+                    'df': df,
+                    'data_version': st.session_state.data_version_seq,
+                    'dataset_profile': DatasetProfile.from_frame(df) if df is not None else None,
+                    'channel_sketches': channel_sketches,
+                    'channel_table': build_channel_table(df) if df is not None else None
+                }
+                if df is not None:
+                    cache.put(current_dataset_key, dataset, kind='dataset')
+            loaded_key = source_key if load_action == REUSE else current_dataset_key
+            if loaded_key in cache:
+                cache.pin(loaded_key)
+            st.session_state.update(dataset)
+            st.session_state.data_loaded = True
+            st.session_state.loading_in_progress = False
+            return dataset['df']
         progress_container = st.empty()
         if st.session_state.get('loading_in_progress', False):
             progress_info = st.session_state.get('loading_progress', {})
@@ -190,53 +244,97 @@ def main():
                 st.info(f"Loading data: {int(progress * 100)}% | Processed {processed_rows:,} rows | Found {len(current_categories)} categories")
         elif st.session_state['progress_message']:
             progress_container.info(st.session_state['progress_message'])
-        if 'prev_sampling_settings' in st.session_state and (\
-           st.session_state['prev_sampling_settings']['use_sampling'] != use_sampling or \
-           st.session_state['prev_sampling_settings']['sample_size'] != sample_size):
-            st.session_state['prev_sampling_settings'] = {
-                'use_sampling': use_sampling,
-                'sample_size': sample_size
-            }
-            st.session_state.refresh_data = True
-            st.rerun()
-        if 'prev_sampling_settings' not in st.session_state:
-            st.session_state['prev_sampling_settings'] = {
-                'use_sampling': use_sampling,
-                'sample_size': sample_size
-            }
-        if 'data_loaded' not in st.session_state or st.session_state.get('refresh_data', False):
-            st.session_state.loading_in_progress = True
-            st.session_state.progress_message = "Starting to load data..."
-            df = load_data(
-                file_path,
-                sample_size=sample_size if use_sampling else None,
-                progress_callback=progress_callback
-            )
-            st.session_state.df = df
-            st.session_state.data_loaded = True
-            st.session_state.loading_in_progress = False
-            st.session_state.refresh_data = False
-            if df is not None:
-                progress_container.success(f"✅ Data loading complete! Loaded {len(df):,} records")
-            else:
-                progress_container.error("❌ Data loading failed, please check the data file and format")
-        elif 'df' in st.session_state:
-            df = st.session_state.df
-            if df is not None:
-                progress_container.info(f"✅ Using cached data, {len(df):,} records")
-            else:
-                progress_container.error("❌ Cached data is invalid, please reload data")
+        load_action, source_key = plan_load(cache, file_path, requested_sample_size, st.session_state.get('refresh_data', False), random_seed)
+        df = load_dataset(load_action, source_key)
+        st.session_state.refresh_data = False
+        if df is None:
+            progress_container.error("❌ Data loading failed, please check the data file and format")
+        elif load_action == REUSE:
+            progress_container.info(f"✅ Using cached data, {len(df):,} records")
+        elif load_action == RESAMPLE:
+            progress_container.success(f"✅ Resampled {len(df):,} records from cached data")
         else:
-            st.session_state.loading_in_progress = True
-            st.session_state.progress_message = "Starting to load data..."
-            df = load_data(
-                file_path,
-                sample_size=sample_size if use_sampling else None,
-                progress_callback=progress_callback
+            progress_container.success(f"✅ Data loading complete! Loaded {len(df):,} records")
+        if df is not None and len(df) > 0 and use_sampling:
+            precision_key = ('sample_precision', st.session_state.get('data_version'))
+            intervals = cache.get(precision_key)
+            if intervals is None:
+                intervals = cache.put(precision_key, SampleEstimates().update(df).intervals(), kind='sampling')
+            with sampling_report_slot:
+                if len(intervals) > 0:
+                    targeted = intervals[intervals['in_target']]
+                    worst = targeted.loc[targeted['error'].idxmax()] if len(targeted) else intervals.loc[intervals['error'].idxmax()]
+                    if adaptive_sampling and requested_sample_size is None:
+                        st.caption(f"Target ±{target_error:.1%} not reached before the end of the file; using all rows.")
+                    st.caption(f"Achieved error ±{worst['error']:.1%} ({worst['statistic']}) at {DEFAULT_CONFIDENCE:.0%} confidence "
+                               f"over the {len(df):,} loaded rows, before filters")
+                    with st.expander("Sample Precision", expanded=False):
+                        st.caption("Estimated over all loaded rows, before the sidebar filters. "
+                                   "Average Views is shown for reference only; the target uses the geometric mean of views.")
+                        precision_df = intervals.assign(error=(intervals['error'] * 100).round(2))
+                        precision_df.columns = ['Statistic', 'Estimate', '± Half-Width', 'Error (%)', 'Error Kind', 'In Target']
+                        st.dataframe(precision_df, use_container_width=True, hide_index=True)
+    def render_filter_widgets():
+        min_views_default = st.session_state.get('min_views_default', 0)
+        max_views_default = st.session_state.get('max_views_default', 1000000)
+        selected_categories_default = st.session_state.get('selected_categories_default', [])
+        available_categories = st.session_state.get('available_categories', [])
+        with view_filter_slot:
+            col1, col2 = st.columns(2)
+            with col1:
+                min_views = st.number_input(
+                    "Minimum Views",
+                    min_value=0,
+                    value=min_views_default,
+                    step=1000,
+                    help="Filter out videos with views below this value",
+                    key="min_views"
+                )
+            with col2:
+                max_views = st.number_input(
+                    "Maximum Views",
+                    min_value=0,
+                    value=max_views_default,
+                    step=1000,
+                    help="Filter out videos with views above this value",
+                    key="max_views"
+                )
+        with category_filter_slot:
+            if 'available_categories' not in st.session_state:
+                st.session_state['available_categories'] = []
+            if 'selected_categories_default' not in st.session_state:
+                st.session_state['selected_categories_default'] = []
+            available_categories = st.session_state.get('available_categories', [])
+            display_categories = available_categories if available_categories else ["Entertainment", "Music", "Education", "Gaming", "Science & Technology"]
+            previous_selected = st.session_state.get('selected_categories_cache', [])
+            valid_defaults = [cat for cat in previous_selected if cat in display_categories]
+            if not valid_defaults and previous_selected:
+                valid_defaults = st.session_state['selected_categories_default']
+            selected_categories = st.multiselect(
+                "Select Video Categories",
+                options=display_categories,
+                default=valid_defaults,
+                key="selected_categories",
+                help="Select video categories to analyze, leave empty for all",
+                disabled=False
             )
-            st.session_state.df = df
-            st.session_state.data_loaded = True
-            st.session_state.loading_in_progress = False
+            st.session_state['selected_categories_cache'] = selected_categories
+            if st.session_state.get('loading_in_progress', False):
+                progress_info = st.session_state.get('loading_progress', {})
+                if progress_info.get('processed_rows', 0) > 0:
+                    progress_container = st.empty()
+                    total_rows = progress_info.get('total_rows', 100000)
+                    progress = min(progress_info['processed_rows'] / total_rows, 1.0)
+                    with progress_container.container():
+                        st.progress(progress)
+                        st.info(f"Loading data, processed {progress_info['processed_rows']:,} rows, " \
+                               f"found {len(available_categories)} categories...")
+                else:
+                    st.info("Data loading, category list will update in real time...")
+            elif 'prev_category_count' in st.session_state and \
+                 st.session_state['prev_category_count'] < len(available_categories):
+                st.info(f"Category list updated, now {len(available_categories)} categories available")
+            st.session_state['prev_category_count'] = len(available_categories)
     if df is not None:
         st.success(f"Successfully loaded data, total {len(df):,} records")
         if 'videoViewCount' in df.columns:
@@ -256,13 +354,7 @@ def main():
                 st.session_state['available_categories'] = []
         if 'selected_categories_default' not in st.session_state:
             st.session_state['selected_categories_default'] = []
-        needs_rerun = False
-        if 'videoViewCount' in df.columns and 'max_views_default' in st.session_state:
-            if 'prev_max_views_default' not in st.session_state or st.session_state['max_views_default'] != st.session_state['prev_max_views_default']:
-                st.session_state['prev_max_views_default'] = st.session_state['max_views_default']
-                needs_rerun = True
-        if needs_rerun:
-            st.rerun()
+        render_filter_widgets()
         min_views_val = st.session_state.get('min_views', 0)
         max_views_val = st.session_state.get('max_views', st.session_state.get('max_views_default', 1000000))
         selected_categories_val = st.session_state.get('selected_categories', [])
@@ -271,66 +363,97 @@ def main():
             filter_info.append(f"Min views: {min_views_val:,}")
         if max_views_val < 1000000:
             filter_info.append(f"Max views: {max_views_val:,}")
-        if selected_categories_val and selected_categories_val != ["Please wait for data loading to complete..."]:
+        if selected_categories_val and selected_categories_val != PLACEHOLDER_CATEGORIES:
             filter_info.append(f"Selected categories: {', '.join(selected_categories_val)}")
         if filter_info:
             st.info(f"Current filters: {', '.join(filter_info)}")
-        original_df = df.copy()
-        if 'videoViewCount' in df.columns:
-            if min_views_val >= 0:
-                original_count = len(df)
-                df = df[df['videoViewCount'] >= min_views_val]
-                if len(df) < original_count:
-                    st.info(f"Filtered out {original_count - len(df):,} videos with views less than {min_views_val:,}")
+        categories_to_filter = st.session_state.get('selected_categories_cache', selected_categories_val)
+        filter_outliers_val = st.session_state.get('filter_outliers', True)
+        outlier_settings = (
+            st.session_state.get('outlier_method', 'iqr'),
+            st.session_state.get('outlier_scale', 'log'),
+            st.session_state.get('outliers_per_category', True)
+        )
+        outlier_mask = None
+        if filter_outliers_val:
+            outlier_key = ('outliers', st.session_state.get('data_version')) + outlier_settings
+            cached_outliers = cache.get(outlier_key)
+            if cached_outliers is not None:
+                outlier_mask = cached_outliers[1]
             else:
-                st.warning("Minimum views cannot be negative, ignoring this filter.")
+                method, scale, per_category = outlier_settings
+                thresholds = OutlierThresholds.fit(df, group_col='categoryName' if per_category else None, method=method, scale=scale)
+                outlier_mask = thresholds.mask(df)
+                cache.put(outlier_key, (thresholds, outlier_mask), kind='mask')
+        positions, removed = filter_selection(
+            df,
+            min_views=min_views_val,
+            max_views=max_views_val,
+            categories=categories_to_filter,
+            filter_outliers=filter_outliers_val,
+            outlier_mask=outlier_mask
+        )
         if 'videoViewCount' in df.columns:
-            if max_views_val >= 0 and max_views_val >= min_views_val:
-                original_count = len(df)
-                df = df[df['videoViewCount'] <= max_views_val]
-                if len(df) < original_count:
-                    st.info(f"Filtered out {original_count - len(df):,} videos with views greater than {max_views_val:,}")
-            else:
+            if min_views_val < 0:
+                st.warning("Minimum views cannot be negative, ignoring this filter.")
+            elif removed.get('min_views', 0) > 0:
+                st.info(f"Filtered out {removed['min_views']:,} videos with views less than {min_views_val:,}")
+            if max_views_val < 0 or max_views_val < min_views_val:
                 st.warning("Maximum views setting is invalid, ignoring this filter.")
-        categories_to_filter = st.session_state.get('selected_categories_cache', selected_categories_val)
-        if categories_to_filter and categories_to_filter != ["Please wait for data loading to complete..."] and 'categoryName' in df.columns:
-            original_count = len(df)
-            df = df[df['categoryName'].isin(categories_to_filter)]
-            if len(df) < original_count:
-                st.info(f"Category filtering applied, showing {len(df):,} records (filtered out {original_count - len(df):,} records)")
-        elif categories_to_filter and categories_to_filter != ["Please wait for data loading to complete..."]:
+            elif removed.get('max_views', 0) > 0:
+                st.info(f"Filtered out {removed['max_views']:,} videos with views greater than {max_views_val:,}")
+        if 'categories' in removed:
+            if removed['categories'] > 0:
+                kept_after_categories = len(df) - removed.get('min_views', 0) - removed.get('max_views', 0) - removed['categories']
+                st.info(f"Category filtering applied, showing {kept_after_categories:,} records (filtered out {removed['categories']:,} records)")
+        elif categories_to_filter and categories_to_filter != PLACEHOLDER_CATEGORIES:
             st.warning("CategoryName column does not exist in the data, cannot apply category filtering.")
-        filter_outliers_val = st.session_state.get('filter_outliers', True)
         if filter_outliers_val:
-            original_count = len(df)
-            cols_to_process = ['videoViewCount', 'videoLikeCount', 'VideoCommentCount', 'subscriberCount']
-            cols_to_process = [col for col in cols_to_process if col in df.columns]
-            if cols_to_process:
-                valid_mask = pd.Series(True, index=df.index)
-                for col in cols_to_process:
-                    if pd.api.types.is_numeric_dtype(df[col]):
-                        Q1 = df[col].quantile(0.25)
-                        Q3 = df[col].quantile(0.75)
-                        IQR = Q3 - Q1
-                        lower_bound = Q1 - 1.5 * IQR
-                        upper_bound = Q3 + 1.5 * IQR
-                        valid_mask = valid_mask & (df[col] >= lower_bound) & (df[col] <= upper_bound)
-                df = df[valid_mask]
-                filtered_count = len(df)
-                if filtered_count < original_count:
-                    st.info(f"Filtered out {original_count - filtered_count:,} outlier records")
-                else:
-                    st.info("No outliers detected")
-            else:
+            if 'outliers' not in removed:
                 st.info("No numeric columns found for outlier filtering, skipping")
+            elif removed['outliers'] > 0:
+                method, scale, per_category = outlier_settings
+                scope = "per category" if per_category else "over all videos"
+                st.info(f"Filtered out {removed['outliers']:,} outlier records ({OUTLIER_METHODS[method]}, {OUTLIER_SCALES[scale].lower()}, {scope})")
+            else:
+                st.info("No outliers detected")
         else:
             st.info("Outlier filtering not applied")
-        df = engineer_features(df)
-        if len(df) == 0:
+        dataset_profile = st.session_state.get('dataset_profile')
+        if dataset_profile is None:
+            dataset_profile = DatasetProfile.from_frame(df)
+            st.session_state.dataset_profile = dataset_profile
+        if len(positions) == 0:
             st.warning("⚠️ No data after filtering! Please adjust filter criteria.")
             st.warning("⚠️ No data after filtering! Please adjust filter criteria.")
-            df = original_df
             st.info("Restored to original data state.")
+            profile = dataset_profile
+            view_key = (st.session_state.get('data_version'),)
+        else:
+            df = take_rows(df, positions)
+            view_key = (
+                st.session_state.get('data_version'),
+                min_views_val,
+                max_views_val,
+                tuple(categories_to_filter or ()),
+                filter_outliers_val,
+                outlier_settings
+            )
+            profile = cache.get(('view_profile',) + view_key)
+            if profile is None:
+                profile = view_profile(dataset_profile, df, removed, categories_to_filter)
+                cache.put(('view_profile',) + view_key, profile, kind='profile')
+        coordinator.applied(
+            current_dataset_key,
+            (min_views_val, max_views_val, tuple(categories_to_filter or ()), filter_outliers_val, outlier_settings),
+            load_action
+        )
+        channel_table = st.session_state.get('channel_table')
+        if channel_table is None or len(df) != len(st.session_state.df):
+            channel_table = cache.get(('channel_table',) + view_key)
+            if channel_table is None:
+                channel_table = build_channel_table(df)
+                cache.put(('channel_table',) + view_key, channel_table, kind='frame')
         st.subheader("Data Quality Report")
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -339,7 +462,7 @@ def main():
             st.metric("Number of Columns", f"{len(df.columns):,}")
         with col3:
             if len(df) > 0 and len(df.columns) > 0:
-                missing_data_pct = (df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
+                missing_data_pct = profile.missing_fraction() * 100
                 st.metric("Missing Data %", f"{missing_data_pct:.2f}%")
             else:
                 st.metric("Missing Data %", "N/A")
@@ -352,10 +475,26 @@ def main():
         with tabs[0]:
             intro.render(df)
         with tabs[1]:
-            overview.render(df, show_data_info)
+            overview.render(df, show_data_info, st.session_state.get('channel_sketches'), profile, cache, view_key)
         with tabs[2]:
-            deep_dives.render(df)
+            deep_dives.render(df, channel_table, st.session_state.get('channel_sketches'), cache, view_key, snapshots)
+        with st.sidebar:
+            cache_stats = cache.stats()
+            with st.expander("Session Memory", expanded=False):
+                st.metric("Cached", f"{cache_stats['bytes'] / 1024 / 1024:,.1f} / {cache_stats['budget_bytes'] / 1024 / 1024:,.0f} MiB")
+                st.caption(f"{cache_stats['entries']} entries · {cache_stats['hits']:,} hits · {cache_stats['misses']:,} misses · "
+                           f"{cache_stats['evictions']:,} evictions ({cache_stats['evicted_bytes'] / 1024 / 1024:,.1f} MiB freed)")
+                st.caption("Reruns: " + " · ".join(f"{count:,} {action}" for action, count in coordinator.counts.items()))
+                if cache_stats['kinds']:
+                    kinds_df = pd.DataFrame(
+                        [(kind, count, round(nbytes / 1024 / 1024, 2)) for kind, (count, nbytes) in cache_stats['kinds'].items()],
+                        columns=['Kind', 'Entries', 'MiB']
+                    )
+                    st.dataframe(kinds_df, use_container_width=True, hide_index=True)
         with tabs[3]:
-            conclusions.render(df)
+            conclusions.render(df, profile, cache, view_key)
+    else:
+        render_filter_widgets()
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
\ No newline at end of file
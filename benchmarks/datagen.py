@@ -0,0 +1,120 @@
+"""Synthetic YouTubeDataset_withChannelElapsed.csv generator for the benchmark suite."""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from utils.prep import CATEGORY_MAPPING
+SIZES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000
+}
+COLUMNS = [
+    'videoId', 'videoTitle', 'videoCategoryId', 'videoPublished', 'videoViewCount', 'videoLikeCount',
+    'videoDislikeCount', 'VideoCommentCount', 'elapsedtime', 'channelId', 'channelName', 'subscriberCount',
+    'channelViewCount', 'channelVideoCount', 'channelCommentCount', 'channelelapsedtime'
+]
+PUBLISHED_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+SNAPSHOT_TIME = pd.Timestamp('2023-01-01')
+FIRST_PUBLISH_TIME = pd.Timestamp('2006-01-01')
+MISSING_SENTINEL_RATE = 0.01
+def parse_size(size):
+    """Turn '100k' / '1m' / '250000' into a row count."""
+    key = str(size).lower()
+    if key in SIZES:
+        return SIZES[key]
+    return int(key.replace('_', ''))
+def _category_weights(rng):
+    """Zipf-like popularity over the category IDs known to engineer_features."""
+    category_ids = np.array(sorted(CATEGORY_MAPPING), dtype=np.int64)
+    ranks = rng.permutation(len(category_ids)) + 1
+    weights = 1.0 / ranks ** 1.2
+    return category_ids, weights / weights.sum()
+def _make_channels(rng, n_channels):
+    channel_ids = np.array([f"UC{i:022d}" for i in range(n_channels)], dtype=object)
+    channel_names = np.array([f"Channel {i}" for i in range(n_channels)], dtype=object)
+    channel_names[rng.random(n_channels) < 0.02] = ''
+    subscribers = np.floor(rng.lognormal(mean=9.0, sigma=2.5, size=n_channels))
+    channel_created = FIRST_PUBLISH_TIME.value + rng.random(n_channels) * (SNAPSHOT_TIME.value - FIRST_PUBLISH_TIME.value) * 0.8
+    return channel_ids, channel_names, subscribers, channel_created
+def generate_chunk(rng, n_rows, start_index, channels, category_ids, category_weights):
+    """Generate n_rows synthetic videos with heavy-tailed view, like and comment counts."""
+    channel_ids, channel_names, subscribers, channel_created = channels
+    n_channels = len(channel_ids)
+    channel_rank = np.minimum(rng.zipf(1.3, size=n_rows) - 1, n_channels - 1)
+    channel = (channel_rank * 7919) % n_channels
+    subs = subscribers[channel]
+    views = np.floor(rng.pareto(1.1, size=n_rows) * (subs * 0.05 + 50) * rng.lognormal(0.0, 1.0, size=n_rows))
+    likes = np.floor(views * rng.beta(2.0, 60.0, size=n_rows))
+    dislikes = np.floor(likes * rng.beta(1.0, 30.0, size=n_rows))
+    comments = np.floor(views * rng.beta(1.2, 400.0, size=n_rows))
+    for values in (likes, dislikes, comments):
+        missing = rng.random(n_rows) < MISSING_SENTINEL_RATE
+        values[missing] = rng.choice([-1.0, -2.0], size=missing.sum())
+    created = channel_created[channel]
+    published = created + rng.power(2.0, size=n_rows) * (SNAPSHOT_TIME.value - created)
+    published = pd.to_datetime(published.astype(np.int64)).floor('s')
+    elapsed_hours = (SNAPSHOT_TIME - published).total_seconds() / 3600
+    channel_elapsed_hours = (SNAPSHOT_TIME.value - created) / 3.6e12
+    index = np.arange(start_index, start_index + n_rows)
+    return pd.DataFrame({
+        'videoId': [f"v{i:010d}" for i in index],
+        'videoTitle': [f"Video {i}" for i in index],
+        'videoCategoryId': rng.choice(category_ids, size=n_rows, p=category_weights),
+        'videoPublished': published.strftime(PUBLISHED_FORMAT),
+        'videoViewCount': views,
+        'videoLikeCount': likes,
+        'videoDislikeCount': dislikes,
+        'VideoCommentCount': comments,
+        'elapsedtime': np.round(elapsed_hours, 1),
+        'channelId': channel_ids[channel],
+        'channelName': channel_names[channel],
+        'subscriberCount': subs,
+        'channelViewCount': np.floor(subs * rng.lognormal(3.0, 1.0, size=n_rows)),
+        'channelVideoCount': np.floor(rng.lognormal(4.0, 1.2, size=n_rows)),
+        'channelCommentCount': np.floor(subs * rng.beta(1.0, 50.0, size=n_rows)),
+        'channelelapsedtime': np.round(channel_elapsed_hours, 1)
+    }, columns=COLUMNS)
+def write_dataset(path, n_rows, seed=42, chunk_rows=500_000):
+    """Write an n_rows synthetic dataset to path as CSV, generating it chunk by chunk."""
+    rng = np.random.default_rng(seed)
+    category_ids, category_weights = _category_weights(rng)
+    channels = _make_channels(rng, max(50, n_rows // 40))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    written = 0
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        while written < n_rows:
+            n = min(chunk_rows, n_rows - written)
+            chunk = generate_chunk(rng, n, written, channels, category_ids, category_weights)
+            chunk.to_csv(f, index=False, header=written == 0)
+            written += n
+    os.replace(tmp_path, path)
+    return path
+def generate_dataset(n_rows, seed=42):
+    """Return an in-memory synthetic dataset with n_rows rows."""
+    rng = np.random.default_rng(seed)
+    category_ids, category_weights = _category_weights(rng)
+    channels = _make_channels(rng, max(50, n_rows // 40))
+    return generate_chunk(rng, n_rows, 0, channels, category_ids, category_weights)
+def dataset_path(data_dir, size, seed=42):
+    return os.path.join(data_dir, f"youtube_synthetic_{parse_size(size)}_s{seed}.csv")
+def ensure_dataset(data_dir, size, seed=42):
+    """Return the cached synthetic CSV for size, generating it on first use."""
+    path = dataset_path(data_dir, size, seed)
+    if not os.path.exists(path):
+        write_dataset(path, parse_size(size), seed=seed)
+    return path
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic YouTube datasets for benchmarking")
+    parser.add_argument('--sizes', default='10k,100k', help="Comma separated sizes (10k, 100k, 1m, 10m or row counts)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default=os.path.join('benchmarks', '.data'))
+    args = parser.parse_args()
+    for size in args.sizes.split(','):
+        print(ensure_dataset(args.data_dir, size.strip(), seed=args.seed))
+if __name__ == "__main__":
+    main()
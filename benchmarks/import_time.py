@@ -0,0 +1,84 @@
+"""Cold-start import-time report for the app modules, checked against a budget.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` so the
+numbers reflect what a new Streamlit worker pays.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget benchmarks/import_budget.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+APP_MODULES = [
+    'utils.prep',
+    'utils.filters',
+    'utils.io',
+    'utils.viz',
+    'utils.viz_enhanced',
+    'sections.intro',
+    'sections.overview',
+    'sections.deep_dives',
+    'sections.conclusions'
+]
+DEFAULT_BUDGET_PATH = os.path.join(os.path.dirname(__file__), 'import_budget.json')
+def parse_importtime(stderr):
+    """Map module name -> (self_us, cumulative_us) from ``-X importtime`` output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+def measure_module(module, repeat=3):
+    """Best-of-repeat cold import of module; returns cumulative ms and the modules it pulled in."""
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+        timings = parse_importtime(proc.stderr)
+        cumulative_ms = timings[module][1] / 1000 if module in timings else None
+        if best is None or (cumulative_ms is not None and cumulative_ms < best['cumulative_ms']):
+            best = {'cumulative_ms': cumulative_ms, 'imported': sorted(timings)}
+    return best
+def load_budget(path=DEFAULT_BUDGET_PATH):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+def check_budget(report, budget):
+    """Return human-readable budget violations (time over budget or forbidden imports)."""
+    violations = []
+    forbidden = budget.get('forbidden_imports', [])
+    for module, result in report.items():
+        limit = budget.get('modules', {}).get(module, budget.get('default_ms'))
+        if limit is not None and result['cumulative_ms'] is not None and result['cumulative_ms'] > limit:
+            violations.append(f"{module}: {result['cumulative_ms']:.0f} ms exceeds budget of {limit} ms")
+        pulled_in = [name for name in result['imported'] if name.split('.')[0] in forbidden]
+        if pulled_in:
+            roots = sorted({name.split('.')[0] for name in pulled_in})
+            violations.append(f"{module}: imports {', '.join(roots)} at import time")
+    return violations
+def run_import_report(modules=None, repeat=3):
+    return {module: measure_module(module, repeat=repeat) for module in (modules or APP_MODULES)}
+def print_import_report(report):
+    print("\n== Cold import time ==")
+    for module, result in report.items():
+        value = f"{result['cumulative_ms']:9.1f} ms" if result['cumulative_ms'] is not None else "      n/a"
+        print(f"  {module:<40} {value}  ({len(result['imported'])} modules)")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report cold-start import time per app module")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--budget', default=DEFAULT_BUDGET_PATH)
+    args = parser.parse_args(argv)
+    report = run_import_report(repeat=args.repeat)
+    print_import_report(report)
+    violations = check_budget(report, load_budget(args.budget))
+    for violation in violations:
+        print(f"  BUDGET: {violation}")
+    return 1 if violations else 0
+if __name__ == "__main__":
+    sys.exit(main())
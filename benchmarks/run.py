@@ -0,0 +1,297 @@
+"""Benchmark suite: times the data pipeline, chart builders and exports on synthetic datasets.
+
+Usage:
+    python -m benchmarks.run --sizes 10k,100k --output benchmarks/results/latest.json
+    python -m benchmarks.run --sizes 10k --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.datagen import ensure_dataset, parse_size
+from benchmarks.import_time import (
+    DEFAULT_BUDGET_PATH,
+    check_budget,
+    load_budget,
+    print_import_report,
+    run_import_report
+)
+EXCEL_MAX_ROWS = 1_048_575
+DEFAULT_TOLERANCE = 0.25
+MIN_COMPARABLE_SECONDS = 0.01
+def peak_rss_mb():
+    """Process high-water resident set size in MiB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+def rerun_peak_mb(func, *args):
+    """Peak memory allocated while func runs, in MiB: traced numpy/Python peak plus Arrow buffers still held at return."""
+    import tracemalloc
+    try:
+        import pyarrow
+        arrow_before = pyarrow.total_allocated_bytes()
+    except ImportError:
+        pyarrow = None
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if pyarrow is not None:
+        peak += max(pyarrow.total_allocated_bytes() - arrow_before, 0)
+    del result
+    return round(peak / (1024 * 1024), 1)
+def _rerun(df, outlier_mask=None):
+    """Data path of one app rerun after loading: filter selection, one take, per-chart column views."""
+    import numpy as np
+    from utils.channels import build_channel_table
+    from utils.filters import filter_selection, take_rows
+    categories = df['categoryName'].dropna().unique().tolist()[:5]
+    positions, _ = filter_selection(df, 0, 1000000, categories, True, outlier_mask)
+    view = take_rows(df, positions)
+    build_channel_table(view)
+    for col in ['like_rate', 'comment_rate']:
+        take_rows(view, np.flatnonzero(view[col].notna().to_numpy()), ['categoryName', col])
+    return view
+def _chart_jobs(df):
+    """Builder calls mirroring what sections.deep_dives renders."""
+    import pandas as pd
+    from utils import viz_enhanced as viz
+    from utils.channels import build_channel_table
+    from utils.timeseries import TimeSeriesCube
+    numeric_cols = ['videoViewCount', 'subscriberCount', 'videoLikeCount', 'videoDislikeCount', 'VideoCommentCount']
+    available_cols = [col for col in numeric_cols if col in df.columns]
+    category_counts = df['categoryName'].value_counts()
+    category_counts = category_counts[category_counts > 0]
+    category_df = pd.DataFrame({'Category': category_counts.index, 'Count': category_counts.values})
+    yearly_counts = TimeSeriesCube.from_frame(df).resample('Year')
+    monthly_counts = df.groupby('publishMonth').size().reset_index()
+    monthly_counts.columns = ['Month', 'Video Count']
+    jobs = [
+        ('category_distribution', viz.create_enhanced_category_distribution_chart, (df,)),
+        ('category_bar', viz.create_enhanced_horizontal_bar_chart, (category_df, 'Count', 'Category', "Number of Videos by Category")),
+        ('correlation_heatmap', viz.create_enhanced_correlation_heatmap, (df, available_cols)),
+        ('scatter_matrix', viz.create_enhanced_scatter_plot_matrix, (df, available_cols, "Main Indicators Scatter Matrix")),
+        ('yearly_time_series', viz.create_enhanced_time_series_chart, (yearly_counts, 'Period', 'Video Count', "Annual Video Publishing Trend")),
+        ('monthly_bar', viz.create_enhanced_vertical_bar_chart, (monthly_counts, 'Month', 'Video Count', "Monthly Video Publishing Distribution")),
+        ('channel_performance', viz.create_channel_performance_comparison_chart, (df, 10, build_channel_table(df))),
+        ('engagement_score_distribution', viz.create_engagement_score_distribution_chart, (df,))
+    ]
+    for col in ['like_rate', 'comment_rate']:
+        valid = df[df[col].notna()]
+        jobs.append((f'{col}_histogram', viz.create_enhanced_histogram_chart, (valid, col, f"{col} Distribution")))
+        jobs.append((f'{col}_box', viz.create_enhanced_box_plot, (valid, 'categoryName', col, f"{col} by Video Category")))
+    return jobs
+def _payload_sizes(chart_jobs):
+    """Websocket payload bytes per chart: plain Plotly JSON vs. the compact typed-array and JSON encodings."""
+    import plotly.io as pio
+    from utils.figure_payload import compact_figure
+    payloads = {}
+    for name, builder, args in chart_jobs:
+        fig = builder(*args)
+        if fig is None:
+            continue
+        payloads[name] = {
+            'json_bytes': len(pio.to_json(fig)),
+            'typed_bytes': compact_figure(fig, typed=True)[1],
+            'compact_json_bytes': compact_figure(fig, typed=False)[1]
+        }
+    return payloads
+def _timed(results, name, func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    results[name] = {
+        'seconds': round(time.perf_counter() - start, 6),
+        'peak_rss_mb': peak_rss_mb()
+    }
+    return value
+def run_worker(data_path, repeat=1):
+    """Run every stage once (load) or `repeat` times (the rest) in this process."""
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    from utils.io import load_data, export_dataframe
+    from utils.prep import engineer_features
+    from utils.kernels import DEFAULT_BACKEND, engagement_metrics
+    from utils.filters import apply_filter_chain
+    from utils.timeseries import TimeSeriesCube
+    from utils.seasonal import SeasonalCube
+    from utils.channels import build_channel_table
+    from utils.profile import DatasetProfile
+    from utils.outliers import OutlierThresholds
+    from utils.scheduler import build_figures
+    import plotly.express as px
+    px.bar(x=[0], y=[0])
+    stages = {}
+    df = _timed(stages, 'load_data', load_data, data_path)
+    if df is None or len(df) == 0:
+        raise RuntimeError(f"load_data returned no data for {data_path}")
+    raw = df.drop(columns=[col for col in ['categoryName', 'views_per_subscriber', 'like_rate', 'comment_rate',
+                                           'engagement_score', 'dislike_rate', 'season', 'net_likes',
+                                           'like_to_dislike_ratio'] if col in df.columns])
+    def best_of(name, func, *args):
+        runs = {}
+        value = None
+        for i in range(repeat):
+            value = _timed(runs, i, func, *args)
+        stages[name] = min(runs.values(), key=lambda r: r['seconds'])
+        stages[name]['peak_rss_mb'] = peak_rss_mb()
+        return value
+    best_of('engineer_features', engineer_features, raw)
+    best_of(f'kernels.engagement_{DEFAULT_BACKEND}', engagement_metrics, raw)
+    del raw
+    best_of('filter_chain', apply_filter_chain, df, 0, 1000000, [], True)
+    thresholds = best_of('outliers.fit', OutlierThresholds.fit, df)
+    outlier_mask = best_of('outliers.mask', thresholds.mask, df)
+    best_of('rerun', _rerun, df, outlier_mask)
+    stages['rerun']['rerun_peak_mb'] = rerun_peak_mb(_rerun, df, outlier_mask)
+    best_of('channels.table', build_channel_table, df)
+    profile = best_of('profile.build', DatasetProfile.from_frame, df)
+    categories = df['categoryName'].dropna().unique().tolist()[:5]
+    best_of('profile.subset_describe', lambda: profile.subset(categories).describe())
+    best_of('timeseries.cube', lambda frame: TimeSeriesCube.from_frame(frame).resample('Day'), df)
+    best_of('seasonal.cube', lambda frame: SeasonalCube.from_frame(frame).seasonal_index(), df)
+    chart_jobs = _chart_jobs(df)
+    for name, builder, args in chart_jobs:
+        best_of(f'viz.{name}', builder, *args)
+    scheduled_jobs = [(builder, args, {}) for _, builder, args in chart_jobs]
+    best_of('viz.all_sequential', build_figures, scheduled_jobs, 1)
+    best_of('viz.all_scheduled', build_figures, scheduled_jobs)
+    best_of('export.csv', export_dataframe, df, "CSV")
+    best_of('export.json', export_dataframe, df, "JSON")
+    if len(df) <= EXCEL_MAX_ROWS:
+        best_of('export.excel', export_dataframe, df, "Excel")
+    else:
+        stages['export.excel'] = {'skipped': f"{len(df):,} rows exceed the Excel sheet limit"}
+    return {'rows': len(df), 'stages': stages, 'payloads': _payload_sizes(chart_jobs)}
+def run_size(data_path, repeat=1):
+    """Run the worker in a fresh interpreter so peak RSS is per dataset size."""
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = os.path.join(tmp, 'result.json')
+        cmd = [sys.executable, '-m', 'benchmarks.run', '--worker', data_path,
+               '--result-file', result_path, '--repeat', str(repeat)]
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Benchmark worker failed for {data_path}:\n{proc.stderr[-4000:]}")
+        with open(result_path, encoding='utf-8') as f:
+            return json.load(f)
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+def compare_results(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return (size, stage, metric, baseline, current, ratio) rows that regressed beyond tolerance."""
+    regressions = []
+    for size, size_result in current['results'].items():
+        base_size = baseline.get('results', {}).get(size)
+        if not base_size:
+            continue
+        for stage, metrics in size_result['stages'].items():
+            base_metrics = base_size['stages'].get(stage)
+            if not base_metrics or 'seconds' not in metrics or 'seconds' not in base_metrics:
+                continue
+            checks = [('seconds', MIN_COMPARABLE_SECONDS), ('peak_rss_mb', 1.0), ('rerun_peak_mb', 1.0)]
+            for metric, floor in checks:
+                new_value, old_value = metrics.get(metric), base_metrics.get(metric)
+                if new_value is None or old_value is None or max(new_value, old_value) < floor:
+                    continue
+                ratio = new_value / max(old_value, floor)
+                if ratio > 1 + tolerance:
+                    regressions.append((size, stage, metric, old_value, new_value, ratio))
+    return regressions
+def print_report(report):
+    for size, size_result in report['results'].items():
+        print(f"\n== {size} ({size_result['rows']:,} rows) ==")
+        for stage, metrics in size_result['stages'].items():
+            if 'skipped' in metrics:
+                print(f"  {stage:<40} skipped: {metrics['skipped']}")
+            else:
+                rss = metrics.get('peak_rss_mb')
+                rss_text = f"{rss:9.1f} MiB" if rss is not None else "      n/a"
+                extra = f"  rerun peak +{metrics['rerun_peak_mb']:.1f} MiB" if metrics.get('rerun_peak_mb') is not None else ""
+                print(f"  {stage:<40} {metrics['seconds']:10.4f} s  peak RSS {rss_text}{extra}")
+        if size_result.get('payloads'):
+            print("  -- chart payload (KiB): plain JSON / typed arrays / compact JSON --")
+            for name, sizes in size_result['payloads'].items():
+                print(f"  {name:<40} {sizes['json_bytes'] / 1024:10.1f} {sizes['typed_bytes'] / 1024:10.1f} {sizes['compact_json_bytes'] / 1024:10.1f}")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the YouTube visualization benchmark suite")
+    parser.add_argument('--sizes', default='10k,100k', help="Comma separated sizes: 10k, 100k, 1m, 10m or row counts")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="Repetitions per stage (best time is kept)")
+    parser.add_argument('--data-dir', default=os.path.join('benchmarks', '.data'))
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'results', 'latest.json'))
+    parser.add_argument('--baseline', help="Results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown before failing")
+    parser.add_argument('--skip-imports', action='store_true', help="Skip the cold import-time report")
+    parser.add_argument('--import-budget', default=DEFAULT_BUDGET_PATH, help="Import-time budget file")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker:
+        result = run_worker(args.worker, repeat=args.repeat)
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return 0
+    report = {
+        'meta': {
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat
+        },
+        'results': {}
+    }
+    import_violations = []
+    if not args.skip_imports:
+        import_report = run_import_report()
+        print_import_report(import_report)
+        import_violations = check_budget(import_report, load_budget(args.import_budget))
+        report['imports'] = {
+            module: {'cumulative_ms': result['cumulative_ms'], 'modules': len(result['imported'])}
+            for module, result in import_report.items()
+        }
+        report['import_budget_violations'] = import_violations
+    for size in [s.strip() for s in args.sizes.split(',') if s.strip()]:
+        data_path = ensure_dataset(args.data_dir, size, seed=args.seed)
+        print(f"Running benchmarks for {size} ({parse_size(size):,} rows)...", flush=True)
+        report['results'][size] = run_size(data_path, repeat=args.repeat)
+    print_report(report)
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    status = 0
+    if import_violations:
+        print(f"\n{len(import_violations)} import budget violation(s):")
+        for violation in import_violations:
+            print(f"  {violation}")
+        status = 1
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for size, stage, metric, old_value, new_value, ratio in regressions:
+                print(f"  {size:<6} {stage:<40} {metric:<12} {old_value:.4f} -> {new_value:.4f} (x{ratio:.2f})")
+            return 1
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return status
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,11 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-def render(df):
+from utils.insights import cached_insights
+def render(df, profile=None, cache=None, view_key=None):
     st.header("Conclusions & Insights")
     st.subheader("Data Insights Summary")
     st.write("Based on visualization analysis, we can draw the following insights:")
-    insights = []
-    if 'categoryName' in df.columns:
-        top_category = df['categoryName'].value_counts().idxmax()
-        insights.append(f"1. The most popular video category is **{top_category}** with the highest number of videos.")
-    if 'videoViewCount' in df.columns:
-        avg_views = df['videoViewCount'].mean()
-        insights.append(f"2. The average views per video in the dataset is approximately **{avg_views:,.0f}**.")
-    if all(col in df.columns for col in ['videoLikeCount', 'videoViewCount']):
-        valid_likes = df[(df['videoViewCount'] > 0) & (df['videoLikeCount'].notna())]
-        if len(valid_likes) > 0:
-            avg_like_rate = (valid_likes['videoLikeCount'] / valid_likes['videoViewCount']).mean() * 100
-            insights.append(f"3. The average like rate is approximately **{avg_like_rate:.2f}%**.")
-    if 'publishYear' in df.columns:
-        recent_year = df['publishYear'].max()
-        insights.append(f"4. The most recent videos were published in **{recent_year}**.")
-    if 'engagement_score' in df.columns:
-        top_videos = df.nlargest(5, 'engagement_score')
-        if not top_videos.empty:
-            insights.append(f"5. Based on comprehensive scoring, the best performing videos have high engagement.")
-    if 'like_rate' in df.columns and 'comment_rate' in df.columns:
-        correlation = df['like_rate'].corr(df['comment_rate'])
-        if not np.isnan(correlation):
-            insights.append(f"6. The correlation between like rate and comment rate is **{correlation:.2f}**, indicating a {'strong' if abs(correlation) > 0.5 else 'weak'} correlation between user engagement behaviors.")
+    insights = [f"{i}. {text}" for i, (_, text) in enumerate(cached_insights(cache, view_key, df, profile), start=1)]
     for insight in insights:
         st.write(insight)
     st.write("\nThrough these visualization analyses, we can better understand content performance and user behavior patterns on the YouTube platform.")
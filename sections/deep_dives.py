@@ -12,11 +12,24 @@ from utils.viz_enhanced import (
     create_channel_performance_comparison_chart,
     create_engagement_score_distribution_chart,
     create_enhanced_horizontal_bar_chart,
-    create_enhanced_vertical_bar_chart
+    create_enhanced_vertical_bar_chart,
+    create_webgl_scatter_chart,
+    create_approximate_top_channels_chart,
+    WEBGL_POINT_THRESHOLD
 )
-def render(df):
+from utils.catalog import SNAPSHOT_METRICS, cached_snapshots, compare_snapshots, snapshot_channel_aggregates
+from utils.channels import build_channel_table, channel_display_names
+from utils.filters import take_rows
+from utils.kernels import DEFAULT_BACKEND, DEFAULT_SCORE_WEIGHTS
+from utils.seasonal import SEASONAL_INDEX_BASES, SeasonalCube
+from utils.snapshot_diff import VIDEO_HASH_COLUMN, VIDEO_KEY_COLUMN, SnapshotKeys, channel_growth, diff_snapshots
+from utils.scheduler import PROGRESSIVE_MIN_ROWS, PROGRESSIVE_SAMPLE_ROWS, ChartScheduler
+from utils.timeseries import DEFAULT_MAX_POINTS, GRANULARITIES, TIME_SERIES_METRICS, TimeSeriesCube
+def render(df, channel_table=None, channel_sketches=None, cache=None, view_key=None, snapshots=None):
     st.header("Deep Dives")
-    df_copy = df.copy()
+    if channel_table is None:
+        channel_table = build_channel_table(df)
+    charts = ChartScheduler(cache=cache, cache_key=view_key)
     st.subheader("Data Visualization Analysis")
     layout_col = st.columns([1, 3], gap="medium")
     with layout_col[0]:
@@ -27,6 +40,21 @@ def render(df):
         )
         show_annotations = st.checkbox("Show Data Labels", value=True)
         show_legend = st.checkbox("Show Legend", value=True)
+        render_mode_label = st.selectbox(
+            "Point Rendering",
+            ["Auto", "WebGL", "SVG"],
+            index=0,
+            help=f"Auto switches point charts to WebGL above {WEBGL_POINT_THRESHOLD:,} points"
+        )
+        render_mode = render_mode_label.lower()
+        progressive = st.checkbox(
+            "Progressive Rendering",
+            value=True,
+            help=f"Above {PROGRESSIVE_MIN_ROWS:,} rows, show charts from a {PROGRESSIVE_SAMPLE_ROWS:,}-row stratified sample first and refine them with all rows"
+        )
+    charts.progressive = progressive
+    refine_status = st.empty()
+    compare_snapshots_tab = snapshots is not None and len(snapshots) > 1
     viz_tabs = st.tabs([
         "Category Distribution Analysis",
         "Correlation Analysis",
@@ -34,101 +62,111 @@ def render(df):
         "Time Trend Analysis",
         "Comprehensive Performance Analysis",
         "Seasonal Analysis"
-    ])
+    ] + (["Snapshot Comparison"] if compare_snapshots_tab else []))
     with viz_tabs[0]:
         st.header("Video Category Distribution")
-        if 'categoryName' in df_copy.columns:
-            fig_pie = create_enhanced_category_distribution_chart(df_copy)
-            if fig_pie:
-                st.plotly_chart(fig_pie, use_container_width=True)
-            category_counts = df_copy['categoryName'].value_counts()
+        if 'categoryName' in df.columns:
+            charts.add(create_enhanced_category_distribution_chart, df)
+            category_counts = df['categoryName'].value_counts()
+            category_counts = category_counts[category_counts > 0]
             category_df = pd.DataFrame({
                 'Category': category_counts.index,
                 'Count': category_counts.values
             })
-            fig_bar = create_enhanced_horizontal_bar_chart(category_df, 'Count', 'Category', "Number of Videos by Category")
-            if fig_bar:
-                st.plotly_chart(fig_bar, use_container_width=True)
+            charts.add(create_enhanced_horizontal_bar_chart, category_df, 'Count', 'Category', "Number of Videos by Category")
         else:
             st.warning("Category data is not available")
     with viz_tabs[1]:
         st.header("Key Metrics Correlation Analysis")
         numeric_cols = ['videoViewCount', 'subscriberCount', 'videoLikeCount', 'videoDislikeCount', 'VideoCommentCount']
-        available_cols = [col for col in numeric_cols if col in df_copy.columns]
+        available_cols = [col for col in numeric_cols if col in df.columns]
         if len(available_cols) >= 2:
-            fig_heatmap = create_enhanced_correlation_heatmap(df_copy, available_cols)
-            if fig_heatmap:
-                st.plotly_chart(fig_heatmap, use_container_width=True)
+            charts.add(create_enhanced_correlation_heatmap, df, available_cols)
             st.subheader("Scatter Matrix Analysis")
             if len(available_cols) >= 3:
-                fig_scatter_matrix = create_enhanced_scatter_plot_matrix(df_copy, available_cols, "Main Indicators Scatter Matrix")
-                if fig_scatter_matrix:
-                    st.plotly_chart(fig_scatter_matrix, use_container_width=True)
+                charts.add(create_enhanced_scatter_plot_matrix, df, available_cols, "Main Indicators Scatter Matrix", render_mode=render_mode)
+            if all(col in df.columns for col in ['videoViewCount', 'videoLikeCount', 'subscriberCount']):
+                st.subheader("Views vs. Likes vs. Subscribers")
+                charts.add(
+                    create_webgl_scatter_chart,
+                    df, 'videoViewCount', 'videoLikeCount', color_col='subscriberCount',
+                    title="Views vs. Likes (colored by subscribers)", render_mode=render_mode
+                )
         else:
             st.warning("Insufficient numerical columns for correlation analysis")
     with viz_tabs[2]:
         st.header("User Engagement Metrics Analysis")
-        engagement_cols = []
-        if all(col in df_copy.columns for col in ['videoLikeCount', 'videoViewCount']):
-            df_copy['like_rate'] = np.nan
-            mask = df_copy['videoViewCount'] > 0
-            df_copy.loc[mask, 'like_rate'] = df_copy.loc[mask, 'videoLikeCount'] / df_copy.loc[mask, 'videoViewCount']
-            outlier_mask = df_copy['like_rate'] > 1
-            if outlier_mask.any():
-                st.info(f"Detected {outlier_mask.sum()} abnormal video data (likes > views), processed")
-                df_copy.loc[outlier_mask, 'like_rate'] = 1.0
-            engagement_cols.append('like_rate')
-        if all(col in df_copy.columns for col in ['VideoCommentCount', 'videoViewCount']):
-            df_copy['comment_rate'] = np.nan
-            mask = df_copy['videoViewCount'] > 0
-            df_copy.loc[mask, 'comment_rate'] = df_copy.loc[mask, 'VideoCommentCount'] / df_copy.loc[mask, 'videoViewCount']
-            engagement_cols.append('comment_rate')
+        engagement_cols = [col for col in ['like_rate', 'comment_rate'] if col in df.columns]
+        if 'like_rate' in engagement_cols:
+            abnormal_count = int(((df['videoLikeCount'] > df['videoViewCount']) & (df['videoViewCount'] > 0)).sum())
+            if abnormal_count > 0:
+                st.info(f"Detected {abnormal_count} abnormal video data (likes > views), processed")
         if len(engagement_cols) > 0:
             for col in engagement_cols:
-                fig_hist = create_enhanced_histogram_chart(df_copy[df_copy[col].notna()], col, f"{col.replace('_', ' ').title()} Distribution")
-                if fig_hist:
-                    st.plotly_chart(fig_hist, use_container_width=True)
-            if 'categoryName' in df_copy.columns and len(engagement_cols) > 0:
+                valid_rows = np.flatnonzero(df[col].notna().to_numpy())
+                charts.add(create_enhanced_histogram_chart, take_rows(df, valid_rows, [col]), col, f"{col.replace('_', ' ').title()} Distribution")
+            if 'categoryName' in df.columns and len(engagement_cols) > 0:
                 for col in engagement_cols:
-                    valid_data = df_copy[df_copy[col].notna()]
+                    valid_data = take_rows(df, np.flatnonzero(df[col].notna().to_numpy()), ['categoryName', col])
                     if len(valid_data) > 0:
-                        fig_box = create_enhanced_box_plot(valid_data, 'categoryName', col, f"{col.replace('_', ' ').title()} by Video Category")
-                        if fig_box:
-                            st.plotly_chart(fig_box, use_container_width=True)
+                        charts.add(create_enhanced_box_plot, valid_data, 'categoryName', col, f"{col.replace('_', ' ').title()} by Video Category")
         else:
             st.warning("Insufficient engagement data for analysis")
     with viz_tabs[3]:
         st.header("Publishing Time Trend Analysis")
-        if 'publishYear' in df_copy.columns:
-            yearly_counts = df_copy.groupby('publishYear').size().reset_index()
+        time_series_cube = cache.get(('time_series_cube',) + tuple(view_key)) if cache is not None and view_key is not None else None
+        if time_series_cube is None:
+            time_series_cube = TimeSeriesCube.from_frame(df)
+            if time_series_cube is not None and cache is not None and view_key is not None:
+                cache.put(('time_series_cube',) + tuple(view_key), time_series_cube, kind='aggregate', nbytes=time_series_cube.nbytes)
+        if time_series_cube is not None and len(time_series_cube.days) > 0:
+            trend_cols = st.columns(3)
+            with trend_cols[0]:
+                granularity = st.selectbox("Time Granularity", GRANULARITIES, index=0)
+            with trend_cols[1]:
+                trend_metric = st.selectbox(
+                    "Trend Metric",
+                    ['Video Count'] + [f"{agg} {label}" for label in TIME_SERIES_METRICS for agg in ['Total', 'Median']],
+                    index=0
+                )
+            with trend_cols[2]:
+                trend_log_scale = st.checkbox("Log Scale", value=False, help="Use a logarithmic y axis for heavy-tailed metrics")
+            series = time_series_cube.resample(granularity)
+            if trend_metric in series.columns:
+                title = "Annual Video Publishing Trend" if granularity == 'Year' and trend_metric == 'Video Count' else f"{trend_metric} per {granularity}"
+                charts.add(
+                    create_enhanced_time_series_chart,
+                    series, 'Period', trend_metric, title,
+                    log_y=trend_log_scale, max_points=DEFAULT_MAX_POINTS
+                )
+                if len(series) > DEFAULT_MAX_POINTS:
+                    st.caption(f"{len(series):,} {granularity.lower()} buckets downsampled to {DEFAULT_MAX_POINTS:,} points (LTTB)")
+            else:
+                st.warning(f"{trend_metric} is not available in the data")
+            if 'publishMonth' in df.columns:
+                monthly_counts = df.groupby('publishMonth').size().reset_index()
+                monthly_counts.columns = ['Month', 'Video Count']
+                charts.add(create_enhanced_vertical_bar_chart, monthly_counts, 'Month', 'Video Count', "Monthly Video Publishing Distribution")
+        elif 'publishYear' in df.columns:
+            yearly_counts = df.groupby('publishYear').size().reset_index()
             yearly_counts.columns = ['Year', 'Video Count']
-            fig_yearly = create_enhanced_time_series_chart(yearly_counts, 'Year', 'Video Count', "Annual Video Publishing Trend")
-            if fig_yearly:
-                st.plotly_chart(fig_yearly, use_container_width=True)
-            if 'publishMonth' in df_copy.columns:
-                monthly_counts = df_copy.groupby('publishMonth').size().reset_index()
+            charts.add(create_enhanced_time_series_chart, yearly_counts, 'Year', 'Video Count', "Annual Video Publishing Trend")
+            if 'publishMonth' in df.columns:
+                monthly_counts = df.groupby('publishMonth').size().reset_index()
                 monthly_counts.columns = ['Month', 'Video Count']
-                fig_monthly = create_enhanced_vertical_bar_chart(monthly_counts, 'Month', 'Video Count', "Monthly Video Publishing Distribution")
-                if fig_monthly:
-                    st.plotly_chart(fig_monthly, use_container_width=True)
-        elif 'publishDate' in df_copy.columns:
+                charts.add(create_enhanced_vertical_bar_chart, monthly_counts, 'Month', 'Video Count', "Monthly Video Publishing Distribution")
+        elif 'publishDate' in df.columns:
             try:
-                if pd.api.types.is_datetime64_any_dtype(df_copy['publishDate']):
-                    yearly_counts = df_copy.groupby(df_copy['publishDate'].dt.year).size().reset_index()
+                if pd.api.types.is_datetime64_any_dtype(df['publishDate']):
+                    yearly_counts = df.groupby(df['publishDate'].dt.year).size().reset_index()
                 else:
-                    df_temp = df_copy.copy()
-                    df_temp['year'] = pd.to_datetime(df_temp['publishDate'], errors='coerce').dt.year
-                    yearly_counts = df_temp.groupby('year').size().reset_index()
+                    yearly_counts = df.groupby(pd.to_datetime(df['publishDate'], errors='coerce').dt.year.rename('year')).size().reset_index()
                 yearly_counts.columns = ['Year', 'Video Count']
-                fig_yearly = create_enhanced_time_series_chart(yearly_counts, 'Year', 'Video Count', "Annual Video Publishing Trend")
-                if fig_yearly:
-                    st.plotly_chart(fig_yearly, use_container_width=True)
-                if 'publishMonth' in df_copy.columns:
-                    monthly_counts = df_copy.groupby('publishMonth').size().reset_index()
+                charts.add(create_enhanced_time_series_chart, yearly_counts, 'Year', 'Video Count', "Annual Video Publishing Trend")
+                if 'publishMonth' in df.columns:
+                    monthly_counts = df.groupby('publishMonth').size().reset_index()
                     monthly_counts.columns = ['Month', 'Video Count']
-                    fig_monthly = create_enhanced_vertical_bar_chart(monthly_counts, 'Month', 'Video Count', "Monthly Video Publishing Distribution")
-                    if fig_monthly:
-                        st.plotly_chart(fig_monthly, use_container_width=True)
+                    charts.add(create_enhanced_vertical_bar_chart, monthly_counts, 'Month', 'Video Count', "Monthly Video Publishing Distribution")
             except Exception as e:
                 st.warning(f"Error processing year data: {str(e)}")
         else:
@@ -136,31 +174,189 @@ def render(df):
     with viz_tabs[4]:
         st.header("Channel Comprehensive Performance Analysis")
         top_n = st.slider("Select Top N Channels to Display", 5, 20, 10)
-        fig_channel_performance = create_channel_performance_comparison_chart(df_copy, top_n)
-        if fig_channel_performance:
-            st.plotly_chart(fig_channel_performance, use_container_width=True)
-        st.subheader("Content Quality Comprehensive Score")
-        fig_engagement_score = create_engagement_score_distribution_chart(df_copy)
-        if fig_engagement_score:
-            st.plotly_chart(fig_engagement_score, use_container_width=True)
+        approximate_channels = False
+        if channel_sketches is not None and channel_sketches.rows > 0:
+            approximate_channels = st.checkbox(
+                "Approximate Top Channels (Space-Saving Sketch)",
+                value=False,
+                help="Rank channels from sketches filled during loading; covers loaded rows before view-range and outlier filters"
+            )
+        if approximate_channels:
+            sketch_categories = sorted(channel_sketches.category_top_channels)
+            sketch_category = st.selectbox("Category", ["All Categories"] + sketch_categories, index=0)
+            category_key = None if sketch_category == "All Categories" else sketch_category
+            top_channels = channel_sketches.top_channels_by_views(category_key, top_n)
+            names = {}
+            if channel_table is not None and 'channelId' in channel_table.columns:
+                display_names, _ = channel_display_names(channel_table)
+                names = dict(zip(channel_table['channelId'], display_names))
+            top_channels['channel'] = [names.get(key, str(key)) for key in top_channels['key']]
+            charts.add(
+                create_approximate_top_channels_chart,
+                top_channels, f"Top {top_n} Channels by Views – {sketch_category} (approximate)"
+            )
+            st.caption(
+                f"Space-Saving summary of {channel_sketches.top_k} channels per category; bars show the tighter of its upper bound and the "
+                f"Count-Min estimate (overshoot ≤ {channel_sketches.channel_views.epsilon:.4%} of all views with probability "
+                f"{1 - np.exp(-channel_sketches.channel_views.depth):.0%}), error bars span to each channel's guaranteed minimum."
+            )
         else:
-            st.warning("Insufficient required data for comprehensive performance analysis")
+            charts.add(create_channel_performance_comparison_chart, df, top_n, channel_table=channel_table)
+        if channel_table is not None and len(channel_table) > 0:
+            st.subheader("Channel-Level Analysis")
+            channel_cols = st.columns(3)
+            with channel_cols[0]:
+                st.metric("Channels", f"{len(channel_table):,}")
+            with channel_cols[1]:
+                st.metric("Median Videos per Channel", f"{channel_table['video_count'].median():,.0f}")
+            with channel_cols[2]:
+                if 'days_between_uploads' in channel_table.columns and channel_table['days_between_uploads'].notna().any():
+                    st.metric("Median Days Between Uploads", f"{channel_table['days_between_uploads'].median():,.1f}")
+            if 'subscriberCount' in channel_table.columns:
+                charts.add(
+                    create_webgl_scatter_chart,
+                    channel_table, 'subscriberCount', 'median_views', color_col='video_count',
+                    title="Channel Subscribers vs. Median Views per Video", render_mode=render_mode
+                )
+        st.subheader("Content Quality Comprehensive Score")
+        weight_cols = st.columns(3)
+        score_weights = []
+        for weight_col, label, default_weight in zip(weight_cols, ["Views Weight", "Likes Weight", "Comments Weight"], DEFAULT_SCORE_WEIGHTS):
+            with weight_col:
+                score_weights.append(st.slider(label, min_value=0.0, max_value=1.0, value=default_weight, step=0.05))
+        score_weights = tuple(score_weights)
+        st.caption(
+            f"Score = {score_weights[0]:g}·log(1+views) + {score_weights[1]:g}·log(1+likes) + {score_weights[2]:g}·log(1+comments), "
+            f"computed with the {DEFAULT_BACKEND} kernel"
+        )
+        charts.add(
+            create_engagement_score_distribution_chart, df, weights=score_weights,
+            empty_warning="Insufficient required data for comprehensive performance analysis"
+        )
     with viz_tabs[5]:
         st.header("Seasonal Analysis")
-        if 'season' in df_copy.columns:
-            season_counts = df_copy['season'].value_counts()
-            season_df = pd.DataFrame({
-                'Season': season_counts.index,
-                'Count': season_counts.values
-            })
-            fig_season_bar = create_enhanced_horizontal_bar_chart(season_df, 'Count', 'Season', "Video Count Distribution by Season")
-            if fig_season_bar:
-                st.plotly_chart(fig_season_bar, use_container_width=True)
-            if 'videoViewCount' in df_copy.columns:
-                season_avg_views = df_copy.groupby('season')['videoViewCount'].mean().reset_index()
-                season_avg_views.columns = ['Season', 'Average Views']
-                fig_season_views = create_enhanced_horizontal_bar_chart(season_avg_views, 'Average Views', 'Season', "Average Views by Season")
-                if fig_season_views:
-                    st.plotly_chart(fig_season_views, use_container_width=True)
+        seasonal_cube = cache.get(('seasonal_cube',) + tuple(view_key)) if cache is not None and view_key is not None else None
+        if seasonal_cube is None:
+            seasonal_cube = SeasonalCube.from_frame(df)
+            if seasonal_cube is not None and cache is not None and view_key is not None:
+                cache.put(('seasonal_cube',) + tuple(view_key), seasonal_cube, kind='aggregate', nbytes=seasonal_cube.nbytes)
+        if seasonal_cube is not None and seasonal_cube.counts.sum() > 0:
+            season_table = seasonal_cube.season_table()
+            season_df = season_table.loc[season_table['Video Count'] > 0, ['Season', 'Video Count']].rename(columns={'Video Count': 'Count'})
+            charts.add(create_enhanced_horizontal_bar_chart, season_df, 'Count', 'Season', "Video Count Distribution by Season")
+            if 'Average Views' in season_table.columns:
+                season_avg_views = season_table.loc[season_table['Average Views'].notna(), ['Season', 'Average Views']]
+                charts.add(create_enhanced_horizontal_bar_chart, season_avg_views, 'Average Views', 'Season', "Average Views by Season")
+            st.subheader("Year-Normalized Seasonal Index")
+            index_basis = st.selectbox(
+                "Index Basis",
+                [basis for basis in SEASONAL_INDEX_BASES if basis == 'Video Count' or basis.replace('Average ', '') in seasonal_cube.sums],
+                index=0,
+                help="Each season's value divided by its year's average season, averaged over years with videos in all four seasons"
+            )
+            seasonal_index = seasonal_cube.seasonal_index(index_basis)
+            if seasonal_index is None:
+                st.info("No year has videos in all four seasons")
+            else:
+                charts.add(create_enhanced_vertical_bar_chart, seasonal_index, 'Season', 'Seasonal Index',
+                           f"Seasonal Index of {index_basis} (1.0 = average season)")
+                st.caption(f"Averaged over {int(seasonal_index['Years'].max()):,} complete years; "
+                           f"computed from {seasonal_cube.n_cells:,} year × season × category cells.")
+        else:
+            st.warning("Seasonal data not available, please ensure the data contains publish month information")
+    if compare_snapshots_tab:
+        with viz_tabs[6]:
+            st.header("Snapshot Comparison")
+            snapshot_cols = st.columns([3, 1, 1])
+            with snapshot_cols[0]:
+                snapshot_keys = [snapshot['key'] for snapshot in snapshots]
+                selected_keys = st.multiselect("Snapshots", snapshot_keys, default=snapshot_keys[-2:])
+            with snapshot_cols[1]:
+                snapshot_metric = st.selectbox("Metric", list(SNAPSHOT_METRICS.values()) + ['videos'], index=0)
+            with snapshot_cols[2]:
+                growth_top_n = st.number_input("Top Channels", min_value=5, max_value=50, value=15, step=5)
+            selected = [snapshot for snapshot in snapshots if snapshot['key'] in selected_keys]
+            if len(selected) < 2:
+                st.info("Select at least two snapshots to compare.")
+            elif not st.checkbox("Load Snapshots", value=False, help="Read the selected snapshot files and compare them"):
+                st.info(f"{len(selected)} snapshots selected; check Load Snapshots to read and compare them.")
+            else:
+                snapshot_status = st.empty()
+                loaded = []
+                def snapshot_loaded(snapshot, table):
+                    loaded.append(snapshot['key'])
+                    snapshot_status.progress(len(loaded) / len(selected), text=f"Loaded snapshot {snapshot['key']} ({len(loaded)}/{len(selected)})")
+                aggregates = cached_snapshots(cache, selected, snapshot_channel_aggregates, 'aggregate', on_result=snapshot_loaded)
+                snapshot_status.empty()
+                comparison = compare_snapshots(aggregates, snapshot_metric)
+                if comparison is None or len(aggregates) < 2:
+                    st.warning(f"Snapshots do not have channel-level {snapshot_metric} data to compare")
+                else:
+                    keys = list(aggregates)
+                    totals_df = pd.DataFrame({'Snapshot': keys, f"Total {snapshot_metric.title()}": comparison[keys].sum().to_numpy()})
+                    charts.add(create_enhanced_vertical_bar_chart, totals_df, 'Snapshot', f"Total {snapshot_metric.title()}",
+                               f"Total {snapshot_metric.title()} per Snapshot")
+                    growth = comparison.dropna(subset=['growth']).nlargest(int(growth_top_n), 'growth')
+                    labels = growth.index.to_series()
+                    if 'channelName' in growth.columns:
+                        labels = growth['channelName'].where(growth['channelName'].notna(), labels)
+                    growth_df = pd.DataFrame({'Channel': labels.astype(str).to_numpy(), 'Growth': growth['growth'].to_numpy()})
+                    charts.add(create_enhanced_horizontal_bar_chart, growth_df, 'Growth', 'Channel',
+                               f"Top {int(growth_top_n)} Channels by {snapshot_metric.title()} Growth ({keys[0]} → {keys[-1]})")
+                    both = comparison[keys[0]].notna() & comparison[keys[-1]].notna()
+                    st.caption(f"{len(comparison):,} channels across {len(keys)} snapshots; {int(both.sum()):,} appear in both {keys[0]} and {keys[-1]}.")
+                if st.checkbox(
+                    "Per-Video Growth",
+                    value=False,
+                    help="Join the first and last selected snapshots video by video (reads their videoId and metric columns)"
+                ):
+                    first, last = selected[0], selected[-1]
+                    snapshot_keys = cached_snapshots(cache, [first, last], SnapshotKeys.from_snapshot, 'index')
+                    if len(snapshot_keys) < 2:
+                        st.warning("Selected snapshots do not have a videoId column to join on")
+                    else:
+                        video_diff, diff_summary = diff_snapshots(snapshot_keys[first['key']], snapshot_keys[last['key']])
+                        diff_cols = st.columns(3)
+                        with diff_cols[0]:
+                            st.metric("Videos in Both", f"{diff_summary['matched']:,}")
+                        with diff_cols[1]:
+                            st.metric(f"New in {last['key']}", f"{diff_summary['added']:,}")
+                        with diff_cols[2]:
+                            st.metric(f"Gone since {first['key']}", f"{diff_summary['removed']:,}")
+                        if 'view_growth_rate' in video_diff.columns and video_diff['view_growth_rate'].notna().any():
+                            valid_rows = np.flatnonzero(video_diff['view_growth_rate'].notna().to_numpy())
+                            charts.add(create_enhanced_histogram_chart, take_rows(video_diff, valid_rows, ['view_growth_rate']),
+                                       'view_growth_rate', f"Per-Video View Growth Rate ({first['key']} → {last['key']})")
+                        channel_diff = channel_growth(video_diff)
+                        if channel_diff is not None and 'view_growth' in channel_diff.columns and channel_diff['view_growth'].notna().any():
+                            top_growth = channel_diff.dropna(subset=['view_growth']).nlargest(int(growth_top_n), 'view_growth')
+                            labels = top_growth.index.to_series().astype(str)
+                            names = aggregates.get(last['key'])
+                            if names is not None and 'channelName' in names.columns:
+                                named = names['channelName'].reindex(labels.to_numpy())
+                                labels = pd.Series(np.where(named.notna(), named.astype(str), labels), index=labels.index)
+                            channel_growth_df = pd.DataFrame({'Channel': labels.to_numpy(), 'View Growth': top_growth['view_growth'].to_numpy()})
+                            charts.add(create_enhanced_horizontal_bar_chart, channel_growth_df, 'View Growth', 'Channel',
+                                       f"Top {int(growth_top_n)} Channels by View Growth of Matched Videos ({first['key']} → {last['key']})")
+                            st.caption(f"Sums over the {diff_summary['matched']:,} videos present in both snapshots, "
+                                       f"so channel growth leaves out added and removed videos.")
+                        if 'view_growth' in video_diff.columns and len(video_diff) > 0:
+                            st.write("Videos with the Largest View Growth:")
+                            top_videos = video_diff.nlargest(20, 'view_growth')
+                            top_videos.insert(0, VIDEO_KEY_COLUMN, snapshot_keys[last['key']].video_ids(top_videos.pop(VIDEO_HASH_COLUMN)))
+                            st.dataframe(top_videos, use_container_width=True, hide_index=True)
+    def refine_progress(progress_info):
+        if charts.previews == 0 or progress_info['is_complete']:
+            refine_status.empty()
         else:
-            st.warning("Seasonal data not available, please ensure the data contains publish month information")
\ No newline at end of file
+            refine_status.progress(
+                progress_info['processed_charts'] / progress_info['total_charts'],
+                text=f"Refining approximate charts with all {len(df):,} rows: {progress_info['processed_charts']}/{progress_info['total_charts']}"
+            )
+    charts.run(progress_callback=refine_progress)
+    if charts.payloads:
+        with st.expander("Chart Payload Sizes", expanded=False):
+            payload_df = pd.DataFrame(charts.payloads, columns=['Chart', 'Payload (KB)'])
+            payload_df['Payload (KB)'] = (payload_df['Payload (KB)'] / 1024).round(1)
+            st.dataframe(payload_df, use_container_width=True)
+            st.caption(f"Total {payload_df['Payload (KB)'].sum():,.1f} KB sent for this rerun's charts.")
\ No newline at end of file
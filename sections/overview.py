@@ -1,11 +1,23 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-def render(df, show_data_info=True):
+from utils.io import export_dataframe
+from utils.preview import DEFAULT_PAGE_SIZE, PAGE_SIZES, channel_index, order_rows, page_rows, search_rows, sort_order
+from utils.profile import DatasetProfile
+def render(df, show_data_info=True, channel_sketches=None, profile=None, cache=None, view_key=None):
+    if profile is None:
+        profile = DatasetProfile.from_frame(df)
     st.header("Data Overview")
     if show_data_info:
         st.subheader("Basic Data Information")
-        overview_cols = st.columns(3)
+        approximate = False
+        if channel_sketches is not None and channel_sketches.rows > 0:
+            approximate = st.checkbox(
+                "Approximate Mode (Streaming Sketches)",
+                value=len(df) > 1000000,
+                help="Use HyperLogLog sketches filled during loading instead of exact distinct counts"
+            )
+        overview_cols = st.columns(4)
         with overview_cols[0]:
             st.metric("Total Records", f"{len(df):,}")
         with overview_cols[1]:
@@ -13,27 +25,74 @@ def render(df, show_data_info=True):
         with overview_cols[2]:
             category_count = df['categoryName'].nunique() if 'categoryName' in df.columns else 0
             st.metric("Number of Categories", category_count)
+        with overview_cols[3]:
+            if approximate:
+                categories = df['categoryName'].dropna().unique().tolist() if 'categoryName' in df.columns else None
+                estimate, relative_error = channel_sketches.distinct_channels(categories)
+                st.metric(
+                    "Distinct Channels (approx.)",
+                    f"≈{estimate:,.0f}",
+                    help=f"HyperLogLog estimate, ±{2 * relative_error:.1%} at 95% confidence"
+                )
+            elif 'channelId' in df.columns:
+                st.metric("Distinct Channels", f"{df['channelId'].nunique():,}")
+        if approximate:
+            st.caption("Approximate figures cover the loaded rows of the selected categories, before view-range and outlier filters.")
         tab1, tab2, tab3 = st.tabs(["Data Structure", "Numerical Statistics", "Data Preview"])
         with tab1:
             st.write("Data Types:")
-            st.dataframe(df.dtypes.astype(str))
+            st.dataframe(pd.DataFrame({
+                'Type': profile.dtypes,
+                'Memory (KB)': (profile.memory_usage() / 1024).round(1)
+            }))
             st.write("\nMissing Value Statistics:")
-            missing_data = df.isnull().sum()
-            missing_percent = (missing_data / len(df) * 100).round(2)
-            missing_df = pd.DataFrame({
-                'Missing Count': missing_data,
-                'Missing Percentage': missing_percent
-            })
+            missing_df = profile.missing()
             st.dataframe(missing_df[missing_df['Missing Count'] > 0])
         with tab2:
             st.write("Numerical Columns Summary:")
-            numeric_df = df.select_dtypes(include=[np.number])
-            st.dataframe(numeric_df.describe().style.format(precision=2))
+            st.dataframe(profile.describe().style.format(precision=2))
+            st.caption("Quartiles come from the dataset profile's sketches (exact for small-range integer columns, within 1% otherwise).")
         with tab3:
-            st.write("First 10 Rows:")
-            st.dataframe(df.head(10))
-            st.write("\nLast 10 Rows:")
-            st.dataframe(df.tail(10))
+            preview_cols = st.columns([2, 1, 2, 1])
+            with preview_cols[0]:
+                sort_column = st.selectbox("Sort By", ["(Original Order)"] + list(df.columns), index=0)
+            with preview_cols[1]:
+                sort_direction = st.radio("Order", ["Descending", "Ascending"], index=0, horizontal=True)
+            with preview_cols[2]:
+                channel_query = st.text_input(
+                    "Search Channel Name",
+                    value="",
+                    disabled='channelName' not in df.columns,
+                    help="Case-insensitive substring match on channel names"
+                )
+            with preview_cols[3]:
+                page_size = st.selectbox("Rows per Page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+            positions = np.arange(len(df))
+            if channel_query.strip() and 'channelName' in df.columns:
+                index_key = ('channel_index',) + tuple(view_key or ())
+                index = cache.get(index_key) if cache is not None else None
+                if index is None:
+                    index = channel_index(df)
+                    if cache is not None:
+                        cache.put(index_key, index, kind='index')
+                positions = search_rows(index, channel_query)
+            if sort_column != "(Original Order)":
+                order_key = ('sort_order',) + tuple(view_key or ()) + (sort_column, sort_direction == "Ascending")
+                order = cache.get(order_key) if cache is not None else None
+                if order is None:
+                    order = sort_order(df, sort_column, ascending=sort_direction == "Ascending")
+                    if cache is not None:
+                        cache.put(order_key, order, kind='index')
+                positions = order_rows(order, positions)
+            n_pages = max(1, -(-len(positions) // page_size))
+            page = min(int(st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1, step=1)), n_pages)
+            if len(positions) == 0:
+                st.info("No rows match the channel search.")
+            else:
+                st.dataframe(page_rows(df, positions, page, page_size))
+                first_row = (page - 1) * page_size + 1
+                st.caption(f"Rows {first_row:,}–{min(first_row + page_size - 1, len(positions)):,} of {len(positions):,}; "
+                           "only this page is sent to the browser.")
     export_col, spacer_col = st.columns([1, 4])
     with export_col:
         export_format = st.selectbox(
@@ -43,9 +102,8 @@ def render(df, show_data_info=True):
             help="Select the data format to export"
         )
         if st.button("Export Current Data", use_container_width=True, type="primary"):
-            import io
             if export_format == "CSV":
-                csv = df.to_csv(index=False)
+                csv = export_dataframe(df, "CSV")
                 st.download_button(
                     label=f"下载CSV文件 | Download CSV File",
                     data=csv,
@@ -54,10 +112,7 @@ def render(df, show_data_info=True):
                     use_container_width=True
                 )
             elif export_format == "Excel":
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    df.to_excel(writer, index=False, sheet_name='YouTube Data')
-                processed_data = output.getvalue()
+                processed_data = export_dataframe(df, "Excel")
                 st.download_button(
                     label=f"下载Excel文件 | Download Excel File",
                     data=processed_data,
@@ -66,7 +121,7 @@ def render(df, show_data_info=True):
                     use_container_width=True
                 )
             elif export_format == "JSON":
-                json = df.to_json(orient='records')
+                json = export_dataframe(df, "JSON")
                 st.download_button(
                     label=f"下载JSON文件 | Download JSON File",
                     data=json,
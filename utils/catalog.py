@@ -0,0 +1,159 @@
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+logger = logging.getLogger(__name__)
+DEFAULT_DATA_DIR = 'data'
+SNAPSHOT_EXTENSIONS = {'.csv': 'csv', '.parquet': 'parquet'}
+DEFAULT_IO_WORKERS = 4
+SNAPSHOT_CHUNK_ROWS = 200000
+SNAPSHOT_DATE_PATTERN = re.compile(r'(?<!\d)(\d{4})[-_]?(\d{2})(?:[-_]?(\d{2}))?(?!\d)')
+SNAPSHOT_METRICS = {
+    'videoViewCount': 'views',
+    'videoLikeCount': 'likes',
+    'VideoCommentCount': 'comments'
+}
+def snapshot_key(path):
+    """Snapshot key of a file: the YYYY-MM(-DD) date in its name when there is one, else the file name without extension."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = SNAPSHOT_DATE_PATTERN.search(stem)
+    if match is None:
+        return stem
+    return '-'.join(part for part in match.groups() if part)
+def discover_snapshots(data_dir=DEFAULT_DATA_DIR):
+    """CSV and Parquet snapshots in data_dir as dicts (key, path, format, bytes, modified), sorted by key."""
+    if not os.path.isdir(data_dir):
+        return []
+    snapshots = []
+    for name in os.listdir(data_dir):
+        file_format = SNAPSHOT_EXTENSIONS.get(os.path.splitext(name)[1].lower())
+        path = os.path.join(data_dir, name)
+        if file_format is None or not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        snapshots.append({
+            'key': snapshot_key(path),
+            'path': path,
+            'format': file_format,
+            'bytes': stat.st_size,
+            'modified': stat.st_mtime
+        })
+    snapshots.sort(key=lambda snapshot: (snapshot['key'], snapshot['path']))
+    seen = {}
+    for snapshot in snapshots:
+        seen[snapshot['key']] = seen.get(snapshot['key'], 0) + 1
+        if seen[snapshot['key']] > 1:
+            snapshot['key'] = f"{snapshot['key']} ({seen[snapshot['key']]})"
+    return snapshots
+def iter_snapshot_chunks(snapshot, columns, chunk_rows=SNAPSHOT_CHUNK_ROWS):
+    """Chunks of a snapshot restricted to the wanted columns that exist in the file."""
+    if snapshot['format'] == 'parquet':
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(snapshot['path'])
+        wanted = [col for col in columns if col in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=wanted):
+            yield batch.to_pandas()
+        return
+    header = pd.read_csv(snapshot['path'], nrows=0).columns
+    wanted = [col for col in columns if col in header]
+    yield from pd.read_csv(snapshot['path'], usecols=wanted, chunksize=chunk_rows)
+def snapshot_channel_aggregates(snapshot, chunk_rows=SNAPSHOT_CHUNK_ROWS):
+    """Per-channel totals of one snapshot (videos, views, likes, comments, subscribers), read chunk by chunk.
+
+    Only the channel and metric columns are read, and each chunk is reduced to
+    one row per channel before the next is read, so memory stays bounded by the
+    chunk size and the number of channels rather than the file size.
+    """
+    columns = ['channelId', 'channelName', 'subscriberCount', *SNAPSHOT_METRICS]
+    partials = []
+    for chunk in iter_snapshot_chunks(snapshot, columns, chunk_rows):
+        if 'channelId' not in chunk.columns:
+            return None
+        chunk = chunk[chunk['channelId'].notna()]
+        metrics = {}
+        for col, name in SNAPSHOT_METRICS.items():
+            if col in chunk.columns:
+                metrics[name] = pd.to_numeric(chunk[col], errors='coerce').replace([-2.0, -1.0], np.nan)
+        metrics['videos'] = pd.Series(1, index=chunk.index, dtype=np.int64)
+        if 'subscriberCount' in chunk.columns:
+            metrics['subscribers'] = pd.to_numeric(chunk['subscriberCount'], errors='coerce').replace([-2.0, -1.0], np.nan)
+        frame = pd.DataFrame(metrics)
+        grouped = frame.groupby(chunk['channelId'].astype(str), sort=False)
+        partial = grouped[[col for col in frame.columns if col != 'subscribers']].sum()
+        if 'subscribers' in frame.columns:
+            partial['subscribers'] = grouped['subscribers'].max()
+        if 'channelName' in chunk.columns:
+            partial['channelName'] = chunk.groupby(chunk['channelId'].astype(str), sort=False)['channelName'].first()
+        partials.append(partial)
+    if not partials:
+        return None
+    combined = pd.concat(partials)
+    grouped = combined.groupby(level=0, sort=True)
+    sums = [col for col in combined.columns if col not in ('subscribers', 'channelName')]
+    table = grouped[sums].sum()
+    if 'subscribers' in combined.columns:
+        table['subscribers'] = grouped['subscribers'].max()
+    if 'channelName' in combined.columns:
+        table['channelName'] = grouped['channelName'].first()
+    table.index.name = 'channelId'
+    table['videos'] = table['videos'].astype(np.int32)
+    return table
+def load_snapshots(snapshots, reader, max_workers=DEFAULT_IO_WORKERS, on_result=None):
+    """reader(snapshot) for several snapshots, run concurrently on a bounded I/O thread pool, keyed by snapshot key.
+
+    A snapshot that fails to load (or reads as None) is logged and left out.
+    on_result(snapshot, value) is called on the calling thread as each snapshot finishes.
+    """
+    def load(snapshot):
+        try:
+            return reader(snapshot)
+        except Exception as e:
+            logger.error(f"Error loading snapshot {snapshot['path']}: {str(e)}")
+            return None
+    results = {}
+    if not snapshots:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(snapshots))), thread_name_prefix='snapshot') as pool:
+        futures = {pool.submit(load, snapshot): snapshot for snapshot in snapshots}
+        for future in as_completed(futures):
+            snapshot, value = futures[future], future.result()
+            if value is not None:
+                results[snapshot['key']] = value
+            if on_result is not None:
+                on_result(snapshot, value)
+    return {snapshot['key']: results[snapshot['key']] for snapshot in snapshots if snapshot['key'] in results}
+def compare_snapshots(aggregates, metric='views'):
+    """Channels x snapshots frame of one aggregate metric, pre-joined on channelId, plus growth from the first to the last snapshot.
+
+    Channels missing from a snapshot get NaN there; growth is left NaN unless
+    the channel appears in both the first and the last snapshot.
+    """
+    keys = [key for key, table in aggregates.items() if metric in table.columns]
+    if not keys:
+        return None
+    comparison = pd.concat({key: aggregates[key][metric] for key in keys}, axis=1, join='outer', sort=True)
+    names = [aggregates[key]['channelName'] for key in keys if 'channelName' in aggregates[key].columns]
+    if names:
+        names = pd.concat(names)
+        comparison.insert(0, 'channelName', names[~names.index.duplicated(keep='last')].reindex(comparison.index))
+    if len(keys) > 1:
+        first, last = comparison[keys[0]], comparison[keys[-1]]
+        comparison['growth'] = last - first
+        comparison['growth_rate'] = (last - first) / first.where(first > 0)
+    return comparison
+def cached_snapshots(cache, snapshots, reader, kind, max_workers=DEFAULT_IO_WORKERS, on_result=None):
+    """load_snapshots that reuses reader results already in the session cache (keyed by reader, path and modification time).
+
+    Newly read results are stored as cache entries of the given kind.
+    """
+    if cache is None:
+        return load_snapshots(snapshots, reader, max_workers, on_result)
+    name = getattr(reader, '__qualname__', repr(reader))
+    keys = {snapshot['key']: ('snapshot', name, snapshot['path'], snapshot['modified']) for snapshot in snapshots}
+    results = {key: cache.get(cache_key) for key, cache_key in keys.items() if cache_key in cache}
+    missing = [snapshot for snapshot in snapshots if snapshot['key'] not in results]
+    for key, value in load_snapshots(missing, reader, max_workers, on_result).items():
+        results[key] = cache.put(keys[key], value, kind=kind)
+    return {snapshot['key']: results[snapshot['key']] for snapshot in snapshots if snapshot['key'] in results}
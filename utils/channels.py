@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+from utils.prep import CATEGORY_NAMES, category_codes
+from utils.sketches import CountMinSketch, HyperLogLog, SpaceSaving, hash_values
+CHANNEL_CODE_COLUMN = 'channelCode'
+CHANNEL_STRING_COLUMNS = ['channelId', 'channelName']
+def encode_channel_strings(df):
+    """Dictionary-encode channelId/channelName as categoricals: small integer codes per row plus one copy of each string.
+
+    Already encoded columns drop categories no row uses (e.g. after taking a subset).
+    """
+    for col in CHANNEL_STRING_COLUMNS:
+        if col not in df.columns:
+            continue
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+        else:
+            df[col] = df[col].astype('category')
+    return df
+def channel_dictionary(column):
+    """(codes, strings) of a channel string column: the categorical dictionary, or a factorization of plain strings."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy(), pd.Index(column.cat.categories.astype(str))
+    codes, uniques = pd.factorize(column)
+    return codes, pd.Index(uniques).astype(str)
+def has_channel_names(df):
+    """Whether any row has a non-blank channelName, checked once per distinct name instead of per row."""
+    if 'channelName' not in df.columns:
+        return False
+    codes, names = channel_dictionary(df['channelName'])
+    if len(names) == 0:
+        return False
+    used = np.bincount(codes[codes >= 0], minlength=len(names)) > 0
+    return bool((used & (names.str.strip() != '')).any())
+def add_channel_codes(df):
+    """Add an int32 channelCode column (position in the channel table, -1 when channelId is missing)."""
+    if 'channelId' not in df.columns:
+        return df
+    codes, _ = pd.factorize(df['channelId'], sort=True)
+    df[CHANNEL_CODE_COLUMN] = codes.astype(np.int32)
+    return df
+def build_channel_table(df):
+    """Channel-level features from a single grouped pass over the video rows, indexed by channelCode."""
+    if CHANNEL_CODE_COLUMN not in df.columns or 'videoViewCount' not in df.columns:
+        return None
+    aggregations = {
+        'video_count': ('videoViewCount', 'size'),
+        'total_views': ('videoViewCount', 'sum'),
+        'median_views': ('videoViewCount', 'median')
+    }
+    optional = {
+        'channelId': ('channelId', 'first'),
+        'channelName': ('channelName', 'first'),
+        'subscriberCount': ('subscriberCount', 'max'),
+        'channelelapsedtime': ('channelelapsedtime', 'max'),
+        'mean_like_rate': ('like_rate', 'mean'),
+        'mean_comment_rate': ('comment_rate', 'mean'),
+        'first_published': ('videoPublished', 'min'),
+        'last_published': ('videoPublished', 'max')
+    }
+    columns = [*aggregations, *optional]
+    encoded = [col for col in CHANNEL_STRING_COLUMNS if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype)]
+    aggregations.update({name: spec for name, spec in optional.items() if spec[0] in df.columns and spec[0] not in encoded})
+    channel_codes = df[CHANNEL_CODE_COLUMN].to_numpy()
+    valid = channel_codes >= 0
+    table = df[valid].groupby(CHANNEL_CODE_COLUMN, sort=True).agg(**aggregations)
+    for col in encoded:
+        codes = df[col].cat.codes.to_numpy()
+        present = valid & (codes >= 0)
+        first = pd.Series(codes[present]).groupby(channel_codes[present]).first()
+        strings = pd.Series(df[col].cat.categories.to_numpy(dtype=object)[first.to_numpy()], index=first.index)
+        table[col] = strings.reindex(table.index)
+    table = table[[name for name in columns if name in table.columns]]
+    table['video_count'] = table['video_count'].astype(np.int32)
+    for col in ['median_views', 'mean_like_rate', 'mean_comment_rate', 'channelelapsedtime']:
+        if col in table.columns:
+            table[col] = table[col].astype(np.float32)
+    if 'subscriberCount' in table.columns:
+        subscribers = table['subscriberCount'].where(table['subscriberCount'] > 0)
+        table['views_per_subscriber'] = (table['total_views'] / subscribers).astype(np.float32)
+    if 'first_published' in table.columns:
+        span_days = (table['last_published'] - table['first_published']).dt.total_seconds() / 86400
+        uploads = table['video_count'].where(table['video_count'] > 1)
+        table['days_between_uploads'] = (span_days / (uploads - 1)).astype(np.float32)
+    return table
+def channel_display_names(table):
+    """Channel names for display, falling back to a short channel id label when names are blank."""
+    if 'channelName' in table.columns:
+        names = table['channelName'].fillna('').astype(str)
+        if names.str.strip().ne('').any():
+            return names.where(names.str.strip().ne(''), table.get('channelId', names).astype(str)), "Channel Name"
+    ids = table['channelId'] if 'channelId' in table.columns else pd.Series(table.index, index=table.index)
+    return ids.apply(lambda x: f"Channel{hash(x) % 10000:04d}"), "Channel ID"
+class ChannelSketches:
+    """Streaming distinct-channel and top-channel-by-views sketches, overall and per category."""
+    def __init__(self, hll_precision=14, top_k=200, cms_width_bits=16):
+        self.hll_precision = hll_precision
+        self.top_k = top_k
+        self.channels = HyperLogLog(hll_precision)
+        self.channel_views = CountMinSketch(cms_width_bits)
+        self.top_channels = SpaceSaving(top_k)
+        self.category_channels = {}
+        self.category_top_channels = {}
+        self.rows = 0
+    def update(self, chunk):
+        """Fold one chunk of raw video rows into every sketch."""
+        if 'channelId' not in chunk.columns:
+            return self
+        chunk = chunk[chunk['channelId'].notna()]
+        ids = chunk['channelId'].to_numpy()
+        if isinstance(chunk['channelId'].dtype, pd.CategoricalDtype):
+            hashes = hash_values(chunk['channelId'].cat.categories)[chunk['channelId'].cat.codes.to_numpy()]
+        else:
+            hashes = hash_values(ids)
+        views = np.zeros(len(chunk))
+        if 'videoViewCount' in chunk.columns:
+            views = np.clip(pd.to_numeric(chunk['videoViewCount'], errors='coerce').fillna(0).to_numpy(dtype=np.float64), 0, None)
+        self.channels.add_hashes(hashes)
+        self.channel_views.add_hashes(hashes, views)
+        self.top_channels.add(ids, views)
+        if 'videoCategoryId' in chunk.columns:
+            codes, names = category_codes(chunk['videoCategoryId']), CATEGORY_NAMES
+        elif 'categoryName' in chunk.columns:
+            codes, names = pd.factorize(chunk['categoryName'].astype(str))
+        else:
+            codes, names = None, []
+        if codes is not None:
+            for code in np.flatnonzero(np.bincount(codes, minlength=len(names))):
+                mask = codes == code
+                category = names[code]
+                self.category_channels.setdefault(category, HyperLogLog(self.hll_precision)).add_hashes(hashes[mask])
+                self.category_top_channels.setdefault(category, SpaceSaving(self.top_k)).add(ids[mask], views[mask])
+        self.rows += len(chunk)
+        return self
+    def merge(self, other):
+        """Combine sketches filled from another chunk stream or partition."""
+        self.channels.merge(other.channels)
+        self.channel_views.merge(other.channel_views)
+        self.top_channels.merge(other.top_channels)
+        for category, sketch in other.category_channels.items():
+            self.category_channels.setdefault(category, HyperLogLog(self.hll_precision)).merge(sketch)
+        for category, summary in other.category_top_channels.items():
+            self.category_top_channels.setdefault(category, SpaceSaving(self.top_k)).merge(summary)
+        self.rows += other.rows
+        return self
+    def distinct_channels(self, categories=None):
+        """(estimate, relative standard error) of distinct channels, optionally within categories."""
+        if categories is None:
+            return self.channels.estimate(), self.channels.relative_error
+        merged = HyperLogLog(self.hll_precision)
+        for category in categories:
+            if category in self.category_channels:
+                merged.merge(self.category_channels[category])
+        return merged.estimate(), merged.relative_error
+    def top_channels_by_views(self, category=None, n=10):
+        """Top n channels by views with Space-Saving error bounds, overall or within one category.
+
+        upper_bound is the tighter of the Space-Saving count and the channel's
+        Count-Min estimate of its views over all categories; both overestimate,
+        so the true views lie in [lower_bound, upper_bound].
+        """
+        summary = self.top_channels if category is None else self.category_top_channels.get(category)
+        if summary is None:
+            return pd.DataFrame(columns=['key', 'count', 'error', 'lower_bound', 'upper_bound'])
+        top = summary.top(n)
+        top['upper_bound'] = np.minimum(top['count'].to_numpy(dtype=np.float64), self.channel_views.query(top['key'].to_numpy()))
+        return top
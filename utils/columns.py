@@ -0,0 +1,7 @@
+import numpy as np
+def column_values(df, col):
+    """Float64 values of a numeric column with NaN for missing, without copying float64 columns."""
+    column = df[col]
+    if column.dtype == np.float64:
+        return column.to_numpy()
+    return column.to_numpy(dtype=np.float64, na_value=np.nan)
@@ -0,0 +1,107 @@
+import base64
+import inspect
+import logging
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+logger = logging.getLogger(__name__)
+COMPACT_MIN_LENGTH = 256
+JSON_SIGNIFICANT_DIGITS = 7
+TYPED_ARRAY_MIN_STREAMLIT = (1, 34)
+CHART_KEYS_SUPPORTED = 'key' in inspect.signature(st.plotly_chart).parameters
+def typed_arrays_supported():
+    """Whether the running Streamlit frontend bundles a plotly.js that decodes typed-array specs (2.28+)."""
+    try:
+        version = tuple(int(part) for part in st.__version__.split('.')[:2])
+    except ValueError:
+        return False
+    return version >= TYPED_ARRAY_MIN_STREAMLIT
+def _round_significant(array, digits=JSON_SIGNIFICANT_DIGITS):
+    """Round each value to `digits` significant digits of its own magnitude so JSON floats stay short."""
+    array = array.astype(np.float64)
+    nonzero = np.isfinite(array) & (array != 0)
+    values = array[nonzero]
+    exponents = digits - 1 - np.floor(np.log10(np.abs(values))).astype(np.int64)
+    scale = 10.0 ** np.abs(exponents)
+    array[nonzero] = np.where(exponents >= 0, np.round(values * scale) / scale, np.round(values / scale) * scale)
+    return array
+def compact_array(values, typed=True):
+    """Downcast a numeric data array to int32/float32, as a base64 typed-array spec or a short JSON list.
+
+    Non-numeric and short arrays are returned unchanged.
+    """
+    if isinstance(values, (str, bytes, dict)) or values is None:
+        return values
+    array = np.asarray(values)
+    if array.dtype.kind not in 'iuf' or array.ndim not in (1, 2) or array.size < COMPACT_MIN_LENGTH:
+        return values
+    if array.dtype.kind in 'iu' and array.size and array.min() >= np.iinfo(np.int32).min and array.max() <= np.iinfo(np.int32).max:
+        array, dtype = array.astype(np.int32), 'i4'
+    else:
+        array, dtype = array.astype(np.float32), 'f4'
+    if not typed:
+        return array.tolist() if dtype == 'i4' else _round_significant(array)
+    spec = {'dtype': dtype, 'bdata': base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')}
+    if array.ndim == 2:
+        spec['shape'] = f"{array.shape[0]},{array.shape[1]}"
+    return spec
+def _compact_node(node, typed):
+    """Compact every data array inside a trace (nested dicts and lists of dicts such as splom dimensions)."""
+    for key, value in list(node.items()):
+        if isinstance(value, dict):
+            _compact_node(value, typed)
+        elif isinstance(value, (list, tuple)) and value and all(isinstance(item, dict) for item in value):
+            for item in value:
+                _compact_node(item, typed)
+        else:
+            node[key] = compact_array(value, typed)
+def _strip_hover_data(trace):
+    """Drop customdata that neither the hover nor the text template reads."""
+    templates = str(trace.get('hovertemplate', '')) + str(trace.get('texttemplate', ''))
+    if 'customdata' in trace and '%{customdata' not in templates:
+        del trace['customdata']
+def _collapse_constant_positions(trace):
+    """Replace a box/violin trace's per-point category array with its single position (x0/y0)."""
+    if trace.get('type') not in ('box', 'violin'):
+        return
+    for axis in ('x', 'y'):
+        values = trace.get(axis)
+        if values is None or isinstance(values, (str, dict)) or len(values) < COMPACT_MIN_LENGTH:
+            continue
+        values = np.asarray(values, dtype=object)
+        if (values == values[0]).all():
+            trace[f'{axis}0'] = values[0]
+            del trace[axis]
+def compact_figure(fig, typed=None):
+    """Return (figure, payload bytes) with data arrays downcast, binary encoded where supported and unused hover data removed."""
+    typed = typed_arrays_supported() if typed is None else typed
+    spec = fig.to_dict()
+    for trace in spec.get('data', []):
+        _strip_hover_data(trace)
+        _collapse_constant_positions(trace)
+        _compact_node(trace, typed)
+    payload_bytes = len(pio.to_json(spec, validate=False))
+    return go.Figure(spec, _validate=False), payload_bytes
+def figure_title(fig):
+    title = fig.layout.title.text if fig.layout.title is not None else None
+    return title or (fig.data[0].type if fig.data else 'figure')
+def plotly_chart(fig, name=None, key=None, **kwargs):
+    """Render fig through the compact serialization layer and record its payload size for this session.
+
+    key is passed on where st.plotly_chart accepts one (Streamlit 1.35+ assigns charts element ids).
+    """
+    kwargs.setdefault('use_container_width', True)
+    if key is not None and CHART_KEYS_SUPPORTED:
+        kwargs['key'] = key
+    try:
+        compact, payload_bytes = compact_figure(fig)
+    except Exception as e:
+        logger.error(f"Error compacting figure payload: {str(e)}")
+        st.plotly_chart(fig, **kwargs)
+        return None
+    name = name or figure_title(fig)
+    logger.info(f"Chart payload {name}: {payload_bytes:,} bytes")
+    st.session_state.setdefault('figure_payloads', {})[name] = payload_bytes
+    st.plotly_chart(compact, **kwargs)
+    return payload_bytes
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from utils.columns import column_values
+OUTLIER_COLUMNS = ['videoViewCount', 'videoLikeCount', 'VideoCommentCount', 'subscriberCount']
+PLACEHOLDER_CATEGORIES = ["Please wait for data loading to complete..."]
+def min_views_mask(df, min_views):
+    """Boolean array of rows with at least min_views views (None without a view column)."""
+    if 'videoViewCount' not in df.columns:
+        return None
+    return column_values(df, 'videoViewCount') >= min_views
+def max_views_mask(df, max_views):
+    """Boolean array of rows with at most max_views views (None without a view column)."""
+    if 'videoViewCount' not in df.columns:
+        return None
+    return column_values(df, 'videoViewCount') <= max_views
+def categories_mask(df, categories):
+    """Boolean array of rows whose categoryName is in categories (None when no filter applies)."""
+    if not categories or categories == PLACEHOLDER_CATEGORIES or 'categoryName' not in df.columns:
+        return None
+    column = df['categoryName']
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = [column.cat.categories.get_loc(name) for name in categories if name in column.cat.categories]
+        return np.isin(column.cat.codes.to_numpy(), codes)
+    return column.isin(categories).to_numpy()
+def outlier_mask_iqr(df, columns=None, selection=None):
+    """Boolean array of rows inside the 1.5 * IQR fences of every numeric column.
+
+    Fences are computed over the rows in selection (all rows when None), so the
+    mask can be combined with earlier filter steps without materializing them.
+    """
+    columns = OUTLIER_COLUMNS if columns is None else columns
+    columns = [col for col in columns if col in df.columns and pd.api.types.is_numeric_dtype(df[col])]
+    if not columns:
+        return None
+    valid_mask = np.ones(len(df), dtype=bool)
+    for col in columns:
+        values = column_values(df, col)
+        selected = values if selection is None else values[selection]
+        selected = selected[~np.isnan(selected)]
+        if len(selected) == 0:
+            return np.zeros(len(df), dtype=bool)
+        Q1, Q3 = np.percentile(selected, [25, 75])
+        IQR = Q3 - Q1
+        lower_bound = Q1 - 1.5 * IQR
+        upper_bound = Q3 + 1.5 * IQR
+        valid_mask &= (values >= lower_bound) & (values <= upper_bound)
+    return valid_mask
+def take_rows(df, positions, columns=None):
+    """Materialize the selected row positions (and only the given columns) in a single take."""
+    if columns is not None:
+        column_positions = df.columns.get_indexer([col for col in columns if col in df.columns])
+        if positions is None:
+            return df.iloc[:, column_positions]
+        return df.iloc[positions, column_positions]
+    if positions is None or len(positions) == len(df):
+        return df
+    return df.take(positions)
+def filter_selection(df, min_views=0, max_views=None, categories=None, filter_outliers=True, outlier_mask=None):
+    """Row positions kept by the sidebar filter chain and the number of rows each step removed.
+
+    Each step narrows a boolean selection vector over df; nothing is copied
+    until the caller materializes the result with take_rows. outlier_mask is a
+    precomputed keep-mask over all rows (see utils.outliers); without it the
+    outlier step falls back to global IQR fences over the current selection.
+    """
+    selection = np.ones(len(df), dtype=bool)
+    removed = {}
+    steps = [
+        ('min_views', lambda: min_views_mask(df, min_views) if min_views >= 0 else None),
+        ('max_views', lambda: max_views_mask(df, max_views) if max_views is not None and max_views >= 0 and max_views >= min_views else None),
+        ('categories', lambda: categories_mask(df, categories)),
+        ('outliers', lambda: (outlier_mask if outlier_mask is not None else outlier_mask_iqr(df, selection=selection)) if filter_outliers else None)
+    ]
+    for step, build_mask in steps:
+        mask = build_mask()
+        if mask is None:
+            continue
+        kept_before = int(selection.sum())
+        selection &= mask
+        removed[step] = kept_before - int(selection.sum())
+    return np.flatnonzero(selection), removed
+def filter_by_min_views(df, min_views):
+    """Keep videos with at least min_views views."""
+    mask = min_views_mask(df, min_views)
+    return df if mask is None else df[mask]
+def filter_by_max_views(df, max_views):
+    """Keep videos with at most max_views views."""
+    mask = max_views_mask(df, max_views)
+    return df if mask is None else df[mask]
+def filter_by_categories(df, categories):
+    """Keep videos whose categoryName is in categories (compared by integer code for categoricals)."""
+    mask = categories_mask(df, categories)
+    return df if mask is None else df[mask]
+def filter_outliers_iqr(df, columns=None):
+    """Drop rows outside the 1.5 * IQR fences of any of the given numeric columns."""
+    mask = outlier_mask_iqr(df, columns)
+    return df if mask is None else df[mask]
+def apply_filter_chain(df, min_views=0, max_views=None, categories=None, filter_outliers=True):
+    """Run the sidebar filter chain of app.main without any UI output."""
+    positions, _ = filter_selection(df, min_views, max_views, categories, filter_outliers)
+    return take_rows(df, positions)
@@ -0,0 +1,112 @@
+import logging
+import numpy as np
+from utils.columns import column_values
+from utils.profile import DatasetProfile
+logger = logging.getLogger(__name__)
+INSIGHTS = []
+def insight(name, requires=()):
+    """Register func(context) -> markdown sentence (or None) as an insight, run only when the view has every required column."""
+    def register(func):
+        INSIGHTS.append({'name': name, 'requires': tuple(requires), 'func': func})
+        return func
+    return register
+class InsightContext:
+    """Inputs shared by every insight of one view: the frame, its profile and row-level values read once.
+
+    Insights should prefer the profile's grouped partials; row values come
+    from column_values (no frame copies) and are kept
+    here so several insights reading the same column share one read.
+    """
+    def __init__(self, df, profile):
+        self.df = df
+        self.profile = profile
+        self._values = {}
+    def has(self, *columns):
+        return all(col in self.df.columns for col in columns)
+    def values(self, col):
+        if col not in self._values:
+            self._values[col] = column_values(self.df, col)
+        return self._values[col]
+def compute_insights(df, profile=None):
+    """(name, text) of every registered insight that applies to df, in registration order."""
+    if profile is None:
+        profile = DatasetProfile.from_frame(df)
+    context = InsightContext(df, profile)
+    results = []
+    for entry in INSIGHTS:
+        if not context.has(*entry['requires']):
+            continue
+        try:
+            text = entry['func'](context)
+        except Exception as e:
+            logger.error(f"Error computing insight {entry['name']}: {str(e)}")
+            continue
+        if text is not None:
+            results.append((entry['name'], text))
+    return results
+def cached_insights(cache, key, df, profile=None):
+    """compute_insights for a view, kept in the session cache under ('insights',) + key."""
+    if cache is None or key is None:
+        return compute_insights(df, profile)
+    insights = cache.get(('insights',) + tuple(key))
+    if insights is None:
+        insights = cache.put(('insights',) + tuple(key), compute_insights(df, profile), kind='insights')
+    return insights
+@insight('top_category', requires=['categoryName'])
+def _top_category(context):
+    group_rows = context.profile.group_rows()
+    if len(group_rows) == 0:
+        return None
+    return f"The most popular video category is **{group_rows.index[0]}** with the highest number of videos."
+@insight('average_views', requires=['videoViewCount'])
+def _average_views(context):
+    return f"The average views per video in the dataset is approximately **{context.profile.mean('videoViewCount'):,.0f}**."
+@insight('like_rate', requires=['videoLikeCount', 'videoViewCount'])
+def _like_rate(context):
+    views, likes = context.values('videoViewCount'), context.values('videoLikeCount')
+    valid = (views > 0) & ~np.isnan(likes)
+    if not valid.any():
+        return None
+    return f"The average like rate is approximately **{np.mean(likes[valid] / views[valid]) * 100:.2f}%**."
+@insight('recent_year', requires=['publishYear'])
+def _recent_year(context):
+    recent_year = context.profile.max('publishYear')
+    if np.isnan(recent_year):
+        return None
+    return f"The most recent videos were published in **{int(recent_year)}**."
+@insight('yearly_growth', requires=['publishYear', 'publishMonth'])
+def _yearly_growth(context):
+    year_counts = context.profile.value_counts('publishYear')
+    if year_counts is None or len(year_counts) < 2:
+        return None
+    years, months = context.values('publishYear'), context.values('publishMonth')
+    latest = year_counts.index[-1]
+    last_month = np.nanmax(months[years == latest]) if (years == latest).any() else np.nan
+    partial = not np.isnan(last_month) and last_month < 12
+    complete = year_counts.iloc[:-1] if partial else year_counts
+    pairs = [(previous, year) for previous, year in zip(complete.index[:-1], complete.index[1:]) if year == previous + 1]
+    if not pairs:
+        return None
+    previous, year = pairs[-1]
+    growth = (complete[year] / complete[previous] - 1) * 100
+    text = (f"Uploads {'grew' if growth >= 0 else 'fell'} by **{abs(growth):.1f}%** from {int(previous)} to {int(year)} "
+            f"({complete[previous]:,} to {complete[year]:,} videos).")
+    if partial:
+        text += f" {int(latest)} is left out as a partial year (videos through month {int(last_month)} only)."
+    return text
+@insight('top_engagement_category', requires=['engagement_score', 'categoryName'])
+def _top_engagement_category(context):
+    means = context.profile.group_means('engagement_score')
+    if len(means) == 0:
+        return None
+    return (f"Based on comprehensive scoring, **{means.idxmax()}** videos have the highest average engagement score "
+            f"(**{means.max():.3f}**).")
+@insight('like_comment_correlation', requires=['like_rate', 'comment_rate'])
+def _like_comment_correlation(context):
+    like_rate, comment_rate = context.values('like_rate'), context.values('comment_rate')
+    valid = ~np.isnan(like_rate) & ~np.isnan(comment_rate)
+    if valid.sum() < 2 or np.std(like_rate[valid]) == 0 or np.std(comment_rate[valid]) == 0:
+        return None
+    correlation = np.corrcoef(like_rate[valid], comment_rate[valid])[0, 1]
+    return (f"The correlation between like rate and comment rate is **{correlation:.2f}**, indicating a "
+            f"{'strong' if abs(correlation) > 0.5 else 'weak'} correlation between user engagement behaviors.")
@@ -3,13 +3,41 @@ import pandas as pd
 import numpy as np
 import os
 import time
-from utils.prep import engineer_features
-def load_data(file_path, sample_size=None, progress_callback=None):
+import io
+from utils.channels import add_channel_codes, encode_channel_strings
+from utils.prep import (
+    CATEGORY_NAMES,
+    add_calendar_features,
+    category_code_counts,
+    category_names_from_counts,
+    engineer_features
+)
+from utils.sampling import DEFAULT_SAMPLE_SEED, sample_positions
+ARROW_STRING_DTYPE = 'string[pyarrow]'
+def use_arrow_strings(df):
+    """Store text columns as Arrow-backed strings; object columns stay as they are without pyarrow."""
+    try:
+        dtype = pd.StringDtype('pyarrow')
+    except ImportError:
+        return df
+    for col in df.select_dtypes(include='object').columns:
+        if pd.api.types.infer_dtype(df[col], skipna=True) == 'string':
+            df[col] = df[col].astype(dtype)
+    return df
+def load_data(file_path, sample_size=None, progress_callback=None, sketches=None, seed=DEFAULT_SAMPLE_SEED):
+    """Load, clean and engineer the dataset; with sample_size, a seeded uniform random sample of the rows.
+
+    The whole file is read in chunks and only the sample_size rows with the
+    lowest seeded priority (see sampling.sample_positions) are kept between
+    chunks. Rows keep their file row number as index, so the same seed and a
+    smaller sample_size select a subset of a larger sample.
+    """
     try:
         if not os.path.exists(file_path):
             st.error(f"Error: File '{file_path}' not found")
             return pd.DataFrame()
         found_categories = set()
+        category_counts = np.zeros(len(CATEGORY_NAMES), dtype=np.int64)
         st.write("Starting to load data...")
         total_rows = 0
         try:
@@ -22,21 +50,21 @@ def load_data(file_path, sample_size=None, progress_callback=None):
             total_rows = 100000
             st.write("Unable to calculate total rows, using default estimate")
         chunks = []
-        chunk_size = min(100000, sample_size) if sample_size else 100000
+        chunk_size = 100000
         total_processed_rows = 0
         try:
             for chunk in pd.read_csv(file_path, chunksize=chunk_size):
                 chunk = chunk.dropna(subset=['categoryName']) if 'categoryName' in chunk.columns else chunk
-                if 'categoryName' in chunk.columns:
-                    current_categories = set(chunk['categoryName'].dropna().astype(str).unique())
-                else:
+                if 'videoCategoryId' in chunk.columns and 'categoryName' not in chunk.columns:
                     chunk = chunk.dropna(subset=['videoCategoryId'])
-                    current_categories = set(chunk['videoCategoryId'].dropna().astype(str).unique())
-                found_categories.update(current_categories)
-                sorted_categories = sorted(list(found_categories))
+                if 'videoCategoryId' in chunk.columns:
+                    category_counts += category_code_counts(chunk['videoCategoryId'])
+                elif 'categoryName' in chunk.columns:
+                    found_categories.update(chunk['categoryName'].astype(str).unique())
+                sorted_categories = sorted(found_categories.union(category_names_from_counts(category_counts)))
                 if progress_callback:
                     current_processed = total_processed_rows + len(chunk)
-                    display_total = min(sample_size, total_rows) if sample_size else total_rows
+                    display_total = total_rows
                     progress_percentage = (current_processed / display_total * 100) if display_total > 0 else 0
                     progress_percentage = min(progress_percentage, 100)
                     print(f"Debug - 回调进度: {current_processed}/{display_total} 行, 进度: {progress_percentage:.2f}%")
@@ -48,12 +76,12 @@ def load_data(file_path, sample_size=None, progress_callback=None):
                     })
                 chunks.append(chunk)
                 total_processed_rows += len(chunk)
+                if sample_size and sum(len(kept) for kept in chunks) > sample_size:
+                    kept = pd.concat(chunks)
+                    chunks = [kept.iloc[sample_positions(kept.index, sample_size, seed)]]
                 print(f"Debug - Chunk added, current processed rows: {total_processed_rows}, chunk size: {len(chunk)}")
                 st.write(f"Loaded {total_processed_rows:,} rows of data...")
-                st.write(f"Categories found so far: {len(found_categories)}")
-                if sample_size and total_processed_rows >= sample_size:
-                    print(f"Debug - Sample size {sample_size} reached, stopping loading")
-                    break
+                st.write(f"Categories found so far: {len(sorted_categories)}")
                 time.sleep(0.1)
         except pd.errors.EmptyDataError:
             st.error("Error: File is empty or incorrectly formatted")
@@ -61,12 +89,13 @@ def load_data(file_path, sample_size=None, progress_callback=None):
         except pd.errors.ParserError as e:
             st.error(f"Error: Failed to parse CSV file - {str(e)}")
             return pd.DataFrame()
-        df = pd.concat(chunks, ignore_index=True)
-        if sample_size and len(df) > sample_size:
-            df = df.sample(sample_size, random_state=42)
-            st.write(f"Data sampling completed, total {len(df):,} rows")
+        df = pd.concat(chunks)
+        if len(df) < total_processed_rows:
+            st.write(f"Data sampling completed, {len(df):,} of {total_processed_rows:,} rows (seed {seed})")
         else:
             st.write(f"Data loading completed, total {len(df):,} rows")
+        if sketches is not None:
+            sketches.update(df)
         st.write("Performing data quality checks...")
         required_columns = ['videoViewCount', 'subscriberCount', 'videoLikeCount', 'VideoCommentCount']
         missing_columns = [col for col in required_columns if col not in df.columns]
@@ -80,23 +109,17 @@ def load_data(file_path, sample_size=None, progress_callback=None):
                     st.warning(f"Column '{col}' contains {non_numeric_count} non-numeric values")
         if 'videoPublished' in df.columns:
             try:
-                df['videoPublished'] = pd.to_datetime(df['videoPublished'], errors='coerce')
-                if pd.api.types.is_datetime64_any_dtype(df['videoPublished']):
-                    df['publishYear'] = df['videoPublished'].dt.year
-                    df['publishMonth'] = df['videoPublished'].dt.month
-                    df['publishDate'] = df['videoPublished'].dt.date
-                else:
-                    st.warning("Unable to convert videoPublished column to datetime type")
+                df = add_calendar_features(df)
             except Exception as e:
                 st.warning(f"Error processing datetime: {str(e)}")
         numeric_cols = df.select_dtypes(include=[np.number]).columns
         for col in numeric_cols:
             df[col] = df[col].replace([-2.0, -1.0], np.nan)
             df[col] = df[col].replace([np.inf, -np.inf], np.nan)
-        if 'categoryName' in df.columns:
-            final_categories = sorted(list(df['categoryName'].dropna().astype(str).unique()))
+        if 'videoCategoryId' in df.columns:
+            final_categories = category_names_from_counts(category_code_counts(df['videoCategoryId']))
         else:
-            final_categories = sorted(list(df['videoCategoryId'].dropna().astype(str).unique()))
+            final_categories = sorted(df['categoryName'].dropna().astype(str).unique())
         if progress_callback:
             final_processed = len(df)
             display_total = min(sample_size, total_rows) if sample_size else total_rows
@@ -110,6 +133,9 @@ def load_data(file_path, sample_size=None, progress_callback=None):
         st.write("Data preprocessing completed")
         st.write(f"Final categories count: {len(final_categories)}")
         df = engineer_features(df)
+        df = add_channel_codes(df)
+        df = encode_channel_strings(df)
+        df = use_arrow_strings(df)
         return df
     except Exception as e:
         st.error(f"Data loading failed: {e}")
@@ -123,4 +149,19 @@ def load_data(file_path, sample_size=None, progress_callback=None):
                 'is_complete': True,
                 'error': str(e)
             })
-        return None
\ No newline at end of file
+        return None
+def export_dataframe(df, export_format):
+    """Serialize df for download as CSV text, Excel bytes or JSON records text."""
+    if export_format == "CSV":
+        return df.to_csv(index=False)
+    if export_format == "Excel":
+        tz_columns = [col for col in df.columns if isinstance(df[col].dtype, pd.DatetimeTZDtype)]
+        if tz_columns:
+            df = df.assign(**{col: df[col].dt.tz_convert(None) for col in tz_columns})
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False, sheet_name='YouTube Data')
+        return output.getvalue()
+    if export_format == "JSON":
+        return df.to_json(orient='records')
+    raise ValueError(f"Unsupported export format: {export_format}")
@@ -0,0 +1,119 @@
+import importlib
+import importlib.util
+import logging
+import numpy as np
+from utils.columns import column_values
+logger = logging.getLogger(__name__)
+KERNEL_INPUTS = ['videoViewCount', 'videoLikeCount', 'VideoCommentCount', 'videoDislikeCount', 'subscriberCount']
+KERNEL_OUTPUTS = {
+    'views_per_subscriber': ['videoViewCount', 'subscriberCount'],
+    'like_rate': ['videoLikeCount', 'videoViewCount'],
+    'comment_rate': ['VideoCommentCount', 'videoViewCount'],
+    'engagement_score': ['videoViewCount', 'videoLikeCount', 'VideoCommentCount'],
+    'dislike_rate': ['videoViewCount', 'videoDislikeCount'],
+    'net_likes': ['videoLikeCount', 'videoDislikeCount'],
+    'like_to_dislike_ratio': ['videoLikeCount', 'videoDislikeCount']
+}
+SCORE_COLUMNS = ['videoViewCount', 'videoLikeCount', 'VideoCommentCount']
+DEFAULT_SCORE_WEIGHTS = (0.4, 0.4, 0.2)
+KERNEL_BACKENDS = [name for name in ['numba', 'numexpr'] if importlib.util.find_spec(name) is not None] + ['numpy']
+DEFAULT_BACKEND = KERNEL_BACKENDS[0]
+_NUMEXPR_EXPRESSIONS = {
+    'views_per_subscriber': "where((s > 0) & (v > 0), v / s, nan)",
+    'like_rate': "where(v > 0, where(l / v > 1, 1.0, l / v), nan)",
+    'comment_rate': "where(v > 0, c / v, nan)",
+    'engagement_score': "where((v > 0) & (l == l) & (c == c), log1p(v) * wv + log1p(l) * wl + log1p(c) * wc, nan)",
+    'dislike_rate': "where(v > 0, d / v, nan)",
+    'net_likes': "l - d",
+    'like_to_dislike_ratio': "where(d > 0, l / d, nan)"
+}
+_compiled = {}
+def _numba_kernel():
+    """Fused per-row loop over all outputs, compiled with numba on first use (cached on disk)."""
+    if 'numba' not in _compiled:
+        numba = importlib.import_module('numba')
+        @numba.njit(cache=True)
+        def kernel(v, l, c, d, s, wv, wl, wc, out):
+            nan = np.nan
+            for i in range(len(v)):
+                vi, li, ci, di, si = v[i], l[i], c[i], d[i], s[i]
+                positive = vi > 0
+                out[0, i] = vi / si if positive and si > 0 else nan
+                rate = li / vi if positive else nan
+                out[1, i] = 1.0 if rate > 1 else rate
+                out[2, i] = ci / vi if positive else nan
+                out[3, i] = np.log1p(vi) * wv + np.log1p(li) * wl + np.log1p(ci) * wc if positive and li == li and ci == ci else nan
+                out[4, i] = di / vi if positive else nan
+                out[5, i] = li - di
+                out[6, i] = li / di if di > 0 else nan
+        _compiled['numba'] = kernel
+    return _compiled['numba']
+def _numpy_output(name, v, l, c, d, s, weights, out):
+    positive = v > 0
+    if name == 'views_per_subscriber':
+        np.divide(v, s, out=out, where=positive & (s > 0))
+    elif name == 'like_rate':
+        np.divide(l, v, out=out, where=positive)
+        np.minimum(out, 1.0, out=out, where=out > 1)
+    elif name == 'comment_rate':
+        np.divide(c, v, out=out, where=positive)
+    elif name == 'engagement_score':
+        valid = positive & ~np.isnan(l) & ~np.isnan(c)
+        np.log1p(v, out=out, where=valid)
+        np.multiply(out, weights[0], out=out, where=valid)
+        for values, weight in [(l, weights[1]), (c, weights[2])]:
+            term = np.log1p(values, where=valid, out=np.zeros_like(out))
+            np.add(out, term * weight, out=out, where=valid)
+    elif name == 'dislike_rate':
+        np.divide(d, v, out=out, where=positive)
+    elif name == 'net_likes':
+        np.subtract(l, d, out=out)
+    elif name == 'like_to_dislike_ratio':
+        np.divide(l, d, out=out, where=d > 0)
+def engagement_kernel(inputs, outputs=None, weights=DEFAULT_SCORE_WEIGHTS, backend=DEFAULT_BACKEND):
+    """Rate metrics and the weighted log engagement score from the base count arrays, into preallocated outputs.
+
+    inputs maps KERNEL_INPUTS names to float64 arrays (missing ones count as
+    NaN); outputs picks KERNEL_OUTPUTS names (all by default). Results follow
+    engineer_features: rates only where the denominator is positive, like_rate
+    capped at 1, the score only where views > 0 and likes and comments are known.
+    The numba backend computes every output in one fused pass over the rows,
+    numexpr evaluates one blocked expression per output, numpy uses in-place
+    ufuncs with where masks.
+    """
+    outputs = list(KERNEL_OUTPUTS) if outputs is None else list(outputs)
+    n = len(next(iter(inputs.values()))) if inputs else 0
+    missing = np.full(n, np.nan)
+    v, l, c, d, s = [np.ascontiguousarray(inputs[col], dtype=np.float64) if col in inputs else missing for col in KERNEL_INPUTS]
+    wv, wl, wc = (float(weight) for weight in weights)
+    if backend not in KERNEL_BACKENDS:
+        raise ValueError(f"Kernel backend not available: {backend}")
+    if backend == 'numba':
+        out = np.empty((len(KERNEL_OUTPUTS), n))
+        _numba_kernel()(v, l, c, d, s, wv, wl, wc, out)
+        return {name: out[i] for i, name in enumerate(KERNEL_OUTPUTS) if name in outputs}
+    out = np.full((len(outputs), n), np.nan)
+    if backend == 'numexpr':
+        numexpr = importlib.import_module('numexpr')
+        local_dict = {'v': v, 'l': l, 'c': c, 'd': d, 's': s, 'wv': wv, 'wl': wl, 'wc': wc, 'nan': np.nan}
+        for i, name in enumerate(outputs):
+            numexpr.evaluate(_NUMEXPR_EXPRESSIONS[name], local_dict=local_dict, out=out[i])
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i, name in enumerate(outputs):
+                _numpy_output(name, v, l, c, d, s, (wv, wl, wc), out[i])
+    return {name: out[i] for i, name in enumerate(outputs)}
+def engagement_metrics(df, outputs=None, weights=DEFAULT_SCORE_WEIGHTS, backend=DEFAULT_BACKEND):
+    """engagement_kernel over df's columns, for the outputs whose input columns df has."""
+    outputs = [name for name in (KERNEL_OUTPUTS if outputs is None else outputs)
+               if all(col in df.columns for col in KERNEL_OUTPUTS[name])]
+    if not outputs:
+        return {}
+    inputs = {col: column_values(df, col) for col in KERNEL_INPUTS if col in df.columns}
+    try:
+        return engagement_kernel(inputs, outputs, weights, backend)
+    except Exception as e:
+        if backend == 'numpy':
+            raise
+        logger.error(f"Error running {backend} engagement kernel, falling back to numpy: {str(e)}")
+        return engagement_kernel(inputs, outputs, weights, 'numpy')
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from utils.columns import column_values
+from utils.filters import OUTLIER_COLUMNS
+from utils.profile import group_codes
+OUTLIER_METHODS = {
+    'iqr': "IQR fences",
+    'mad': "Median absolute deviation",
+    'percentile': "Percentile range"
+}
+OUTLIER_SCALES = {
+    'log': "Log scale",
+    'raw': "Raw values"
+}
+DEFAULT_METHOD = 'iqr'
+DEFAULT_SCALE = 'log'
+DEFAULT_FACTORS = {'iqr': 1.5, 'mad': 3.5}
+DEFAULT_PERCENTILES = (0.01, 0.99)
+MAD_SCALE = 1.4826
+def to_scale(values, scale):
+    """Values on the scale thresholds are computed on (log1p of the non-negative part for 'log')."""
+    if scale == 'log':
+        return np.log1p(np.clip(values, 0, None))
+    return values
+def grouped_quantiles(values, codes, n_groups, q):
+    """Linearly interpolated quantiles q of values per group from one sort, as an (n_groups, len(q)) array.
+
+    Rows with NaN values are ignored; groups without values get NaN.
+    """
+    present = ~np.isnan(values)
+    values, codes = values[present], codes[present]
+    order = np.argsort(values, kind='stable')
+    order = order[np.argsort(codes[order], kind='stable')]
+    ordered = values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    result = np.full((n_groups, len(q)), np.nan)
+    filled = counts > 0
+    if not filled.any():
+        return result
+    positions = starts[filled, None] + np.asarray(q, dtype=np.float64)[None, :] * (counts[filled, None] - 1)
+    below = np.floor(positions).astype(np.int64)
+    above = np.minimum(below + 1, (starts + counts - 1)[filled, None])
+    weight = positions - below
+    result[filled] = ordered[below] * (1 - weight) + ordered[above] * weight
+    return result
+class OutlierThresholds:
+    """Per-group lower/upper fences for a set of numeric columns, fitted in one grouped pass per column.
+
+    Groups are categories by default; with group_col=None a single global fence
+    is used. Fences are fitted on all loaded rows, so the resulting mask does not
+    depend on which other filters run before it.
+    """
+    def __init__(self, columns, group_col, group_names, lower, upper, method, scale):
+        self.columns = columns
+        self.group_col = group_col
+        self.group_names = group_names
+        self.lower = lower
+        self.upper = upper
+        self.method = method
+        self.scale = scale
+    @classmethod
+    def fit(cls, df, columns=None, group_col='categoryName', method=DEFAULT_METHOD, scale=DEFAULT_SCALE, factor=None,
+            percentiles=DEFAULT_PERCENTILES):
+        """Fit fences with method 'iqr' (Q1/Q3 -/+ factor * IQR), 'mad' (median -/+ factor * 1.4826 * MAD) or 'percentile'.
+
+        A group and column whose IQR or MAD is 0 (e.g. mostly zero comment
+        counts) gets open (NaN) fences instead of fences collapsed onto one value.
+        """
+        if method not in OUTLIER_METHODS:
+            raise ValueError(f"Unknown outlier method: {method}")
+        if scale not in OUTLIER_SCALES:
+            raise ValueError(f"Unknown outlier scale: {scale}")
+        columns = OUTLIER_COLUMNS if columns is None else columns
+        columns = [col for col in columns if col in df.columns and pd.api.types.is_numeric_dtype(df[col])]
+        factor = DEFAULT_FACTORS.get(method) if factor is None else factor
+        codes, group_names = group_codes(df, group_col)
+        n_groups = len(group_names)
+        lower = np.full((n_groups, len(columns)), np.nan)
+        upper = np.full((n_groups, len(columns)), np.nan)
+        for j, col in enumerate(columns):
+            values = to_scale(column_values(df, col), scale)
+            if method == 'iqr':
+                q1, q3 = grouped_quantiles(values, codes, n_groups, [0.25, 0.75]).T
+                spread = np.where(q3 - q1 > 0, q3 - q1, np.nan)
+                lower[:, j], upper[:, j] = q1 - factor * spread, q3 + factor * spread
+            elif method == 'mad':
+                median = grouped_quantiles(values, codes, n_groups, [0.5])[:, 0]
+                mad = grouped_quantiles(np.abs(values - median[codes]), codes, n_groups, [0.5])[:, 0]
+                mad = np.where(mad > 0, mad, np.nan)
+                lower[:, j], upper[:, j] = median - factor * MAD_SCALE * mad, median + factor * MAD_SCALE * mad
+            else:
+                lower[:, j], upper[:, j] = grouped_quantiles(values, codes, n_groups, percentiles).T
+        return cls(columns, group_col, group_names, lower, upper, method, scale)
+    def row_codes(self, df):
+        """Group of every row of df in this fit's group order (unknown labels map to the missing group)."""
+        if self.group_col is None or self.group_col not in df.columns:
+            return np.full(len(df), len(self.group_names) - 1, dtype=np.int64)
+        labels = pd.Index(self.group_names[:-1])
+        column = df[self.group_col]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            lookup = np.append(labels.get_indexer(column.cat.categories), -1)
+            codes = lookup[column.cat.codes.to_numpy()]
+        else:
+            codes = labels.get_indexer(column)
+        codes[codes < 0] = len(self.group_names) - 1
+        return codes.astype(np.int64)
+    def mask(self, df):
+        """Boolean array of rows inside the fences of every column (missing values count as outside, NaN fences as no limit)."""
+        if not self.columns:
+            return None
+        codes = self.row_codes(df)
+        valid_mask = np.ones(len(df), dtype=bool)
+        for j, col in enumerate(self.columns):
+            values = to_scale(column_values(df, col), self.scale)
+            lower, upper = self.lower[codes, j], self.upper[codes, j]
+            valid_mask &= ~np.isnan(values) & ~(values < lower) & ~(values > upper)
+        return valid_mask
+    def fences(self):
+        """Fences per group and column on the original value scale, for display."""
+        lower, upper = self.lower, self.upper
+        if self.scale == 'log':
+            lower, upper = np.expm1(lower), np.expm1(upper)
+        index = pd.Index([name if name is not None else "(missing)" for name in self.group_names], name=self.group_col or 'group')
+        frames = {col: pd.DataFrame({'lower': lower[:, j], 'upper': upper[:, j]}, index=index) for j, col in enumerate(self.columns)}
+        return pd.concat(frames, axis=1).dropna(how='all')
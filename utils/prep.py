@@ -1,5 +1,121 @@
 import pandas as pd
 import numpy as np
+from utils.kernels import engagement_metrics
+from utils.seasonal import season_categorical
+CATEGORY_MAPPING = {
+    1: 'Film & Animation',
+    2: 'Autos & Vehicles',
+    10: 'Music',
+    15: 'Pets & Animals',
+    17: 'Sports',
+    18: 'Short Movies',
+    19: 'Travel & Events',
+    20: 'Gaming',
+    21: 'Videoblogging',
+    22: 'People & Blogs',
+    23: 'Comedy',
+    24: 'Entertainment',
+    25: 'News & Politics',
+    26: 'Howto & Style',
+    27: 'Education',
+    28: 'Science & Technology',
+    29: 'Nonprofits & Activism',
+    30: 'Movies',
+    31: 'Anime/Animation',
+    32: 'Action/Adventure',
+    33: 'Classics',
+    34: 'Comedy',
+    35: 'Documentary',
+    36: 'Drama',
+    37: 'Family',
+    38: 'Foreign',
+    39: 'Horror',
+    40: 'Sci-Fi/Fantasy',
+    41: 'Thriller',
+    42: 'Shorts',
+    43: 'Shows',
+    44: 'Trailers'
+}
+UNKNOWN_CATEGORY = 'Unknown'
+CATEGORY_NAMES = sorted(set(CATEGORY_MAPPING.values())) + [UNKNOWN_CATEGORY]
+CATEGORY_DTYPE = pd.CategoricalDtype(CATEGORY_NAMES)
+UNKNOWN_CATEGORY_CODE = len(CATEGORY_NAMES) - 1
+_CATEGORY_CODE_LOOKUP = np.full(max(CATEGORY_MAPPING) + 1, UNKNOWN_CATEGORY_CODE, dtype=np.int8)
+for _category_id, _category_name in CATEGORY_MAPPING.items():
+    _CATEGORY_CODE_LOOKUP[_category_id] = CATEGORY_NAMES.index(_category_name)
+def category_codes(category_ids):
+    """Map videoCategoryId values to codes into CATEGORY_NAMES through the lookup table."""
+    ids = pd.to_numeric(pd.Series(category_ids), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = (ids >= 0) & (ids < len(_CATEGORY_CODE_LOOKUP)) & (ids == np.floor(ids))
+    codes = np.full(len(ids), UNKNOWN_CATEGORY_CODE, dtype=np.int8)
+    codes[valid] = _CATEGORY_CODE_LOOKUP[ids[valid].astype(np.int64)]
+    return codes
+def categorize(category_ids):
+    """videoCategoryId values as a Categorical with the shared CATEGORY_DTYPE."""
+    return pd.Categorical.from_codes(category_codes(category_ids), dtype=CATEGORY_DTYPE)
+def category_code_counts(category_ids):
+    """Videos per entry of CATEGORY_NAMES, for streaming category discovery."""
+    return np.bincount(category_codes(category_ids), minlength=len(CATEGORY_NAMES))
+def category_names_from_counts(counts):
+    """Sorted names of the categories with a non-zero count."""
+    return sorted(CATEGORY_NAMES[code] for code in np.flatnonzero(counts))
+GROWTH_METRICS = {
+    'videoViewCount': 'view',
+    'videoLikeCount': 'like',
+    'VideoCommentCount': 'comment'
+}
+PREVIOUS_PREFIX = 'prev_'
+DATETIME_FORMATS = [
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d'
+]
+DATETIME_SAMPLE_SIZE = 200
+def detect_datetime_format(values, formats=None, sample_size=DATETIME_SAMPLE_SIZE):
+    """First format in formats that parses every value of a small non-null sample, else None."""
+    sample = pd.Series(values).dropna().head(sample_size).astype(str)
+    if len(sample) == 0:
+        return None
+    for fmt in formats or DATETIME_FORMATS:
+        try:
+            pd.to_datetime(sample, format=fmt, errors='raise')
+            return fmt
+        except (ValueError, TypeError):
+            continue
+    return None
+def parse_datetime_column(values):
+    """Parse with a format detected once; fall back to cached inference for irregular data."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    fmt = detect_datetime_format(values)
+    if fmt is not None:
+        return pd.to_datetime(values, format=fmt, errors='coerce')
+    return pd.to_datetime(values, errors='coerce', cache=True)
+def add_calendar_features(df, time_col='videoPublished'):
+    """Parse time_col once and derive publishYear/Month/Date, publishWeekday and publishHour from it."""
+    published = parse_datetime_column(df[time_col])
+    df[time_col] = published
+    if isinstance(published.dtype, pd.DatetimeTZDtype):
+        published = published.dt.tz_convert(None)
+    stamps = published.values.astype('datetime64[s]')
+    valid = ~np.isnat(stamps)
+    seconds = stamps.astype(np.int64)
+    years = stamps.astype('datetime64[Y]').astype(np.int64) + 1970
+    months = stamps.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    days = np.floor_divide(seconds, 86400)
+    weekdays = (days + 3) % 7
+    hours = np.floor_divide(seconds, 3600) % 24
+    def small_int(values, dtype):
+        values = np.where(valid, values, 0).astype(dtype)
+        return values if valid.all() else pd.arrays.IntegerArray(values, mask=~valid)
+    df['publishYear'] = small_int(years, np.int16)
+    df['publishMonth'] = small_int(months, np.int8)
+    df['publishDate'] = stamps.astype('datetime64[D]').astype('datetime64[ns]')
+    df['publishWeekday'] = small_int(weekdays, np.int8)
+    df['publishHour'] = small_int(hours, np.int8)
+    return df
 def clean_data(df):
     """Clean the data by replacing invalid values with NaN."""
     df_clean = df.copy()
@@ -19,81 +135,25 @@ def normalize_data(df):
 def engineer_features(df):
     """Engineer new features from the raw data."""
     df_eng = df.copy()
-    category_mapping = {
-        1: 'Film & Animation',
-        2: 'Autos & Vehicles',
-        10: 'Music',
-        15: 'Pets & Animals',
-        17: 'Sports',
-        18: 'Short Movies',
-        19: 'Travel & Events',
-        20: 'Gaming',
-        21: 'Videoblogging',
-        22: 'People & Blogs',
-        23: 'Comedy',
-        24: 'Entertainment',
-        25: 'News & Politics',
-        26: 'Howto & Style',
-        27: 'Education',
-        28: 'Science & Technology',
-        29: 'Nonprofits & Activism',
-        30: 'Movies',
-        31: 'Anime/Animation',
-        32: 'Action/Adventure',
-        33: 'Classics',
-        34: 'Comedy',
-        35: 'Documentary',
-        36: 'Drama',
-        37: 'Family',
-        38: 'Foreign',
-        39: 'Horror',
-        40: 'Sci-Fi/Fantasy',
-        41: 'Thriller',
-        42: 'Shorts',
-        43: 'Shows',
-        44: 'Trailers'
-    }
     if 'videoCategoryId' in df_eng.columns:
-        df_eng['categoryName'] = df_eng['videoCategoryId'].map(category_mapping)
-        df_eng['categoryName'] = df_eng['categoryName'].fillna('Unknown')
-    if all(col in df_eng.columns for col in ['videoViewCount', 'subscriberCount']):
-        mask = (df_eng['subscriberCount'] > 0) & (df_eng['videoViewCount'] > 0)
-        df_eng.loc[mask, 'views_per_subscriber'] = df_eng.loc[mask, 'videoViewCount'] / df_eng.loc[mask, 'subscriberCount']
-    if all(col in df_eng.columns for col in ['videoLikeCount', 'videoViewCount']):
-        mask = df_eng['videoViewCount'] > 0
-        df_eng.loc[mask, 'like_rate'] = df_eng.loc[mask, 'videoLikeCount'] / df_eng.loc[mask, 'videoViewCount']
-        outlier_mask = df_eng['like_rate'] > 1
-        df_eng.loc[outlier_mask, 'like_rate'] = 1.0
-    if all(col in df_eng.columns for col in ['VideoCommentCount', 'videoViewCount']):
-        mask = df_eng['videoViewCount'] > 0
-        df_eng.loc[mask, 'comment_rate'] = df_eng.loc[mask, 'VideoCommentCount'] / df_eng.loc[mask, 'videoViewCount']
-    if all(col in df_eng.columns for col in ['videoViewCount', 'videoLikeCount', 'VideoCommentCount']):
-        valid_mask = (df_eng['videoViewCount'] > 0) & (df_eng['videoLikeCount'].notna()) & (df_eng['VideoCommentCount'].notna())
-        if valid_mask.any():
-            df_eng.loc[valid_mask, 'engagement_score'] = (
-                np.log1p(df_eng.loc[valid_mask, 'videoViewCount']) * 0.4 +
-                np.log1p(df_eng.loc[valid_mask, 'videoLikeCount']) * 0.4 +
-                np.log1p(df_eng.loc[valid_mask, 'VideoCommentCount']) * 0.2
-            )
-    if all(col in df_eng.columns for col in ['videoViewCount', 'VideoCommentCount']):
-        mask = df_eng['videoViewCount'] > 0
-        df_eng.loc[mask, 'comment_rate'] = df_eng.loc[mask, 'VideoCommentCount'] / df_eng.loc[mask, 'videoViewCount']
-    if all(col in df_eng.columns for col in ['videoViewCount', 'videoDislikeCount']):
-        mask = df_eng['videoViewCount'] > 0
-        df_eng.loc[mask, 'dislike_rate'] = df_eng.loc[mask, 'videoDislikeCount'] / df_eng.loc[mask, 'videoViewCount']
+        df_eng['categoryName'] = pd.Categorical.from_codes(category_codes(df_eng['videoCategoryId']), dtype=CATEGORY_DTYPE)
+    metrics = engagement_metrics(df_eng)
+    for name in ['views_per_subscriber', 'like_rate', 'comment_rate', 'engagement_score', 'dislike_rate']:
+        if name in metrics and (name != 'engagement_score' or not np.isnan(metrics[name]).all()):
+            df_eng[name] = metrics[name]
     if 'publishMonth' in df_eng.columns:
-        def get_season(month):
-            if month in [12, 1, 2]:
-                return 'Winter'
-            elif month in [3, 4, 5]:
-                return 'Spring'
-            elif month in [6, 7, 8]:
-                return 'Summer'
-            else:
-                return 'Fall'
-        df_eng['season'] = df_eng['publishMonth'].apply(get_season)
-    if all(col in df_eng.columns for col in ['videoLikeCount', 'videoDislikeCount']):
-        df_eng['net_likes'] = df_eng['videoLikeCount'] - df_eng['videoDislikeCount']
-        mask = df_eng['videoDislikeCount'] > 0
-        df_eng.loc[mask, 'like_to_dislike_ratio'] = df_eng.loc[mask, 'videoLikeCount'] / df_eng.loc[mask, 'videoDislikeCount']
+        df_eng['season'] = season_categorical(df_eng['publishMonth'])
+    for name in ['net_likes', 'like_to_dislike_ratio']:
+        if name in metrics:
+            df_eng[name] = metrics[name]
+    return df_eng
+def engineer_growth_features(df):
+    """Engineer growth deltas and rates between each metric and its prev_ value from an earlier snapshot."""
+    df_eng = df.copy()
+    for col, name in GROWTH_METRICS.items():
+        previous_col = PREVIOUS_PREFIX + col
+        if all(c in df_eng.columns for c in [col, previous_col]):
+            df_eng[f'{name}_growth'] = df_eng[col] - df_eng[previous_col]
+            mask = df_eng[previous_col] > 0
+            df_eng.loc[mask, f'{name}_growth_rate'] = df_eng.loc[mask, f'{name}_growth'] / df_eng.loc[mask, previous_col]
     return df_eng
\ No newline at end of file
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from utils.channels import channel_dictionary
+from utils.columns import column_values
+from utils.filters import take_rows
+PAGE_SIZES = [25, 50, 100, 250]
+DEFAULT_PAGE_SIZE = 50
+def sort_keys(column):
+    """Float64 keys ordering a column like sort_values, NaN for missing: numbers as is, dates as integers, anything else by rank."""
+    if pd.api.types.is_numeric_dtype(column) and not isinstance(column.dtype, pd.CategoricalDtype):
+        return column.to_numpy(dtype=np.float64, na_value=np.nan)
+    if pd.api.types.is_datetime64_any_dtype(column):
+        values = column.to_numpy(dtype='datetime64[ns]')
+        return np.where(np.isnat(values), np.nan, values.view(np.int64).astype(np.float64))
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        ranks = np.argsort(np.argsort(column.cat.categories.astype(str), kind='stable')).astype(np.float64)
+    else:
+        codes, uniques = pd.factorize(column, sort=True)
+        ranks = np.arange(len(uniques), dtype=np.float64)
+    return np.where(codes >= 0, np.append(ranks, np.nan)[codes], np.nan)
+def sort_order(df, column, ascending=True):
+    """Row positions of df ordered by column (stable, missing values last); one argsort, meant to be cached per column."""
+    keys = column_values(df, column) if df[column].dtype == np.float64 else sort_keys(df[column])
+    return np.argsort(keys if ascending else -keys, kind='stable')
+def channel_index(df, column='channelName'):
+    """Search index over channel names: lowercased name dictionary plus each name's row positions (grouped by code)."""
+    codes, names = channel_dictionary(df[column])
+    present = np.flatnonzero(codes >= 0)
+    rows = present[np.argsort(codes[present], kind='stable')]
+    counts = np.bincount(codes[present], minlength=len(names))
+    return {
+        'names': names.str.lower(),
+        'rows': rows,
+        'starts': np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    }
+def search_rows(index, query):
+    """Sorted row positions whose channel name contains query (case-insensitive), matched on the name dictionary only."""
+    matched = np.flatnonzero(index['names'].str.contains(query.strip().lower(), regex=False))
+    if len(matched) == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts, stops = index['starts'][matched], index['starts'][matched + 1]
+    return np.sort(np.concatenate([index['rows'][start:stop] for start, stop in zip(starts, stops)]))
+def order_rows(order, positions):
+    """positions rearranged into the row order given by a full sort order (positions of a subset, in any order)."""
+    if len(positions) == len(order):
+        return order
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return positions[np.argsort(ranks[positions], kind='stable')]
+def page_rows(df, positions, page, page_size=DEFAULT_PAGE_SIZE):
+    """Rows of one 1-based page of positions, taken from df without touching the other rows."""
+    start = (page - 1) * page_size
+    return take_rows(df, positions[start:start + page_size])
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+from utils.columns import column_values
+from utils.sketches import DEFAULT_RELATIVE_ACCURACY, signed_log_keys, signed_log_values
+PROFILE_QUANTILES = [0.25, 0.5, 0.75]
+EXACT_INTEGER_RANGE = 65536
+def group_codes(df, group_col):
+    """Integer group per row (missing values get their own last group) and the group labels."""
+    if group_col not in df.columns:
+        return np.zeros(len(df), dtype=np.int64), [None]
+    column = df[group_col]
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes, names = column.cat.codes.to_numpy().astype(np.int64), list(column.cat.categories)
+    else:
+        codes, names = pd.factorize(column, sort=True)
+        codes, names = codes.astype(np.int64), list(names)
+    codes[codes < 0] = len(names)
+    return codes, names + [None]
+def _column_sketch(values, codes, relative_accuracy):
+    """Sparse (group, key, count) entries for one column plus how its keys decode to values."""
+    present = ~np.isnan(values)
+    values, codes = values[present], codes[present]
+    if len(values) == 0:
+        return (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)), ('exact', 0.0)
+    low, high = values.min(), values.max()
+    if np.all(values == np.round(values)) and high - low <= EXACT_INTEGER_RANGE:
+        keys, decode = (values - low).astype(np.int64), ('exact', float(low))
+    else:
+        keys = signed_log_keys(values, relative_accuracy).astype(np.int64)
+        shift = int(-keys.min())
+        keys, decode = keys + shift, ('log', shift)
+    span = int(keys.max()) + 1
+    combined_counts = np.bincount(codes * span + keys)
+    combined = np.flatnonzero(combined_counts)
+    return ((combined // span).astype(np.int32), (combined % span).astype(np.int32), combined_counts[combined]), decode
+class DatasetProfile:
+    """Per-column summary statistics kept as per-group partials (groups are categories by default).
+
+    Counts, nulls, mean/M2, min/max and quantile sketch entries combine exactly
+    across groups, so the profile of any category subset comes from the
+    partials without rescanning rows. Quantiles are approximate: exact for
+    small-range integer columns, within the sketch's relative accuracy otherwise.
+    """
+    def __init__(self, columns, dtypes, group_names, rows, nulls, numeric_columns, counts, means, m2, mins, maxs,
+                 sketches, memory, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.columns = columns
+        self.dtypes = dtypes
+        self.group_names = group_names
+        self.rows = rows
+        self.nulls = nulls
+        self.numeric_columns = numeric_columns
+        self.counts = counts
+        self.means = means
+        self.m2 = m2
+        self.mins = mins
+        self.maxs = maxs
+        self.sketches = sketches
+        self.memory = memory
+        self.relative_accuracy = relative_accuracy
+        self._selection = np.arange(len(group_names))
+    @classmethod
+    def from_frame(cls, df, group_col='categoryName', relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """Profile df in one grouped pass per statistic family."""
+        codes, group_names = group_codes(df, group_col)
+        n_groups = len(group_names)
+        rows = np.bincount(codes, minlength=n_groups).astype(np.int64)
+        nulls = df.isnull().groupby(codes).sum().reindex(range(n_groups), fill_value=0).to_numpy(dtype=np.int64)
+        numeric_columns = list(df.select_dtypes(include=[np.number]).columns)
+        shape = (n_groups, len(numeric_columns))
+        counts, means, m2 = np.zeros(shape, dtype=np.int64), np.full(shape, np.nan), np.zeros(shape)
+        mins, maxs = np.full(shape, np.nan), np.full(shape, np.nan)
+        sketches = {}
+        for j, col in enumerate(numeric_columns):
+            values = column_values(df, col)
+            present = ~np.isnan(values)
+            group_counts = np.bincount(codes[present], minlength=n_groups)
+            sums = np.bincount(codes[present], weights=values[present], minlength=n_groups)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                group_means = sums / group_counts
+            deviations = values[present] - group_means[codes[present]]
+            counts[:, j] = group_counts
+            means[:, j] = group_means
+            m2[:, j] = np.bincount(codes[present], weights=deviations * deviations, minlength=n_groups)
+            if present.any():
+                order = pd.Series(values[present]).groupby(codes[present]).agg(['min', 'max'])
+                mins[order.index, j] = order['min'].to_numpy()
+                maxs[order.index, j] = order['max'].to_numpy()
+            sketches[col] = _column_sketch(values, codes, relative_accuracy)
+        memory = df.memory_usage(deep=True, index=False)
+        dtypes = df.dtypes.astype(str)
+        return cls(list(df.columns), dtypes, group_names, rows, nulls, numeric_columns, counts, means, m2, mins, maxs,
+                   sketches, memory, relative_accuracy)
+    def subset(self, groups=None):
+        """Profile restricted to the given group labels (all groups when None), sharing the partials."""
+        profile = DatasetProfile.__new__(DatasetProfile)
+        profile.__dict__.update(self.__dict__)
+        if groups is not None:
+            wanted = set(groups)
+            profile._selection = np.array([i for i, name in enumerate(self.group_names) if name in wanted], dtype=np.int64)
+        return profile
+    @property
+    def n_rows(self):
+        return int(self.rows[self._selection].sum())
+    def group_rows(self):
+        """Rows per labelled group within the selection, largest first."""
+        labelled = [i for i in self._selection if self.group_names[i] is not None]
+        counts = pd.Series(self.rows[labelled], index=[self.group_names[i] for i in labelled], dtype=np.int64)
+        return counts[counts > 0].sort_values(ascending=False)
+    def null_counts(self):
+        return pd.Series(self.nulls[self._selection].sum(axis=0), index=self.columns)
+    def missing(self):
+        """Missing count and percentage per column, as in the overview's missing-value table."""
+        missing_data = self.null_counts()
+        missing_percent = (missing_data / max(self.n_rows, 1) * 100).round(2)
+        return pd.DataFrame({'Missing Count': missing_data, 'Missing Percentage': missing_percent})
+    def missing_fraction(self):
+        """Share of missing cells over the whole frame (NaN for an empty profile)."""
+        cells = self.n_rows * len(self.columns)
+        return self.null_counts().sum() / cells if cells else np.nan
+    def memory_usage(self):
+        """Estimated bytes per column, scaled from the full frame by the selected share of rows."""
+        total_rows = int(self.rows.sum())
+        return (self.memory * (self.n_rows / total_rows if total_rows else 0)).round().astype(np.int64)
+    def _moments(self):
+        counts = self.counts[self._selection]
+        means = np.nan_to_num(self.means[self._selection])
+        total = counts.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (counts * means).sum(axis=0) / total
+            m2 = self.m2[self._selection].sum(axis=0) + (counts * (means - mean) ** 2).sum(axis=0)
+            std = np.sqrt(m2 / (total - 1))
+        return total, mean, std
+    def mean(self, column):
+        _, mean, _ = self._moments()
+        return float(mean[self.numeric_columns.index(column)])
+    def max(self, column):
+        values = self.maxs[self._selection, self.numeric_columns.index(column)]
+        values = values[~np.isnan(values)]
+        return float(values.max()) if len(values) else np.nan
+    def group_means(self, column):
+        """Mean of column per labelled group within the selection (groups without values left out)."""
+        j = self.numeric_columns.index(column)
+        labelled = [i for i in self._selection if self.group_names[i] is not None and self.counts[i, j] > 0]
+        return pd.Series(self.means[labelled, j], index=[self.group_names[i] for i in labelled], dtype=np.float64)
+    def value_counts(self, column):
+        """Exact count per value of a small-range integer column over the selection (None if its sketch is approximate)."""
+        (group_ids, keys, counts), (mode, offset) = self.sketches[column]
+        if mode != 'exact':
+            return None
+        selected = np.isin(group_ids, self._selection)
+        key_counts = np.bincount(keys[selected], weights=counts[selected]).astype(np.int64)
+        present = np.flatnonzero(key_counts)
+        return pd.Series(key_counts[present], index=present + offset, dtype=np.int64)
+    def quantiles(self, column, q=PROFILE_QUANTILES):
+        """Approximate quantiles of column over the selected groups (NaN when no values)."""
+        (group_ids, keys, counts), (mode, offset) = self.sketches[column]
+        selected = np.isin(group_ids, self._selection)
+        if not selected.any():
+            return np.full(len(q), np.nan)
+        key_counts = np.bincount(keys[selected], weights=counts[selected])
+        cumulative = np.cumsum(key_counts)
+        targets = np.maximum(np.asarray(q, dtype=np.float64) * cumulative[-1], 1)
+        found = np.minimum(np.searchsorted(cumulative, targets - 1e-9, side='left'), len(key_counts) - 1)
+        if mode == 'exact':
+            return found + offset
+        return signed_log_values(found - offset, self.relative_accuracy)
+    def describe(self):
+        """Frame shaped like DataFrame.describe() for the numeric columns."""
+        total, mean, std = self._moments()
+        with np.errstate(invalid='ignore'):
+            mins = np.nanmin(np.where(np.isnan(self.mins[self._selection]), np.inf, self.mins[self._selection]), axis=0)
+            maxs = np.nanmax(np.where(np.isnan(self.maxs[self._selection]), -np.inf, self.maxs[self._selection]), axis=0)
+        mins = np.where(np.isinf(mins), np.nan, mins)
+        maxs = np.where(np.isinf(maxs), np.nan, maxs)
+        quantiles = np.array([self.quantiles(col) for col in self.numeric_columns]).reshape(len(self.numeric_columns), -1)
+        rows = {'count': total.astype(np.float64), 'mean': mean, 'std': std, 'min': mins}
+        for i, q in enumerate(PROFILE_QUANTILES):
+            rows[f"{q:.0%}"] = quantiles[:, i]
+        rows['max'] = maxs
+        return pd.DataFrame(rows, index=self.numeric_columns).T
+def view_profile(profile, view, removed, categories=None):
+    """Profile of a filtered view: derived from the category partials when only the category filter removed rows."""
+    if all(count == 0 for step, count in removed.items() if step != 'categories'):
+        return profile.subset(categories if removed.get('categories', 0) > 0 else None)
+    return DatasetProfile.from_frame(view)
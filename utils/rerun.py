@@ -0,0 +1,96 @@
+import logging
+from utils.channels import ChannelSketches, add_channel_codes, build_channel_table, encode_channel_strings
+from utils.profile import DatasetProfile
+from utils.sampling import DEFAULT_SAMPLE_SEED, sample_positions
+logger = logging.getLogger(__name__)
+REUSE = 'reuse'
+RESAMPLE = 'resample'
+RELOAD = 'reload'
+def dataset_key(file_path, sample_size=None, seed=DEFAULT_SAMPLE_SEED):
+    return ('dataset', file_path, sample_size, None if sample_size is None else seed)
+def holds_every_row(cache, key):
+    """Whether the cached dataset under key has every row of its file: unsampled, or a sample that came up short of its size."""
+    return key[2] is None or len(cache.peek(key)['df']) < key[2]
+def find_superset(cache, file_path, sample_size, seed=DEFAULT_SAMPLE_SEED):
+    """Key of the smallest cached dataset of file_path whose loaded rows include the sample of sample_size rows under seed.
+
+    load_data keeps the rows with the lowest seeded priority, so a dataset
+    loaded with the same seed and a larger sample contains exactly those rows.
+    A dataset holding every row of the file (see holds_every_row) contains the
+    sample of any size and seed, and is the only superset of an unsampled load.
+    """
+    candidates = [key for key in cache.keys('dataset')
+                  if key[1] == file_path and key != dataset_key(file_path, sample_size, seed)
+                  and (holds_every_row(cache, key) or (sample_size is not None and key[3] == seed and key[2] > sample_size))]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda key: float('inf') if key[2] is None else key[2])
+def plan_load(cache, file_path, sample_size=None, refresh=False, seed=DEFAULT_SAMPLE_SEED):
+    """What this rerun needs to get the dataset for (file_path, sample_size, seed): (REUSE|RESAMPLE|RELOAD, source key).
+
+    REUSE of another key means that cached dataset already holds every row
+    the requested load would keep (e.g. an unsampled request after a sample
+    larger than the file).
+    """
+    key = dataset_key(file_path, sample_size, seed)
+    if refresh:
+        return RELOAD, None
+    if key in cache:
+        return REUSE, key
+    superset = find_superset(cache, file_path, sample_size, seed)
+    if superset is None:
+        return RELOAD, None
+    if holds_every_row(cache, superset) and (sample_size is None or len(cache.peek(superset)['df']) <= sample_size):
+        return REUSE, superset
+    return RESAMPLE, superset
+def resample_dataset(dataset, sample_size, data_version, seed=DEFAULT_SAMPLE_SEED):
+    """Dataset bundle for the seeded sample of sample_size rows of a loaded superset, without re-reading the file.
+
+    The superset's index holds file row numbers, so sample_positions picks the
+    same rows load_data would. Channel codes, the profile, channel sketches
+    and channel table are rebuilt for the smaller frame.
+    """
+    source = dataset['df']
+    df = source.take(sample_positions(source.index, sample_size, seed))
+    df = encode_channel_strings(add_channel_codes(df))
+    logger.info(f"Resampled {len(df):,} of {len(dataset['df']):,} cached rows")
+    return {
+        'df': df,
+        'data_version': data_version,
+        'dataset_profile': DatasetProfile.from_frame(df),
+        'channel_sketches': ChannelSketches().update(df),
+        'channel_table': build_channel_table(df)
+    }
+class RerunCoordinator:
+    """Tracks what the last rerun applied so each rerun does only the work its changed inputs require.
+
+    Inputs are split into the dataset (file, sample size and seed: reuse,
+    resample or reload), the filters (re-filter) and everything else
+    (re-render only). There is no timer debounce: Streamlit 1.29 cannot
+    schedule a deferred rerun, so every widget event still starts a rerun.
+    Each rerun applies the latest widget values and skips the stages whose
+    inputs did not change since the last applied rerun.
+    """
+    def __init__(self):
+        self.dataset = None
+        self.filters = None
+        self.counts = {REUSE: 0, RESAMPLE: 0, RELOAD: 0, 'refilter': 0, 'render': 0}
+    def changes(self, dataset, filters):
+        """Which of 'dataset' and 'filters' differ from the last applied rerun (empty when only rendering changed)."""
+        changed = set()
+        if dataset != self.dataset:
+            changed.add('dataset')
+        if filters != self.filters:
+            changed.add('filters')
+        return changed
+    def applied(self, dataset, filters, load_action):
+        """Record the inputs this rerun applied and how the dataset was obtained."""
+        changed = self.changes(dataset, filters)
+        if 'dataset' in changed or load_action == RELOAD:
+            self.counts[load_action] += 1
+        elif 'filters' in changed:
+            self.counts['refilter'] += 1
+        else:
+            self.counts['render'] += 1
+        self.dataset = dataset
+        self.filters = filters
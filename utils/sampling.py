@@ -0,0 +1,171 @@
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from utils.kernels import KERNEL_INPUTS, engagement_metrics
+from utils.prep import CATEGORY_NAMES, UNKNOWN_CATEGORY_CODE, category_codes
+from utils.profile import group_codes
+DEFAULT_SAMPLE_SEED = 42
+MIN_ROWS_PER_GROUP = 20
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_TARGET_ERROR = 0.05
+MIN_GROUP_SHARE = 0.05
+ADAPTIVE_INITIAL_ROWS = 5000
+ADAPTIVE_CHUNK_ROWS = 5000
+def sample_priorities(row_numbers, seed=DEFAULT_SAMPLE_SEED):
+    """Uniform pseudo-random uint64 priority of each file row number under seed (splitmix64 of row and seed)."""
+    with np.errstate(over='ignore'):
+        z = np.asarray(row_numbers, dtype=np.uint64) + np.uint64(seed) * np.uint64(0xD1B54A32D192ED03) + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+def sample_positions(row_numbers, n, seed=DEFAULT_SAMPLE_SEED):
+    """Sorted positions of the n rows with the lowest seeded priority (a uniform random sample of n rows).
+
+    The sample of n rows is contained in the sample of any larger n from the
+    same rows and seed, so a smaller sample can be cut from a cached larger one.
+    """
+    row_numbers = np.asarray(row_numbers, dtype=np.int64)
+    if n >= len(row_numbers):
+        return np.arange(len(row_numbers))
+    order = np.lexsort((row_numbers, sample_priorities(row_numbers, seed)))
+    return np.sort(order[:n])
+def stratified_positions(df, n, group_col='categoryName', seed=DEFAULT_SAMPLE_SEED, min_per_group=MIN_ROWS_PER_GROUP):
+    """Sorted row positions of a random sample of about n rows, allocated to groups in proportion to their size.
+
+    Every group keeps at least min_per_group rows (or all of its rows), so
+    small categories still appear in sampled charts.
+    """
+    if n >= len(df):
+        return np.arange(len(df))
+    codes, group_names = group_codes(df, group_col)
+    sizes = np.bincount(codes, minlength=len(group_names))
+    quotas = np.minimum(sizes, np.maximum(np.round(sizes * (n / len(df))).astype(np.int64), min_per_group))
+    order = np.random.default_rng(seed).permutation(len(df))
+    order = order[np.argsort(codes[order], kind='stable')]
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    ranks = np.arange(len(df)) - np.repeat(starts, sizes)
+    return np.sort(order[ranks < np.repeat(quotas, sizes)])
+class SampleEstimates:
+    """Running sums behind the headline statistics and their analytic confidence intervals.
+
+    Covers category shares, average and geometric mean views, average like
+    rate (overall and for categories with at least min_group_share of the rows)
+    and the like/comment rate correlation. Sums merge across chunks, so the
+    estimates grow with a streaming read. Intervals treat rows as independent
+    draws: Wald intervals for shares, normal intervals for means (the geometric
+    mean on log views) and Fisher's z for the correlation. The raw average of
+    heavy-tailed views is reported but left out of the stopping target, since
+    its error stays large long after every other statistic is precise.
+    """
+    def __init__(self, min_group_share=MIN_GROUP_SHARE):
+        self.min_group_share = min_group_share
+        self.rows = 0
+        self.category_rows = np.zeros(len(CATEGORY_NAMES), dtype=np.int64)
+        self.views = np.zeros(3)
+        self.log_views = np.zeros(3)
+        self.like_rate = np.zeros((len(CATEGORY_NAMES), 3))
+        self.pairs = np.zeros(6)
+    def update(self, chunk):
+        """Fold in a chunk of raw (or engineered) video rows."""
+        if 'videoCategoryId' in chunk.columns:
+            codes = category_codes(chunk['videoCategoryId'])
+        elif 'categoryName' in chunk.columns:
+            codes = pd.Categorical(chunk['categoryName'], categories=CATEGORY_NAMES).codes.astype(np.int64)
+            codes[codes < 0] = UNKNOWN_CATEGORY_CODE
+        else:
+            codes = np.full(len(chunk), UNKNOWN_CATEGORY_CODE, dtype=np.int64)
+        self.rows += len(chunk)
+        self.category_rows += np.bincount(codes, minlength=len(CATEGORY_NAMES))
+        counts = pd.DataFrame({
+            col: pd.to_numeric(chunk[col], errors='coerce').replace([-2.0, -1.0], np.nan)
+            for col in KERNEL_INPUTS if col in chunk.columns
+        })
+        if 'videoViewCount' in counts.columns:
+            views = counts['videoViewCount'].to_numpy(dtype=np.float64)
+            views = views[~np.isnan(views)]
+            self.views += [len(views), views.sum(), (views * views).sum()]
+            log_views = np.log1p(views[views >= 0])
+            self.log_views += [len(log_views), log_views.sum(), (log_views * log_views).sum()]
+        metrics = engagement_metrics(counts, ['like_rate', 'comment_rate'])
+        if 'like_rate' in metrics:
+            like_rate = metrics['like_rate']
+            present = ~np.isnan(like_rate)
+            for power in range(3):
+                self.like_rate[:, power] += np.bincount(codes[present], weights=like_rate[present] ** power, minlength=len(CATEGORY_NAMES))
+            if 'comment_rate' in metrics:
+                comment_rate = metrics['comment_rate']
+                both = present & ~np.isnan(comment_rate)
+                x, y = like_rate[both], comment_rate[both]
+                self.pairs += [len(x), x.sum(), y.sum(), (x * x).sum(), (y * y).sum(), (x * y).sum()]
+        return self
+    @staticmethod
+    def _mean_interval(n, total, squares, z):
+        if n < 2:
+            return np.nan, np.nan
+        mean = total / n
+        variance = max(squares / n - mean * mean, 0.0) * n / (n - 1)
+        return mean, z * np.sqrt(variance / n)
+    def intervals(self, confidence=DEFAULT_CONFIDENCE):
+        """Frame of statistic, estimate, half-width, error (relative for averages, absolute for shares and correlation) and in_target.
+
+        Only in_target statistics count towards max_error and the adaptive stopping rule.
+        """
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        records = []
+        if self.rows > 0:
+            shares = self.category_rows / self.rows
+            for code in np.flatnonzero(self.category_rows):
+                half_width = z * np.sqrt(shares[code] * (1 - shares[code]) / self.rows)
+                records.append((f"Share: {CATEGORY_NAMES[code]}", shares[code], half_width, half_width, 'absolute', True))
+        mean, half_width = self._mean_interval(*self.views, z)
+        if not np.isnan(mean):
+            records.append(("Average Views", mean, half_width, half_width / abs(mean) if mean else np.inf, 'relative', False))
+        mean, half_width = self._mean_interval(*self.log_views, z)
+        if not np.isnan(mean):
+            records.append(("Geometric Mean Views", np.expm1(mean), np.expm1(mean + half_width) - np.expm1(mean),
+                            np.expm1(half_width), 'relative', True))
+        overall = self.like_rate.sum(axis=0)
+        mean, half_width = self._mean_interval(*overall, z)
+        if not np.isnan(mean):
+            records.append(("Average Like Rate", mean, half_width, half_width / abs(mean) if mean else np.inf, 'relative', True))
+        for code in np.flatnonzero(self.like_rate[:, 0] >= self.min_group_share * max(overall[0], 1)):
+            mean, half_width = self._mean_interval(*self.like_rate[code], z)
+            if not np.isnan(mean):
+                records.append((f"Like Rate: {CATEGORY_NAMES[code]}", mean, half_width,
+                                half_width / abs(mean) if mean else np.inf, 'relative', True))
+        n, sx, sy, sxx, syy, sxy = self.pairs
+        if n > 3:
+            covariance, var_x, var_y = sxy - sx * sy / n, sxx - sx * sx / n, syy - sy * sy / n
+            if var_x > 0 and var_y > 0:
+                r = float(np.clip(covariance / np.sqrt(var_x * var_y), -0.999999, 0.999999))
+                low, high = np.tanh(np.arctanh(r) - z / np.sqrt(n - 3)), np.tanh(np.arctanh(r) + z / np.sqrt(n - 3))
+                half_width = max(r - low, high - r)
+                records.append(("Like/Comment Rate Correlation", r, half_width, half_width, 'absolute', True))
+        return pd.DataFrame(records, columns=['statistic', 'estimate', 'half_width', 'error', 'error_kind', 'in_target'])
+    def max_error(self, confidence=DEFAULT_CONFIDENCE):
+        intervals = self.intervals(confidence)
+        errors = intervals.loc[intervals['in_target'], 'error']
+        return float(errors.max()) if len(errors) else np.inf
+def adaptive_sample_size(file_path, target_error=DEFAULT_TARGET_ERROR, confidence=DEFAULT_CONFIDENCE,
+                         initial_rows=ADAPTIVE_INITIAL_ROWS, chunk_rows=ADAPTIVE_CHUNK_ROWS, progress_callback=None):
+    """Rows to load from the start of file_path for every headline statistic to reach target_error, and their estimates.
+
+    Streams only the category and count columns, checking the intervals after
+    each chunk once initial_rows are in. Returns (None, estimates) when the
+    target is only met (or never met) by the whole file, meaning a full load.
+    """
+    header = pd.read_csv(file_path, nrows=0).columns
+    columns = [col for col in ['videoCategoryId', 'categoryName', *KERNEL_INPUTS] if col in header]
+    estimates = SampleEstimates()
+    for chunk in pd.read_csv(file_path, usecols=columns, chunksize=chunk_rows):
+        if 'categoryName' in chunk.columns:
+            chunk = chunk.dropna(subset=['categoryName'])
+        estimates.update(chunk)
+        if estimates.rows < initial_rows:
+            continue
+        error = estimates.max_error(confidence)
+        if progress_callback:
+            progress_callback({'processed_rows': estimates.rows, 'max_error': error})
+        if error <= target_error:
+            return estimates.rows, estimates
+    return None, estimates
@@ -0,0 +1,199 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+import streamlit as st
+from utils.figure_payload import figure_title, plotly_chart
+from utils.filters import take_rows
+from utils.sampling import stratified_positions
+from utils.session_cache import value_fingerprint
+logger = logging.getLogger(__name__)
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+PROGRESSIVE_MIN_ROWS = 200000
+PROGRESSIVE_SAMPLE_ROWS = 20000
+def _script_run_context():
+    """Current Streamlit script context and the function that attaches it to a thread (None outside a run)."""
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    except ImportError:
+        return None, None
+    return get_script_run_ctx(), add_script_run_ctx
+def _run_job(builder, args, kwargs, slot=None, ctx=None, attach=None):
+    """Call one builder, writing any Streamlit output it makes into its own slot."""
+    if ctx is not None and attach is not None:
+        attach(threading.current_thread(), ctx)
+    try:
+        if slot is None:
+            return builder(*args, **kwargs)
+        with slot:
+            return builder(*args, **kwargs)
+    except Exception as e:
+        logger.error(f"Error building chart with {getattr(builder, '__name__', builder)}: {str(e)}")
+        if slot is not None:
+            with slot:
+                st.error("Error creating chart, please check logs for details")
+        return None
+def build_figures(jobs, max_workers=DEFAULT_MAX_WORKERS, slots=None, on_result=None):
+    """Run (builder, args, kwargs) jobs concurrently and return their figures in job order.
+
+    A job that raises yields None, like the builders' own error handling.
+    on_result(index, figure) is called on the calling thread as each job finishes.
+    """
+    slots = slots if slots is not None else [None] * len(jobs)
+    ctx, attach = _script_run_context()
+    if max_workers <= 1 or len(jobs) <= 1:
+        figures = []
+        for index, ((builder, args, kwargs), slot) in enumerate(zip(jobs, slots)):
+            figures.append(_run_job(builder, args, kwargs, slot))
+            if on_result is not None:
+                on_result(index, figures[-1])
+        return figures
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)), thread_name_prefix='chart') as pool:
+        futures = {
+            pool.submit(_run_job, builder, args, kwargs, slot, ctx, attach): index
+            for index, ((builder, args, kwargs), slot) in enumerate(zip(jobs, slots))
+        }
+        figures = [None] * len(jobs)
+        for future in as_completed(futures):
+            figures[futures[future]] = future.result()
+            if on_result is not None:
+                on_result(futures[future], figures[futures[future]])
+        return figures
+class ChartScheduler:
+    """Collects chart jobs in display order, builds them concurrently, then renders each into its placeholder.
+
+    With a SessionCache and a cache_key identifying the data view, rendered
+    figures are kept in the cache (sized by payload bytes) and reused on reruns
+    that queue the same builder with the same arguments.
+
+    In progressive mode, jobs over frames of at least min_rows rows also get a
+    preview built from a stratified sample and shown with an approximate badge.
+    Previews and exact figures share one executor, previews submitted first, so
+    exact figures build while previews are shown and each replaces its preview
+    in place as soon as it is built. run() still returns only once every exact
+    figure is in, since a Streamlit run cannot hand work to a later rerun.
+    """
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, cache=None, cache_key=None, progressive=False,
+                 sample_rows=PROGRESSIVE_SAMPLE_ROWS, min_rows=PROGRESSIVE_MIN_ROWS):
+        self.max_workers = max_workers
+        self.cache = cache if cache_key is not None else None
+        self.cache_key = cache_key
+        self.progressive = progressive
+        self.sample_rows = sample_rows
+        self.min_rows = min_rows
+        self.jobs = []
+        self.slots = []
+        self.chart_slots = []
+        self.empty_warnings = []
+        self.payloads = []
+        self.previews = 0
+    def add(self, builder, *args, empty_warning=None, **kwargs):
+        """Reserve a placeholder at the current position for builder(*args, **kwargs).
+
+        empty_warning is shown in the placeholder when the builder returns no figure.
+        """
+        with st.container():
+            self.slots.append(st.container())
+            self.chart_slots.append(st.empty())
+        self.jobs.append((builder, args, kwargs))
+        self.empty_warnings.append(empty_warning)
+        return len(self.jobs) - 1
+    def _figure_key(self, job):
+        if self.cache is None:
+            return None
+        builder, args, kwargs = job
+        return ('figure', self.cache_key, getattr(builder, '__name__', repr(builder)), value_fingerprint(args), value_fingerprint(kwargs))
+    def _sample_positions(self, frame):
+        key = ('sample', self.cache_key, len(frame), self.sample_rows)
+        positions = self.cache.get(key) if self.cache is not None else None
+        if positions is None or len(positions) > len(frame):
+            positions = stratified_positions(frame, self.sample_rows)
+            if self.cache is not None:
+                self.cache.put(key, positions, kind='mask')
+        return positions
+    def _preview_job(self, job, samples):
+        """The job with every large frame argument replaced by its stratified sample (None when nothing is large)."""
+        builder, args, kwargs = job
+        def sampled(value):
+            if not isinstance(value, pd.DataFrame) or len(value) < self.min_rows:
+                return value
+            if id(value) not in samples:
+                samples[id(value)] = take_rows(value, self._sample_positions(value))
+            return samples[id(value)]
+        preview_args = tuple(sampled(value) for value in args)
+        preview_kwargs = {name: sampled(value) for name, value in kwargs.items()}
+        if all(a is b for a, b in zip(preview_args, args)) and all(preview_kwargs[name] is kwargs[name] for name in kwargs):
+            return None
+        return builder, preview_args, preview_kwargs
+    def _render(self, index, figure, key):
+        if figure:
+            with self.chart_slots[index]:
+                payload_bytes = plotly_chart(figure)
+            self.payloads[index] = (figure_title(figure), payload_bytes)
+            if key is not None and payload_bytes is not None:
+                self.cache.put(key, figure, kind='figure', nbytes=payload_bytes)
+        elif self.empty_warnings[index]:
+            with self.chart_slots[index]:
+                st.warning(self.empty_warnings[index])
+        else:
+            self.chart_slots[index].empty()
+    def run(self, progress_callback=None):
+        """Build every queued figure, render the non-empty ones and return all figures in display order.
+
+        Payload bytes of each rendered chart are kept in self.payloads.
+        progress_callback receives {'processed_charts', 'total_charts', 'is_complete'}
+        as exact figures are rendered.
+        """
+        keys = [self._figure_key(job) for job in self.jobs]
+        figures = [self.cache.get(key) if key is not None else None for key in keys]
+        pending = [i for i, figure in enumerate(figures) if figure is None]
+        self.payloads = [None] * len(self.jobs)
+        for i, figure in enumerate(figures):
+            if figure is not None:
+                self._render(i, figure, keys[i])
+        self.previews = 0
+        preview_jobs = {}
+        if self.progressive and pending:
+            samples = {}
+            for i in pending:
+                preview_job = self._preview_job(self.jobs[i], samples)
+                if preview_job is not None:
+                    preview_jobs[i] = preview_job
+        processed = []
+        def finish(i, figure):
+            figures[i] = figure
+            self._render(i, figure, keys[i])
+            processed.append(i)
+            if progress_callback:
+                progress_callback({
+                    'processed_charts': len(processed),
+                    'total_charts': len(pending),
+                    'is_complete': len(processed) == len(pending)
+                })
+        building_previews = set(preview_jobs)
+        held = {}
+        def show_preview(i, figure):
+            building_previews.discard(i)
+            if i in held:
+                finish(i, held.pop(i))
+            elif figure:
+                with self.chart_slots[i].container():
+                    st.caption(f"⏳ Approximate: {self.sample_rows:,}-row stratified sample, refining with all rows...")
+                    plotly_chart(figure, key=f"chart-preview-{id(self)}-{i}")
+                self.previews += 1
+        def show_exact(i, figure):
+            if i in building_previews:
+                held[i] = figure
+            else:
+                finish(i, figure)
+        targets = [(show_preview, i) for i in preview_jobs] + [(show_exact, i) for i in pending]
+        build_figures(
+            list(preview_jobs.values()) + [self.jobs[i] for i in pending],
+            self.max_workers,
+            [self.chart_slots[i] for i in preview_jobs] + [self.slots[i] for i in pending],
+            on_result=lambda index, figure: targets[index][0](targets[index][1], figure)
+        )
+        self.payloads = [payload for payload in self.payloads if payload is not None]
+        self.jobs, self.slots, self.chart_slots, self.empty_warnings = [], [], [], []
+        return figures
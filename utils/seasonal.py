@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+from utils.columns import column_values
+from utils.profile import group_codes
+from utils.timeseries import TIME_SERIES_METRICS
+SEASONS = ['Winter', 'Spring', 'Summer', 'Fall']
+SEASON_DTYPE = pd.CategoricalDtype(SEASONS)
+MONTH_SEASON_CODES = np.array([-1, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype=np.int8)
+SEASONAL_INDEX_BASES = ['Video Count', 'Average Views', 'Average Likes', 'Average Comments']
+def season_codes(months):
+    """Season code (index into SEASONS) of each month number through a lookup array; -1 for missing or invalid months."""
+    months = pd.Series(months).to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = (months >= 1) & (months <= 12) & (months == np.floor(months))
+    codes = np.full(len(months), -1, dtype=np.int8)
+    codes[valid] = MONTH_SEASON_CODES[months[valid].astype(np.int64)]
+    return codes
+def season_categorical(months):
+    """Seasons of month numbers as a Categorical with the shared SEASON_DTYPE."""
+    return pd.Categorical.from_codes(season_codes(months), dtype=SEASON_DTYPE)
+def _row_season_codes(df):
+    if 'season' in df.columns and df['season'].dtype == SEASON_DTYPE:
+        return df['season'].cat.codes.to_numpy()
+    if 'publishMonth' in df.columns:
+        return season_codes(df['publishMonth'])
+    return None
+class SeasonalCube:
+    """Video counts and metric sums per (year, season, category) cell, built in one pass over the rows.
+
+    Seasonal tables and year-normalized indices are derived from the cells
+    only, so their cost depends on years x 4 x categories, not on row count.
+    """
+    def __init__(self, years, categories, counts, sums, metric_counts):
+        self.years = years
+        self.categories = categories
+        self.counts = counts
+        self.sums = sums
+        self.metric_counts = metric_counts
+    @classmethod
+    def from_frame(cls, df, group_col='categoryName'):
+        """Build the cube from publishYear and publishMonth (or season); returns None without them."""
+        season = _row_season_codes(df)
+        if season is None or 'publishYear' not in df.columns:
+            return None
+        year_values = column_values(df, 'publishYear')
+        valid = (season >= 0) & ~np.isnan(year_values)
+        years, year_index = np.unique(year_values[valid].astype(np.int64), return_inverse=True)
+        category_index, categories = group_codes(df, group_col)
+        shape = (len(years), len(SEASONS), len(categories))
+        cells = np.ravel_multi_index((year_index, season[valid].astype(np.int64), category_index[valid]), shape)
+        counts = np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape).astype(np.int64)
+        sums, metric_counts = {}, {}
+        for label, col in TIME_SERIES_METRICS.items():
+            if col not in df.columns:
+                continue
+            values = column_values(df, col)[valid]
+            present = ~np.isnan(values)
+            sums[label] = np.bincount(cells[present], weights=values[present], minlength=int(np.prod(shape))).reshape(shape)
+            metric_counts[label] = np.bincount(cells[present], minlength=int(np.prod(shape))).reshape(shape).astype(np.int64)
+        return cls(years, categories, counts, sums, metric_counts)
+    @property
+    def n_cells(self):
+        return int(self.counts.size)
+    @property
+    def nbytes(self):
+        arrays = [self.years, self.counts, *self.sums.values(), *self.metric_counts.values()]
+        return int(sum(array.nbytes for array in arrays))
+    def _category_axis(self, categories):
+        if categories is None:
+            return slice(None)
+        wanted = set(categories)
+        return [i for i, name in enumerate(self.categories) if name in wanted]
+    def season_table(self, categories=None):
+        """One row per season: Video Count plus Total and Average per metric (over all years)."""
+        axis = self._category_axis(categories)
+        counts = self.counts[:, :, axis].sum(axis=(0, 2))
+        table = {'Season': SEASONS, 'Video Count': counts}
+        for label, sums in self.sums.items():
+            totals = sums[:, :, axis].sum(axis=(0, 2))
+            metric_counts = self.metric_counts[label][:, :, axis].sum(axis=(0, 2))
+            table[f'Total {label}'] = totals
+            with np.errstate(invalid='ignore', divide='ignore'):
+                table[f'Average {label}'] = np.where(metric_counts > 0, totals / metric_counts, np.nan)
+        return pd.DataFrame(table)
+    def seasonal_index(self, basis='Video Count', categories=None, complete_years=True):
+        """Year-normalized seasonal index per season (1.0 = the year's average season), averaged over years.
+
+        For each year, every season's value (its video count, or its average of
+        a metric) is divided by the mean over that year's seasons, which removes
+        growth between years; the per-year indices are then averaged. With
+        complete_years only years that have videos in all four seasons count.
+        """
+        axis = self._category_axis(categories)
+        counts = self.counts[:, :, axis].sum(axis=2).astype(np.float64)
+        if basis == 'Video Count':
+            values = counts
+        else:
+            label = basis.replace('Average ', '')
+            if label not in self.sums:
+                return None
+            metric_counts = self.metric_counts[label][:, :, axis].sum(axis=2)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = np.where(metric_counts > 0, self.sums[label][:, :, axis].sum(axis=2) / metric_counts, np.nan)
+        keep = (counts > 0).all(axis=1) if complete_years else (counts > 0).any(axis=1)
+        if not keep.any():
+            return None
+        values = values[keep]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            index = values / np.nanmean(np.where(counts[keep] > 0, values, np.nan), axis=1, keepdims=True)
+        return pd.DataFrame({
+            'Season': SEASONS,
+            'Seasonal Index': np.nanmean(index, axis=0),
+            'Years': np.sum(~np.isnan(index), axis=0).astype(np.int64)
+        })
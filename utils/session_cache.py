@@ -0,0 +1,159 @@
+import logging
+import sys
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+logger = logging.getLogger(__name__)
+DEFAULT_BUDGET_MB = 1024
+SESSION_CACHE_KEY = 'session_cache'
+SMALL_FRAME_ROWS = 10000
+FINGERPRINT_SAMPLE_ROWS = 1024
+_frame_fingerprints = {}
+def frame_bytes(df):
+    """Deep memory of a frame, index included."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+def estimate_bytes(value, _seen=None):
+    """Approximate memory held by a cached value: frames, arrays, containers and plain objects' attributes."""
+    _seen = set() if _seen is None else _seen
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return frame_bytes(value)
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(estimate_bytes(item, _seen) for item in value.values())
+    if isinstance(value, (list, tuple, set)):
+        return sum(estimate_bytes(item, _seen) for item in value)
+    if hasattr(value, '__dict__') and not isinstance(value, type):
+        return sys.getsizeof(value) + estimate_bytes(vars(value), _seen)
+    return sys.getsizeof(value)
+def value_fingerprint(value):
+    """Hashable stand-in for a cache key argument; small frames are content-hashed, large ones by shape and strided rows.
+
+    Large frames hash FINGERPRINT_SAMPLE_ROWS evenly strided rows (first and
+    last included), so a frame whose content changes at the same shape, such
+    as a diff of replaced snapshot files, gets a new fingerprint. Their
+    fingerprints are memoized per frame object, which is never modified in
+    place once it is passed to a chart.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        if len(value) <= SMALL_FRAME_ROWS:
+            return ('frame', value.shape, int(pd.util.hash_pandas_object(value, index=True).sum()))
+        memo = _frame_fingerprints.get(id(value))
+        if memo is not None and memo[0]() is value:
+            return memo[1]
+        positions = np.unique(np.linspace(0, len(value) - 1, FINGERPRINT_SAMPLE_ROWS).astype(np.int64))
+        sample_hash = int(pd.util.hash_pandas_object(value.iloc[positions], index=True).sum())
+        fingerprint = ('frame', value.shape, tuple(value.columns) if isinstance(value, pd.DataFrame) else value.name, sample_hash)
+        key = id(value)
+        _frame_fingerprints[key] = (weakref.ref(value, lambda _: _frame_fingerprints.pop(key, None)), fingerprint)
+        return fingerprint
+    if isinstance(value, (list, tuple)):
+        return tuple(value_fingerprint(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, value_fingerprint(item)) for key, item in value.items()))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+class SessionCache:
+    """LRU cache for a session's large objects (datasets, masks, profiles, figures) under a byte budget.
+
+    Entries are sized on insert; the least recently used unpinned entries are
+    evicted until the total fits the budget. The current dataset is pinned so
+    it is never evicted while in use.
+    """
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_MB * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+    def __contains__(self, key):
+        return key in self.entries
+    def __len__(self):
+        return len(self.entries)
+    def keys(self, kind=None):
+        return [key for key, entry in self.entries.items() if kind is None or entry['kind'] == kind]
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry['value']
+    def peek(self, key, default=None):
+        """Value under key without counting a hit or miss or refreshing its recency."""
+        entry = self.entries.get(key)
+        return default if entry is None else entry['value']
+    def put(self, key, value, kind='other', nbytes=None, pinned=False):
+        """Store value under key, sized with estimate_bytes unless nbytes is given, then evict down to the budget."""
+        self.discard(key)
+        nbytes = estimate_bytes(value) if nbytes is None else int(nbytes)
+        self.entries[key] = {'value': value, 'kind': kind, 'nbytes': nbytes, 'pinned': pinned}
+        self.total_bytes += nbytes
+        self.evict(keep=key)
+        return value
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry['nbytes']
+        return entry
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        self.entries.clear()
+        self.total_bytes = 0
+    def pin(self, key, kind=None):
+        """Pin key and unpin every other entry of the same kind."""
+        kind = kind or self.entries[key]['kind']
+        for entry_key, entry in self.entries.items():
+            if entry['kind'] == kind:
+                entry['pinned'] = entry_key == key
+    def evict(self, keep=None):
+        """Drop least recently used unpinned entries until the total fits the budget."""
+        for key in list(self.entries):
+            if self.total_bytes <= self.budget_bytes:
+                break
+            entry = self.entries[key]
+            if entry['pinned'] or key == keep:
+                continue
+            self.discard(key)
+            self.evictions += 1
+            self.evicted_bytes += entry['nbytes']
+            logger.info(f"Session cache evicted {entry['kind']} entry ({entry['nbytes'] / 1024 / 1024:.1f} MiB)")
+    def stats(self):
+        """Entry counts and bytes per kind plus hit, miss and eviction counters."""
+        kinds = {}
+        for entry in self.entries.values():
+            count, nbytes = kinds.get(entry['kind'], (0, 0))
+            kinds[entry['kind']] = (count + 1, nbytes + entry['nbytes'])
+        return {
+            'entries': len(self.entries),
+            'bytes': self.total_bytes,
+            'budget_bytes': self.budget_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'evicted_bytes': self.evicted_bytes,
+            'kinds': kinds
+        }
+def session_cache(budget_bytes=None):
+    """The current session's SessionCache, created on first use (budget changes apply immediately)."""
+    cache = st.session_state.get(SESSION_CACHE_KEY)
+    if cache is None:
+        cache = SessionCache() if budget_bytes is None else SessionCache(budget_bytes)
+        st.session_state[SESSION_CACHE_KEY] = cache
+    elif budget_bytes is not None and budget_bytes != cache.budget_bytes:
+        cache.budget_bytes = budget_bytes
+        cache.evict()
+    return cache
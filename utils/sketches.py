@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+DEFAULT_RELATIVE_ACCURACY = 0.01
+def log_gamma(relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """Bin growth factor giving the requested relative error on reconstructed values."""
+    return (1 + relative_accuracy) / (1 - relative_accuracy)
+def log_bin_keys(values, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """Map non-negative values to log-spaced bin keys; key 0 holds values below 1."""
+    values = np.asarray(values, dtype=np.float64)
+    keys = np.zeros(len(values), dtype=np.int32)
+    positive = values >= 1
+    keys[positive] = 1 + np.floor(np.log(values[positive]) / np.log(log_gamma(relative_accuracy))).astype(np.int32)
+    return keys
+def log_bin_values(keys, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """Representative value of each bin key (inverse of log_bin_keys)."""
+    gamma = log_gamma(relative_accuracy)
+    keys = np.asarray(keys)
+    return np.where(keys > 0, np.power(gamma, np.maximum(keys, 1) - 1.0) * (1 + gamma) / 2, 0.0)
+def grouped_quantiles(group_ids, keys, counts, n_groups, q, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """Quantile q of every group from sparse (group, bin key, count) sketch entries."""
+    group_ids = np.asarray(group_ids, dtype=np.int64)
+    keys = np.asarray(keys, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.float64)
+    result = np.full(n_groups, np.nan)
+    if len(keys) == 0:
+        return result
+    order = np.lexsort((keys, group_ids))
+    group_ids, keys, counts = group_ids[order], keys[order], counts[order]
+    totals = np.bincount(group_ids, weights=counts, minlength=n_groups)
+    cumulative = np.cumsum(counts)
+    before_group = np.concatenate(([0.0], np.cumsum(totals)[:-1]))
+    present = np.flatnonzero(totals > 0)
+    targets = before_group[present] + np.maximum(q * totals[present], np.finfo(np.float64).tiny)
+    positions = np.minimum(np.searchsorted(cumulative, targets - 1e-9, side='left'), len(keys) - 1)
+    result[present] = log_bin_values(keys[positions], relative_accuracy)
+    return result
+SIGNED_LOG_MIN_MAGNITUDE = 1e-9
+def _signed_log_offset(relative_accuracy):
+    return int(np.floor(np.log(SIGNED_LOG_MIN_MAGNITUDE) / np.log(log_gamma(relative_accuracy))))
+def signed_log_keys(values, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """Order-preserving bin keys for any real values: 0 for zero, +/-(log-bin index) by sign.
+
+    Magnitudes below SIGNED_LOG_MIN_MAGNITUDE share the smallest bin.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.maximum(np.abs(values), SIGNED_LOG_MIN_MAGNITUDE)
+    index = np.ceil(np.log(magnitude) / np.log(log_gamma(relative_accuracy))).astype(np.int64)
+    index = index - _signed_log_offset(relative_accuracy)
+    return (np.sign(values).astype(np.int64) * index).astype(np.int32)
+def signed_log_values(keys, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """Representative value of each signed bin key (inverse of signed_log_keys)."""
+    gamma = log_gamma(relative_accuracy)
+    keys = np.asarray(keys, dtype=np.int64)
+    exponent = np.abs(keys) + _signed_log_offset(relative_accuracy)
+    return np.sign(keys) * 2 * np.power(gamma, exponent.astype(np.float64)) / (1 + gamma)
+def merge_sparse_counts(group_ids, keys, counts):
+    """Collapse duplicate (group, key) entries by summing their counts."""
+    group_ids = np.asarray(group_ids, dtype=np.int64)
+    keys = np.asarray(keys, dtype=np.int64)
+    if len(keys) == 0:
+        return group_ids, keys, np.asarray(counts, dtype=np.int64)
+    span = int(keys.max()) + 1
+    combined, inverse = np.unique(group_ids * span + keys, return_inverse=True)
+    merged = np.bincount(inverse, weights=counts).astype(np.int64)
+    return combined // span, combined % span, merged
+class LogHistogram:
+    """Mergeable quantile sketch for non-negative values with bounded relative error."""
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.counts = np.zeros(0, dtype=np.int64)
+    @property
+    def count(self):
+        return int(self.counts.sum())
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values) & (values >= 0)]
+        if len(values) == 0:
+            return self
+        added = np.bincount(log_bin_keys(values, self.relative_accuracy))
+        self._accumulate(added)
+        return self
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self._accumulate(other.counts)
+        return self
+    def _accumulate(self, counts):
+        if len(counts) > len(self.counts):
+            self.counts = np.concatenate([self.counts, np.zeros(len(counts) - len(self.counts), dtype=np.int64)])
+        self.counts[:len(counts)] += counts.astype(np.int64)
+    def quantile(self, q):
+        """Approximate q-quantile (scalar or array of q); NaN for an empty sketch."""
+        total = self.counts.sum()
+        if total == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        cumulative = np.cumsum(self.counts)
+        targets = np.maximum(np.asarray(q, dtype=np.float64) * total, 1)
+        keys = np.minimum(np.searchsorted(cumulative, targets - 1e-9, side='left'), len(self.counts) - 1)
+        return log_bin_values(keys, self.relative_accuracy)
+def hash_values(values):
+    """Deterministic 64-bit hashes of arbitrary values (strings, numbers)."""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+def _bit_length(values):
+    """Bit length of each uint64 value (0 for 0), exact via two 32-bit halves."""
+    values = np.asarray(values, dtype=np.uint64)
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    with np.errstate(divide='ignore'):
+        high_bits = np.where(high > 0, np.floor(np.log2(np.maximum(high, 1))) + 1, 0)
+        low_bits = np.where(low > 0, np.floor(np.log2(np.maximum(low, 1))) + 1, 0)
+    return np.where(high > 0, 32 + high_bits, low_bits).astype(np.int64)
+class HyperLogLog:
+    """Mergeable distinct-count sketch; standard error is about 1.04 / sqrt(2 ** precision)."""
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+    def add_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return self
+        suffix_bits = 64 - self.precision
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+        suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+        rank = (suffix_bits - _bit_length(suffix) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+    def add(self, values):
+        values = pd.Series(values).dropna()
+        return self.add_hashes(hash_values(values.to_numpy()))
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            return float(m * np.log(m / zeros))
+        return float(raw)
+class CountMinSketch:
+    """Mergeable frequency sketch; point estimates overshoot by at most e / width of the total weight with probability 1 - exp(-depth)."""
+    _MULTIPLIERS = np.array([
+        0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+        0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9
+    ], dtype=np.uint64)
+    def __init__(self, width_bits=14, depth=4):
+        if depth > len(self._MULTIPLIERS):
+            raise ValueError(f"depth must be at most {len(self._MULTIPLIERS)}")
+        self.width_bits = width_bits
+        self.depth = depth
+        self.table = np.zeros((depth, 1 << width_bits), dtype=np.float64)
+        self.total = 0.0
+    @property
+    def epsilon(self):
+        return np.e / self.table.shape[1]
+    def _columns(self, hashes, row):
+        with np.errstate(over='ignore'):
+            return ((hashes * self._MULTIPLIERS[row]) >> np.uint64(64 - self.width_bits)).astype(np.int64)
+    def add_hashes(self, hashes, weights=None):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        weights = np.ones(len(hashes)) if weights is None else np.asarray(weights, dtype=np.float64)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(self._columns(hashes, row), weights=weights, minlength=self.table.shape[1])
+        self.total += float(weights.sum())
+        return self
+    def query_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        estimates = [self.table[row][self._columns(hashes, row)] for row in range(self.depth)]
+        return np.min(estimates, axis=0)
+    def query(self, values):
+        return self.query_hashes(hash_values(values))
+    def merge(self, other):
+        if other.table.shape != self.table.shape:
+            raise ValueError("Cannot merge Count-Min sketches with different dimensions")
+        self.table += other.table
+        self.total += other.total
+        return self
+class SpaceSaving:
+    """Mergeable top-k summary: each kept item's true weight lies in [count - error, count]."""
+    def __init__(self, capacity=200):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.float64)
+        self.errors = pd.Series(dtype=np.float64)
+        self.floor = 0.0
+    def add(self, keys, weights=None):
+        """Add one batch of (key, weight) pairs, pre-aggregated exactly before merging."""
+        weights = np.ones(len(keys)) if weights is None else np.asarray(weights, dtype=np.float64)
+        batch = pd.Series(weights).groupby(np.asarray(keys, dtype=object), sort=False).sum()
+        summary = SpaceSaving(self.capacity)
+        summary.counts = batch
+        summary.errors = pd.Series(0.0, index=batch.index)
+        summary._truncate()
+        return self.merge(summary)
+    def merge(self, other):
+        keys = self.counts.index.union(other.counts.index)
+        counts = self.counts.reindex(keys, fill_value=self.floor) + other.counts.reindex(keys, fill_value=other.floor)
+        errors = self.errors.reindex(keys, fill_value=self.floor) + other.errors.reindex(keys, fill_value=other.floor)
+        self.counts, self.errors = counts, errors
+        self.floor += other.floor
+        self._truncate()
+        return self
+    def _truncate(self):
+        if len(self.counts) > self.capacity:
+            ordered = self.counts.sort_values(ascending=False)
+            self.floor = max(self.floor, float(ordered.iloc[self.capacity]))
+            keep = ordered.index[:self.capacity]
+            self.counts = self.counts.loc[keep]
+            self.errors = self.errors.loc[keep]
+    def top(self, n=10):
+        """Top n items as a frame with estimated count, error bound and guaranteed lower bound."""
+        ordered = self.counts.sort_values(ascending=False).head(n)
+        errors = self.errors.loc[ordered.index]
+        return pd.DataFrame({
+            'key': ordered.index,
+            'count': ordered.values,
+            'error': errors.values,
+            'lower_bound': (ordered - errors).clip(lower=0).values
+        })
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from utils.catalog import SNAPSHOT_CHUNK_ROWS, iter_snapshot_chunks
+from utils.prep import GROWTH_METRICS, PREVIOUS_PREFIX, engineer_growth_features
+from utils.sketches import hash_values
+VIDEO_KEY_COLUMN = 'videoId'
+VIDEO_HASH_COLUMN = 'videoKey'
+DIFF_BLOCK_ROWS = 262144
+def _channel_codes(chunk, channel_index):
+    """int32 code of each row's channelId in channel_index, adding new channels (-1 when missing)."""
+    if 'channelId' not in chunk.columns:
+        return np.full(len(chunk), -1, dtype=np.int32)
+    codes, uniques = pd.factorize(chunk['channelId'])
+    lookup = np.array([channel_index.setdefault(str(channel), len(channel_index)) for channel in uniques] + [-1], dtype=np.int32)
+    return lookup[codes]
+class SnapshotKeys:
+    """One snapshot's videos as arrays sorted by a 64-bit hash of videoId: keys, metric values, rows and channel codes.
+
+    Only the key, the growth metrics, the source row of each video and an
+    int32 channel code are kept (no frame and no id strings), so two snapshots
+    can be joined with a merge over sorted arrays instead of a pandas merge of
+    full frames. video_ids re-reads the id strings of just the videos a caller
+    reports. A videoId that appears more than once keeps its last row. Keys are
+    hashes, so distinct ids collide with probability about n^2 / 2^65 (under
+    1e-6 for 5M videos).
+    """
+    def __init__(self, keys, rows, metrics, channel_codes, channel_ids, source=None):
+        self.keys = keys
+        self.rows = rows
+        self.metrics = metrics
+        self.channel_codes = channel_codes
+        self.channel_ids = channel_ids
+        self.source = source
+        self._ids = {}
+    def __len__(self):
+        return len(self.keys)
+    @classmethod
+    def from_chunks(cls, chunks, source=None):
+        """Build from frames with a videoId column (plus any of channelId and the growth metrics).
+
+        source is what video_ids re-reads ids from: the snapshot dict the
+        chunks were read from, or the videoId column of a single frame.
+        """
+        keys, rows, channels, metrics = [], [], [], {col: [] for col in GROWTH_METRICS}
+        channel_index = {}
+        offset = 0
+        for chunk in chunks:
+            if VIDEO_KEY_COLUMN not in chunk.columns:
+                return None
+            present = chunk[VIDEO_KEY_COLUMN].notna().to_numpy()
+            rows.append(offset + np.flatnonzero(present))
+            offset += len(chunk)
+            chunk = chunk[present]
+            keys.append(hash_values(chunk[VIDEO_KEY_COLUMN].astype(str).to_numpy(dtype=object)))
+            channels.append(_channel_codes(chunk, channel_index))
+            for col in GROWTH_METRICS:
+                values = (pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                          if col in chunk.columns else np.full(len(chunk), np.nan))
+                metrics[col].append(np.where((values == -1) | (values == -2), np.nan, values))
+        if not keys:
+            return None
+        keys = np.concatenate(keys)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        last = np.ones(len(keys), dtype=bool)
+        last[:-1] = keys[1:] != keys[:-1]
+        order, keys = order[last], keys[last]
+        channel_ids = np.array(list(channel_index), dtype=object)
+        channel_order = np.argsort(channel_ids)
+        rank = np.empty(len(channel_ids) + 1, dtype=np.int32)
+        rank[channel_order] = np.arange(len(channel_ids), dtype=np.int32)
+        rank[-1] = -1
+        return cls(
+            keys,
+            np.concatenate(rows)[order],
+            {col: np.concatenate(values)[order] for col, values in metrics.items()},
+            rank[np.concatenate(channels)[order]],
+            pd.Index(channel_ids[channel_order], dtype=object),
+            source
+        )
+    @classmethod
+    def from_frame(cls, df):
+        return cls.from_chunks([df], df[VIDEO_KEY_COLUMN] if VIDEO_KEY_COLUMN in df.columns else None)
+    @classmethod
+    def from_snapshot(cls, snapshot, chunk_rows=SNAPSHOT_CHUNK_ROWS):
+        """Read only the key, channel and metric columns of a snapshot, chunk by chunk."""
+        return cls.from_chunks(iter_snapshot_chunks(snapshot, [VIDEO_KEY_COLUMN, 'channelId', *GROWTH_METRICS], chunk_rows), snapshot)
+    def video_ids(self, keys):
+        """videoId strings of the given keys, re-read from the source rows and remembered for later calls."""
+        rows = self.rows[np.searchsorted(self.keys, np.asarray(keys, dtype=self.keys.dtype))]
+        wanted = np.unique([row for row in rows.tolist() if row not in self._ids])
+        if len(wanted) and isinstance(self.source, pd.Series):
+            self._ids.update(zip(wanted.tolist(), self.source.iloc[wanted].astype(str)))
+        elif len(wanted) and self.source is not None:
+            offset = 0
+            for chunk in iter_snapshot_chunks(self.source, [VIDEO_KEY_COLUMN]):
+                hit = wanted[(wanted >= offset) & (wanted < offset + len(chunk))]
+                self._ids.update(zip(hit.tolist(), chunk[VIDEO_KEY_COLUMN].iloc[hit - offset].astype(str)))
+                offset += len(chunk)
+                if offset > wanted[-1]:
+                    break
+        return np.array([self._ids.get(row) for row in rows.tolist()], dtype=object)
+def iter_merge_join(left, right, block_rows=DIFF_BLOCK_ROWS):
+    """(left positions, right positions) of equal keys in two sorted unique key arrays, one block of left at a time.
+
+    Each block is matched only against the part of right its key range can
+    reach, and the search restarts where the previous block ended, so the two
+    arrays are walked once in order like a merge join.
+    """
+    start = 0
+    for block_start in range(0, len(left), block_rows):
+        block = left[block_start:block_start + block_rows]
+        stop = start + np.searchsorted(right[start:], block[-1], side='right')
+        window = right[start:stop]
+        found = np.searchsorted(window, block)
+        matched = found < len(window)
+        matched[matched] = window[found[matched]] == block[matched]
+        yield block_start + np.flatnonzero(matched), start + found[matched]
+        start = stop
+def diff_snapshots(before, after, block_rows=DIFF_BLOCK_ROWS):
+    """Growth of every video present in both snapshots, with the counts of added and removed videos.
+
+    Returns (frame, summary): the frame holds the videoKey hash, channelId, each
+    metric in the later snapshot and its prev_ value, then the growth deltas and
+    rates of engineer_growth_features; summary counts matched, added and removed
+    videos. after.video_ids turns the videoKey of reported rows into videoIds.
+    """
+    blocks = list(iter_merge_join(before.keys, after.keys, block_rows))
+    before_pos = np.concatenate([pair[0] for pair in blocks]) if blocks else np.zeros(0, dtype=np.int64)
+    after_pos = np.concatenate([pair[1] for pair in blocks]) if blocks else np.zeros(0, dtype=np.int64)
+    columns = {
+        VIDEO_HASH_COLUMN: after.keys[after_pos],
+        'channelId': pd.Categorical.from_codes(after.channel_codes[after_pos], categories=after.channel_ids)
+    }
+    for col in GROWTH_METRICS:
+        columns[col] = after.metrics[col][after_pos]
+        columns[PREVIOUS_PREFIX + col] = before.metrics[col][before_pos]
+    diff = engineer_growth_features(pd.DataFrame(columns))
+    summary = {
+        'matched': len(after_pos),
+        'added': len(after) - len(after_pos),
+        'removed': len(before) - len(before_pos)
+    }
+    return diff, summary
+def channel_growth(diff):
+    """Per-channel sums of the later and prev_ metric values of matched videos, with the same growth features."""
+    if 'channelId' not in diff.columns or len(diff) == 0:
+        return None
+    metric_cols = [col for metric in GROWTH_METRICS for col in [metric, PREVIOUS_PREFIX + metric] if col in diff.columns]
+    table = diff.groupby('channelId', observed=True, sort=True)[metric_cols].sum(min_count=1)
+    table.insert(0, 'video_count', diff.groupby('channelId', observed=True, sort=True).size().astype(np.int32))
+    return engineer_growth_features(table)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from utils.columns import column_values
+from utils.sketches import DEFAULT_RELATIVE_ACCURACY, grouped_quantiles, log_bin_keys, merge_sparse_counts
+GRANULARITIES = ['Year', 'Month', 'Week', 'Day']
+TIME_SERIES_METRICS = {
+    'Views': 'videoViewCount',
+    'Likes': 'videoLikeCount',
+    'Comments': 'VideoCommentCount'
+}
+DEFAULT_MAX_POINTS = 1200
+def _day_numbers(published):
+    """Days since the epoch for a datetime Series; NaT rows are dropped via the returned mask."""
+    if isinstance(published.dtype, pd.DatetimeTZDtype):
+        published = published.dt.tz_convert(None)
+    values = published.values.astype('datetime64[D]')
+    valid = ~np.isnat(values)
+    return values[valid].astype(np.int64), valid
+def _bucket_starts(days, granularity):
+    """Start day of the bucket containing each day number."""
+    if granularity == 'Day':
+        return days
+    if granularity == 'Week':
+        return days - (days + 3) % 7
+    unit = {'Month': 'M', 'Year': 'Y'}[granularity]
+    return days.astype('datetime64[D]').astype(f'datetime64[{unit}]').astype('datetime64[D]').astype(np.int64)
+class TimeSeriesCube:
+    """Per-day counts, metric sums and metric quantile sketches, resampled on demand."""
+    def __init__(self, days, counts, sums, sketches, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.days = days
+        self.counts = counts
+        self.sums = sums
+        self.sketches = sketches
+        self.relative_accuracy = relative_accuracy
+        self._resampled = {}
+    @classmethod
+    def from_frame(cls, df, time_col='videoPublished', relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """Build the cube in one pass over df; returns None without a datetime column."""
+        if time_col not in df.columns or not pd.api.types.is_datetime64_any_dtype(df[time_col]):
+            return None
+        row_days, valid = _day_numbers(df[time_col])
+        days, day_index = np.unique(row_days, return_inverse=True)
+        counts = np.bincount(day_index, minlength=len(days)).astype(np.int64)
+        sums = {}
+        sketches = {}
+        for label, col in TIME_SERIES_METRICS.items():
+            if col not in df.columns:
+                continue
+            values = column_values(df, col)[valid]
+            present = ~np.isnan(values)
+            sums[label] = np.bincount(day_index[present], weights=values[present], minlength=len(days))
+            present &= values >= 0
+            keys = log_bin_keys(values[present], relative_accuracy)
+            day_ids, keys, key_counts = merge_sparse_counts(day_index[present], keys, np.ones(len(keys)))
+            sketches[label] = (day_ids.astype(np.int32), keys.astype(np.int16), key_counts.astype(np.int32))
+        return cls(days, counts, sums, sketches, relative_accuracy)
+    def resample(self, granularity='Year'):
+        """Frame with one row per bucket: Period, Video Count, Total/Median per metric."""
+        if granularity not in self._resampled:
+            starts = _bucket_starts(self.days, granularity)
+            bucket_days, day_to_bucket = np.unique(starts, return_inverse=True)
+            n_buckets = len(bucket_days)
+            result = {
+                'Period': bucket_days.astype('datetime64[D]').astype('datetime64[ns]'),
+                'Video Count': np.bincount(day_to_bucket, weights=self.counts, minlength=n_buckets).astype(np.int64)
+            }
+            for label, day_sums in self.sums.items():
+                result[f'Total {label}'] = np.bincount(day_to_bucket, weights=day_sums, minlength=n_buckets)
+            for label, (day_ids, keys, counts) in self.sketches.items():
+                result[f'Median {label}'] = grouped_quantiles(
+                    day_to_bucket[day_ids], keys, counts, n_buckets, 0.5, self.relative_accuracy
+                )
+            self._resampled[granularity] = pd.DataFrame(result)
+        return self._resampled[granularity]
+    @property
+    def nbytes(self):
+        arrays = [self.days, self.counts, *self.sums.values()]
+        for entries in self.sketches.values():
+            arrays.extend(entries)
+        return int(sum(array.nbytes for array in arrays))
+def lttb_indices(x, y, threshold):
+    """Indices of the points kept by largest-triangle-three-buckets downsampling."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        if next_end <= next_start:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous]) -
+            (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area)) if len(area) else start
+        selected[i + 1] = previous
+    return selected
+def downsample_lttb(df, x_col, y_col, max_points=DEFAULT_MAX_POINTS):
+    """Return df reduced to at most max_points rows with LTTB on (x_col, y_col)."""
+    if len(df) <= max_points:
+        return df
+    x = df[x_col]
+    x_values = x.values.astype('datetime64[ns]').astype(np.int64) if pd.api.types.is_datetime64_any_dtype(x) else x.to_numpy(dtype=np.float64)
+    y_values = column_values(df, y_col)
+    y_values = np.where(np.isnan(y_values), 0.0, y_values)
+    return df.iloc[lttb_indices(x_values, y_values, max_points)]
@@ -2,15 +2,12 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-plt.rcParams['font.sans-serif'] = ['SimHei']
-plt.rcParams['axes.unicode_minus'] = False
 def create_category_distribution_chart(df):
     """Create a pie chart showing the distribution of video categories."""
     if 'categoryName' not in df.columns:
         return None
     category_counts = df['categoryName'].value_counts()
+    category_counts = category_counts[category_counts > 0]
     category_df = pd.DataFrame({
         'Category': category_counts.index,
         'Count': category_counts.values
@@ -4,8 +4,28 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 import logging
-logging.basicConfig(level=logging.INFO)
+from utils.timeseries import downsample_lttb
+from utils.channels import channel_display_names, has_channel_names
+from utils.kernels import DEFAULT_SCORE_WEIGHTS, engagement_metrics
 logger = logging.getLogger(__name__)
+WEBGL_POINT_THRESHOLD = 20000
+WEBGL_MAX_POINTS = 1000000
+SVG_SCATTER_MATRIX_POINTS = 1000
+def use_webgl(n_points, render_mode='auto', webgl_threshold=None):
+    """Resolve render_mode ('auto', 'webgl' or 'svg') for a chart with n_points points."""
+    if render_mode == 'webgl':
+        return True
+    if render_mode == 'svg':
+        return False
+    threshold = WEBGL_POINT_THRESHOLD if webgl_threshold is None else webgl_threshold
+    return n_points > threshold
+def to_float32_array(values):
+    """Contiguous float32 array for a trace, half the size of float64 in the figure object.
+
+    plotly 5.15 still writes numpy arrays to JSON as plain number lists; the
+    compact typed-array or rounded JSON encoding is done by figure_payload.compact_figure.
+    """
+    return np.ascontiguousarray(pd.Series(values).to_numpy(dtype=np.float32, na_value=np.nan))
 def create_enhanced_category_distribution_chart(df):
     """Create an enhanced pie chart showing the distribution of video categories."""
     try:
@@ -13,6 +33,7 @@ def create_enhanced_category_distribution_chart(df):
             logger.warning("categoryName column does not exist in the data")
             return None
         category_counts = df['categoryName'].value_counts()
+        category_counts = category_counts[category_counts > 0]
         category_df = pd.DataFrame({
             'Category': category_counts.index,
             'Count': category_counts.values
@@ -119,23 +140,26 @@ def create_enhanced_correlation_heatmap(df, columns):
         logger.error(f"Error creating correlation heatmap: {str(e)}")
         st.error("Error creating correlation heatmap, please check logs for details")
         return None
-def create_enhanced_time_series_chart(df, x_col, y_col, title):
-    """Create an enhanced time series line chart."""
+def create_enhanced_time_series_chart(df, x_col, y_col, title, log_y=False, max_points=None):
+    """Create an enhanced time series line chart, LTTB-downsampled to max_points if given."""
     try:
         if x_col not in df.columns or y_col not in df.columns:
             logger.warning(f"Column {x_col} or {y_col} does not exist in the data")
             return None
+        if max_points is not None:
+            df = downsample_lttb(df, x_col, y_col, max_points)
         fig_line = px.line(
             df,
             x=x_col,
             y=y_col,
-            markers=True,
+            markers=len(df) <= 200,
+            log_y=log_y,
             title=title,
             color_discrete_sequence=['#3274A1']
         )
         fig_line.update_layout(
             xaxis_title=x_col,
-            yaxis_title=y_col
+            yaxis_title=f"{y_col} (log scale)" if log_y else y_col
         )
         return fig_line
     except Exception as e:
@@ -178,6 +202,8 @@ def create_enhanced_box_plot(df, x_col, y_col, title):
         if x_col not in df.columns or y_col not in df.columns:
             logger.warning(f"Column {x_col} or {y_col} does not exist in the data")
             return None
+        if isinstance(df[x_col].dtype, pd.CategoricalDtype):
+            df = df[[x_col, y_col]].assign(**{x_col: df[x_col].cat.remove_unused_categories()})
         fig_box = px.box(
             df,
             x=x_col,
@@ -196,15 +222,35 @@ def create_enhanced_box_plot(df, x_col, y_col, title):
         logger.error(f"Error creating box plot: {str(e)}")
         st.error("Error creating box plot, please check logs for details")
         return None
-def create_enhanced_scatter_plot_matrix(df, columns, title):
-    """Create an enhanced scatter plot matrix for the specified columns."""
+def create_enhanced_scatter_plot_matrix(df, columns, title, render_mode='auto', webgl_threshold=None, max_points=None):
+    """Create an enhanced scatter plot matrix, switching to a float32 WebGL splom for large data."""
     try:
         missing_cols = [col for col in columns if col not in df.columns]
         if missing_cols:
             logger.warning(f"The following columns do not exist in the data: {missing_cols}")
             return None
-        sample_size = min(1000, len(df))
-        sample_df = df[columns].dropna().sample(sample_size, random_state=42)
+        valid_df = df[columns[:4]].dropna()
+        if use_webgl(len(valid_df), render_mode, webgl_threshold):
+            max_points = WEBGL_MAX_POINTS if max_points is None else max_points
+            if len(valid_df) > max_points:
+                valid_df = valid_df.sample(max_points, random_state=42)
+            color_values = np.log10(np.clip(to_float32_array(valid_df[columns[0]]), 0, None) + 1)
+            fig_scatter_matrix = go.Figure(go.Splom(
+                dimensions=[dict(label=col, values=to_float32_array(valid_df[col])) for col in valid_df.columns],
+                showupperhalf=False,
+                marker=dict(
+                    size=3,
+                    opacity=0.4,
+                    color=color_values,
+                    colorscale='Viridis',
+                    colorbar=dict(title=f"log10 {columns[0]}")
+                ),
+                hoverinfo='skip'
+            ))
+            fig_scatter_matrix.update_layout(title=f"{title} (WebGL, {len(valid_df):,} points)", height=800)
+            return fig_scatter_matrix
+        sample_size = min(SVG_SCATTER_MATRIX_POINTS if max_points is None else max_points, len(valid_df))
+        sample_df = valid_df.sample(sample_size, random_state=42)
         fig_scatter_matrix = px.scatter_matrix(
             sample_df,
             dimensions=columns[:4],
@@ -218,9 +264,81 @@ def create_enhanced_scatter_plot_matrix(df, columns, title):
         logger.error(f"Error creating scatter plot matrix: {str(e)}")
         st.error("Error creating scatter plot matrix, please check logs for details")
         return None
-def create_channel_performance_comparison_chart(df, top_n=10):
-    """Create a chart comparing channel performance."""
+def create_webgl_scatter_chart(df, x_col, y_col, color_col=None, title=None, log_axes=True,
+                               render_mode='auto', webgl_threshold=None, max_points=None):
+    """Create a point chart of y_col against x_col (colored by color_col), using Scattergl above the threshold."""
     try:
+        cols = [col for col in [x_col, y_col, color_col] if col is not None]
+        missing_cols = [col for col in cols if col not in df.columns]
+        if missing_cols:
+            logger.warning(f"The following columns do not exist in the data: {missing_cols}")
+            return None
+        valid_df = df[cols].dropna()
+        if log_axes:
+            valid_df = valid_df[(valid_df[x_col] > 0) & (valid_df[y_col] > 0)]
+        max_points = WEBGL_MAX_POINTS if max_points is None else max_points
+        if len(valid_df) > max_points:
+            valid_df = valid_df.sample(max_points, random_state=42)
+        webgl = use_webgl(len(valid_df), render_mode, webgl_threshold)
+        marker = dict(size=3 if webgl else 5, opacity=0.5)
+        if color_col is not None:
+            marker.update(
+                color=np.log10(np.clip(to_float32_array(valid_df[color_col]), 0, None) + 1),
+                colorscale='Viridis',
+                colorbar=dict(title=f"log10 {color_col}")
+            )
+        trace_type = go.Scattergl if webgl else go.Scatter
+        fig_scatter = go.Figure(trace_type(
+            x=to_float32_array(valid_df[x_col]),
+            y=to_float32_array(valid_df[y_col]),
+            mode='markers',
+            marker=marker,
+            hovertemplate=f"{x_col}: %{{x:,.0f}}<br>{y_col}: %{{y:,.0f}}<extra></extra>"
+        ))
+        mode_label = "WebGL" if webgl else "SVG"
+        fig_scatter.update_layout(
+            title=f"{title or f'{y_col} vs. {x_col}'} ({mode_label}, {len(valid_df):,} points)",
+            xaxis_title=x_col,
+            yaxis_title=y_col,
+            xaxis_type='log' if log_axes else 'linear',
+            yaxis_type='log' if log_axes else 'linear',
+            height=600
+        )
+        return fig_scatter
+    except Exception as e:
+        logger.error(f"Error creating scatter chart: {str(e)}")
+        st.error("Error creating scatter chart, please check logs for details")
+        return None
+def create_channel_performance_comparison_chart(df, top_n=10, channel_table=None):
+    """Create a chart comparing channel performance, reading from the channel table when given."""
+    try:
+        if channel_table is not None and 'total_views' in channel_table.columns:
+            display_names, xaxis_title = channel_display_names(channel_table)
+            top_channels = channel_table.nlargest(top_n, 'total_views')
+            channel_performance = pd.DataFrame({
+                'channel': display_names.loc[top_channels.index].values,
+                'videoViewCount': top_channels['total_views'].values,
+                'videoCount': top_channels['video_count'].values
+            })
+            fig_top_channels = px.bar(
+                channel_performance,
+                x='channel',
+                y='videoViewCount',
+                title=f"Top {top_n} Channel View Counts",
+                color='videoViewCount',
+                color_continuous_scale="YlOrRd",
+                hover_data={'channel': True, 'videoViewCount': True, 'videoCount': True}
+            )
+            fig_top_channels.update_layout(
+                xaxis_title=xaxis_title,
+                yaxis_title="Total Views",
+                xaxis_tickangle=45,
+                xaxis=dict(
+                    tickfont=dict(size=10),
+                    automargin=True
+                )
+            )
+            return fig_top_channels
         available_channel_cols = []
         for col in ['channelName', 'channelId']:
             if col in df.columns:
@@ -228,9 +346,7 @@ def create_channel_performance_comparison_chart(df, top_n=10):
         if not available_channel_cols:
             return None
         if 'channelName' in available_channel_cols:
-            df_temp = df.copy()
-            df_temp['channelName'] = df_temp['channelName'].astype(str).fillna('')
-            if df_temp['channelName'].str.strip().ne('').any():
+            if has_channel_names(df):
                 group_by_col = 'channelName'
                 display_col = 'channelName'
                 xaxis_title = "Channel Name"
@@ -242,7 +358,7 @@ def create_channel_performance_comparison_chart(df, top_n=10):
             group_by_col = 'channelId'
             display_col = 'channelId'
             xaxis_title = "Channel ID"
-        channel_performance = df.groupby(group_by_col)['videoViewCount'].sum().reset_index()
+        channel_performance = df.groupby(group_by_col, observed=True)['videoViewCount'].sum().reset_index()
         channel_performance = channel_performance.sort_values('videoViewCount', ascending=False).head(top_n)
         if group_by_col == 'channelId':
             channel_performance['displayId'] = channel_performance['channelId'].apply(
@@ -272,16 +388,46 @@ def create_channel_performance_comparison_chart(df, top_n=10):
         logger.error(f"Error creating channel performance comparison chart: {str(e)}")
         st.error("Error creating channel performance comparison chart, please check logs for details")
         return None
-def create_engagement_score_distribution_chart(df):
-    """Create a histogram chart showing the distribution of engagement scores."""
+def create_approximate_top_channels_chart(top_channels, title):
+    """Create a bar chart of sketch-estimated top channels with their Space-Saving and Count-Min error bounds."""
     try:
-        valid_df = df[(df['videoViewCount'] > 0) & (df['videoLikeCount'].notna()) & (df['VideoCommentCount'].notna())].copy()
-        if len(valid_df) > 0:
-            valid_df['engagement_score'] = (
-                np.log1p(valid_df['videoViewCount']) * 0.4 +
-                np.log1p(valid_df['videoLikeCount']) * 0.4 +
-                np.log1p(valid_df['VideoCommentCount']) * 0.2
+        if top_channels is None or len(top_channels) == 0:
+            logger.warning("No sketch entries available for the top channels chart")
+            return None
+        upper = top_channels['upper_bound'] if 'upper_bound' in top_channels.columns else top_channels['count']
+        fig_top_channels = go.Figure(go.Bar(
+            x=top_channels['channel'],
+            y=upper,
+            error_y=dict(type='data', symmetric=False, array=np.zeros(len(top_channels)), arrayminus=upper - top_channels['lower_bound']),
+            marker=dict(color=upper, colorscale='YlOrRd'),
+            hovertemplate="%{x}<br>Views ≤ %{y:,.0f}<extra></extra>"
+        ))
+        fig_top_channels.update_layout(
+            title=title,
+            xaxis_title="Channel",
+            yaxis_title="Total Views (upper bound, error bar to guaranteed minimum)",
+            xaxis_tickangle=45,
+            xaxis=dict(
+                tickfont=dict(size=10),
+                automargin=True
             )
+        )
+        return fig_top_channels
+    except Exception as e:
+        logger.error(f"Error creating approximate top channels chart: {str(e)}")
+        st.error("Error creating approximate top channels chart, please check logs for details")
+        return None
+def create_engagement_score_distribution_chart(df, weights=None):
+    """Create a histogram chart showing the distribution of engagement scores (rescored when custom weights are given)."""
+    try:
+        if 'engagement_score' in df.columns and (weights is None or tuple(weights) == DEFAULT_SCORE_WEIGHTS):
+            valid_df = df.loc[df['engagement_score'].notna(), ['engagement_score']]
+        else:
+            scores = engagement_metrics(df, ['engagement_score'], DEFAULT_SCORE_WEIGHTS if weights is None else weights).get('engagement_score')
+            if scores is None:
+                return None
+            valid_df = pd.DataFrame({'engagement_score': scores[~np.isnan(scores)]})
+        if len(valid_df) > 0:
             fig_score_dist = px.histogram(
                 valid_df,
                 x='engagement_score',